@@ -1,13 +1,46 @@
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set
 import json
 import os
 from pathlib import Path
 
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Keys per travel_cache lookup statement: 4 parameters each stays under SQLite's default
+# 999-parameter limit on older builds
+TRAVEL_KEYS_PER_QUERY = 200
+
+
+def _convert_timestamp(value: bytes):
+    """TIMESTAMP converter accepting both 'YYYY-MM-DD HH:MM:SS' and ISO 'T' values;
+    anything unparseable is returned as text rather than failing the whole query."""
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+# Applied only to columns selected as "name [TIMESTAMP]" (PARSE_COLNAMES), so other tables keep
+# their stored strings. Replaces the built-in converter, which rejects ISO 'T' separators and is
+# deprecated since 3.12
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+
 class DatabaseManager:
     def __init__(self, db_path: str = None):
         if db_path is None:
@@ -17,8 +50,41 @@ class DatabaseManager:
             db_path = data_dir / "rota_operations.db"
         
         self.db_path = str(db_path)
-        self.conn = sqlite3.connect(self.db_path)
+        # Columns selected as "name [TIMESTAMP]" come back as datetime objects
+        self.conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_COLNAMES)
+        # Row supports both index and name access, so existing dict(zip(...)) callers keep working
+        self.conn.row_factory = sqlite3.Row
+        self._configure_connection()
+        self._table_columns = {}
+        # Cached (by_employee, by_patient) assignment indexes, valid while the version matches
+        self._assignments_version = 0
+        self._assignment_indexes = None
+        self._assignment_indexes_version = -1
+        # DATE(start_time) -> {(employee_id, patient_id)}, valid for _pairs_by_date_version
+        self._pairs_by_date: Dict[str, Set[tuple]] = {}
+        self._pairs_by_date_version = -1
+        # Deferred operations_log rows, written by flush_operation_log()
+        self._op_log_queue: List[tuple] = []
+        self._op_log_lock = threading.Lock()
         self.create_tables()
+        # travel_cache gets its own connection, usable from any thread (serialized by _travel_lock),
+        # so travel warmups running on executor threads can read and write the persisted cache.
+        # A second ':memory:' connection would be a separate empty database, so that case shares self.conn
+        if self.db_path == ":memory:":
+            self._travel_conn = self.conn
+        else:
+            self._travel_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._travel_lock = threading.Lock()
+
+    def _configure_connection(self):
+        """WAL journaling and cache tuning: commits append to the log instead of
+        rewriting a rollback journal, and readers no longer block the writer."""
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-20000")
+        cursor.execute("PRAGMA mmap_size=268435456")
 
     def create_tables(self):
         cursor = self.conn.cursor()
@@ -162,6 +228,46 @@ class DatabaseManager:
                 ai_ideas TEXT
             )
         ''')
+
+        # AI summaries keyed by a hash of the metrics they describe
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_ai_cache (
+                key TEXT PRIMARY KEY,
+                summary TEXT,
+                suggestions TEXT,
+                fetched_at INTEGER NOT NULL
+            )
+        ''')
+
+        # Persistent Distance Matrix results (TravelService cache), keyed by lower-cased addresses and the
+        # departure-time slot they were fetched in. A pre-slot table is only a cache, so it is rebuilt.
+        # status is 'OK' for API answers, 'FAIL' for failed lookups holding the heuristic (short TTL).
+        cursor.execute("PRAGMA table_info(travel_cache)")
+        travel_cache_columns = {row[1] for row in cursor.fetchall()}
+        if travel_cache_columns and 'slot' not in travel_cache_columns:
+            cursor.execute("DROP TABLE travel_cache")
+        elif travel_cache_columns and 'status' not in travel_cache_columns:
+            cursor.execute("ALTER TABLE travel_cache ADD COLUMN status TEXT NOT NULL DEFAULT 'OK'")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS travel_cache (
+                origin TEXT NOT NULL,
+                dest TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                slot TEXT NOT NULL,
+                minutes INTEGER NOT NULL,
+                fetched_at INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'OK',
+                PRIMARY KEY (origin, dest, mode, slot)
+            )
+        ''')
+
+        # Default ordering for paged assignment queries (ORDER BY created_at DESC LIMIT ?)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_assignments_created_at ON assignments(created_at)')
+        # Per-employee overlap/day lookups (has_overlap_for_employee, get_employee_assignments_for_date/_week)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_assign_emp_start ON assignments(employee_id, start_time)')
+        # Expression indexes must match the DATE(start_time) used by the queries
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_assign_emp_pat_date ON assignments(employee_id, patient_id, DATE(start_time))')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_assign_date_emp ON assignments(DATE(start_time), employee_id)')
         
         self.conn.commit()
 
@@ -349,15 +455,17 @@ class DatabaseManager:
         self.conn.commit()
         logger.info(f"Logged data upload: {filename} - {employees_count} employees, {patients_count} patients")
 
-    def log_assignment(self, assignment: Dict[str, Any]):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO assignments (
-                employee_id, employee_name, patient_id, patient_name, service_type, assigned_time,
-                start_time, end_time, duration, travel_time,
-                priority_score, reasoning
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    _INSERT_ASSIGNMENT_SQL = '''
+        INSERT INTO assignments (
+            employee_id, employee_name, patient_id, patient_name, service_type, assigned_time,
+            start_time, end_time, duration, travel_time,
+            priority_score, reasoning
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    @staticmethod
+    def _assignment_params(assignment: Dict[str, Any]) -> tuple:
+        return (
             assignment['employee_id'],
             assignment['employee_name'],
             assignment['patient_id'],
@@ -370,9 +478,30 @@ class DatabaseManager:
             assignment.get('travel_time'),
             assignment.get('priority_score'),
             assignment.get('assignment_reason')
-        ))
+        )
+
+    def log_assignment(self, assignment: Dict[str, Any]) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(self._INSERT_ASSIGNMENT_SQL, self._assignment_params(assignment))
         self.conn.commit()
+        self.invalidate_assignment_indexes()
         logger.info(f"Logged assignment: {assignment['employee_id']} to {assignment['patient_id']}")
+        return cursor.lastrowid
+
+    def log_assignments_bulk(self, assignments: List[Dict[str, Any]]) -> List[int]:
+        """Insert many assignments in one transaction (a single commit); returns their ids in order"""
+        if not assignments:
+            return []
+        ids: List[int] = []
+        with self.conn:
+            cursor = self.conn.cursor()
+            # Row-by-row inside the transaction so each lastrowid is known; the commit is what costs
+            for assignment in assignments:
+                cursor.execute(self._INSERT_ASSIGNMENT_SQL, self._assignment_params(assignment))
+                ids.append(cursor.lastrowid)
+        self.invalidate_assignment_indexes()
+        logger.info(f"Logged {len(ids)} assignments")
+        return ids
 
     def log_operation(self, operation_type: str, description: str, details: Dict[str, Any] = None):
         cursor = self.conn.cursor()
@@ -383,11 +512,140 @@ class DatabaseManager:
         self.conn.commit()
         logger.info(f"Logged operation: {operation_type} - {description}")
 
+    def queue_operation(self, operation_type: str, description: str, details: Dict[str, Any] = None):
+        """Queue an operations_log row; nothing is written until flush_operation_log()"""
+        # Stamp now (UTC, like CURRENT_TIMESTAMP) so the row keeps its real time when flushed later
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        row = (operation_type, description, json.dumps(details) if details else None, created_at)
+        with self._op_log_lock:
+            self._op_log_queue.append(row)
+
+    def flush_operation_log(self) -> int:
+        """Write queued operation rows in one transaction; returns how many were written"""
+        with self._op_log_lock:
+            rows, self._op_log_queue = self._op_log_queue, []
+        if not rows:
+            return 0
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO operations_log (operation_type, description, details, created_at)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+        logger.info(f"Logged {len(rows)} queued operations")
+        return len(rows)
+
     def get_assignments(self) -> List[Dict]:
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM assignments ORDER BY created_at DESC")
         columns = [col[0] for col in cursor.description]
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_assignments_count(self) -> int:
+        """Number of assignment rows, without materializing them"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM assignments")
+        return cursor.fetchone()[0]
+
+    def invalidate_assignment_indexes(self):
+        """Mark cached assignment indexes stale; call after any write to the assignments table"""
+        self._assignments_version += 1
+
+    def get_assignment_indexes(self):
+        """(assignments_by_employee, assignments_by_patient, version), rebuilt only after assignment writes"""
+        if self._assignment_indexes_version != self._assignments_version:
+            by_employee: Dict[str, List[Dict]] = {}
+            by_patient: Dict[str, List[Dict]] = {}
+            for assignment in self.get_assignments():
+                by_employee.setdefault(assignment['employee_id'], []).append(assignment)
+                by_patient.setdefault(assignment['patient_id'], []).append(assignment)
+            self._assignment_indexes = (by_employee, by_patient)
+            self._assignment_indexes_version = self._assignments_version
+        by_employee, by_patient = self._assignment_indexes
+        return by_employee, by_patient, self._assignments_version
+
+    def get_assignment_pairs_on_dates(self, dates: Iterable[str]) -> Dict[str, Set[tuple]]:
+        """{date: {(employee_id, patient_id)}} for assignments starting on each YYYY-MM-DD date.
+
+        Dates are cached until the next assignment write, so repeated checks cost no queries.
+        """
+        dates = set(dates)
+        if self._pairs_by_date_version != self._assignments_version:
+            self._pairs_by_date = {}
+            self._pairs_by_date_version = self._assignments_version
+        missing = [d for d in dates if d not in self._pairs_by_date]
+        if missing:
+            for d in missing:
+                self._pairs_by_date[d] = set()
+            cursor = self.conn.cursor()
+            cursor.execute(
+                f"SELECT employee_id, patient_id, DATE(start_time) FROM assignments WHERE DATE(start_time) IN ({','.join('?' * len(missing))})",
+                missing
+            )
+            for employee_id, patient_id, day in cursor.fetchall():
+                self._pairs_by_date[day].add((employee_id, patient_id))
+        return {d: self._pairs_by_date[d] for d in dates}
+
+    def get_table_columns(self, table: str) -> set:
+        """Column names of a table (cached; schema only changes at startup)"""
+        if table not in self._table_columns:
+            cursor = self.conn.cursor()
+            cursor.execute(f"PRAGMA table_info({table})")
+            self._table_columns[table] = {row[1] for row in cursor.fetchall()}
+        return self._table_columns[table]
+
+    def _iter_table(self, table: str, default_order: str, where_sql: str = "", params: List[Any] = None,
+                    order_by: str = None, limit: int = None, offset: int = None) -> Iterator[Dict]:
+        """Yield rows of SELECT * as dicts straight off the cursor.
+
+        where_sql must only contain placeholders for values; order_by is a trusted
+        "column [ASC|DESC]" fragment built by the caller.
+        """
+        sql = f"SELECT * FROM {table}"
+        params = list(params or [])
+        if where_sql:
+            sql += f" WHERE {where_sql}"
+        sql += f" ORDER BY {order_by or default_order}"
+        if limit is not None or offset is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit if limit is not None else -1, offset or 0])
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def _query_table(self, table: str, default_order: str, where_sql: str = "", params: List[Any] = None,
+                     order_by: str = None, limit: int = None, offset: int = None) -> List[Dict]:
+        """SELECT * with an optional parameterized WHERE clause, ordering and paging (see _iter_table)"""
+        return list(self._iter_table(table, default_order, where_sql, params, order_by, limit, offset))
+
+    def query_assignments(self, where_sql: str = "", params: List[Any] = None, order_by: str = None,
+                          limit: int = None, offset: int = None) -> List[Dict]:
+        """Assignments matching a WHERE clause (newest first by default)"""
+        return self._query_table("assignments", "created_at DESC", where_sql, params, order_by, limit, offset)
+
+    def query_employees(self, where_sql: str = "", params: List[Any] = None, order_by: str = None,
+                        limit: int = None, offset: int = None) -> List[Dict]:
+        """Employees matching a WHERE clause (by employee_id by default)"""
+        return self._query_table("employees", "employee_id", where_sql, params, order_by, limit, offset)
+
+    def query_patients(self, where_sql: str = "", params: List[Any] = None, order_by: str = None,
+                       limit: int = None, offset: int = None) -> List[Dict]:
+        """Patients matching a WHERE clause (by patient_id by default)"""
+        return self._query_table("patients", "patient_id", where_sql, params, order_by, limit, offset)
+
+    def iter_assignments(self, where_sql: str = "", params: List[Any] = None, order_by: str = None) -> Iterator[Dict]:
+        """Lazy query_assignments: rows are built one at a time as the caller consumes them"""
+        return self._iter_table("assignments", "created_at DESC", where_sql, params, order_by)
+
+    def iter_employees(self, where_sql: str = "", params: List[Any] = None, order_by: str = None) -> Iterator[Dict]:
+        """Lazy query_employees"""
+        return self._iter_table("employees", "employee_id", where_sql, params, order_by)
+
+    def iter_patients(self, where_sql: str = "", params: List[Any] = None, order_by: str = None) -> Iterator[Dict]:
+        """Lazy query_patients"""
+        return self._iter_table("patients", "patient_id", where_sql, params, order_by)
     
     def update_assignment(self, assignment_id: int, updates: Dict[str, Any]) -> bool:
         """Update an existing assignment in the database"""
@@ -413,6 +671,7 @@ class DatabaseManager:
             
             cursor.execute(query, values)
             self.conn.commit()
+            self.invalidate_assignment_indexes()
             
             updated_rows = cursor.rowcount
             logger.info(f"Updated assignment {assignment_id}: {updated_rows} rows affected")
@@ -428,6 +687,7 @@ class DatabaseManager:
             cursor = self.conn.cursor()
             cursor.execute("DELETE FROM assignments WHERE id = ?", (assignment_id,))
             self.conn.commit()
+            self.invalidate_assignment_indexes()
             
             deleted_rows = cursor.rowcount
             logger.info(f"Deleted assignment {assignment_id}: {deleted_rows} rows affected")
@@ -450,6 +710,21 @@ class DatabaseManager:
             logger.error(f"Error fetching assignment {assignment_id}: {str(e)}")
             return None
 
+    def get_assignments_by_ids(self, assignment_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Fetch several assignments in one query, keyed by id"""
+        ids = list(dict.fromkeys(assignment_ids))
+        if not ids:
+            return {}
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT * FROM assignments WHERE id IN ({','.join('?' * len(ids))})", ids)
+            columns = [col[0] for col in cursor.description]
+            rows = (dict(zip(columns, row)) for row in cursor.fetchall())
+            return {row['id']: row for row in rows}
+        except Exception as e:
+            logger.error(f"Error fetching assignments {ids}: {str(e)}")
+            return {}
+
     def get_logs(self) -> List[Dict]:
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM operations_log ORDER BY created_at DESC")
@@ -502,6 +777,32 @@ class DatabaseManager:
             return False
 
     # Notification methods
+    def get_ai_summary(self, key: str, min_fetched_at: int = 0) -> Optional[Dict[str, str]]:
+        """Cached {'summary', 'suggestions'} for key if fetched at or after min_fetched_at (unix seconds)"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT summary, suggestions FROM stats_ai_cache WHERE key = ? AND fetched_at >= ?",
+                (key, min_fetched_at)
+            )
+            row = cursor.fetchone()
+            return {"summary": row[0] or "", "suggestions": row[1] or ""} if row else None
+        except Exception as e:
+            logger.error(f"Error reading AI summary cache: {e}")
+            return None
+
+    def save_ai_summary(self, key: str, summary: str, suggestions: str) -> bool:
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO stats_ai_cache (key, summary, suggestions, fetched_at) VALUES (?, ?, ?, ?)",
+                    (key, summary, suggestions, int(time.time()))
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving AI summary cache: {e}")
+            return False
+
     def create_notification(self, notification_id: str, notification_type: str, title: str, message: str, action_type: str = None, action_data: Dict = None) -> bool:
         """Create a new notification"""
         try:
@@ -516,7 +817,7 @@ class DatabaseManager:
                 title,
                 message,
                 action_type,
-                json.dumps(action_data) if action_data else None
+                _json_dumps(action_data) if action_data else None
             ))
             self.conn.commit()
             logger.info(f"Created notification: {notification_id}")
@@ -525,6 +826,32 @@ class DatabaseManager:
             logger.error(f"Error creating notification: {e}")
             return False
 
+    def bulk_insert_notifications(self, notifications: List[Dict[str, Any]]) -> bool:
+        """Insert many notifications with one executemany in a single transaction"""
+        try:
+            rows = [
+                (
+                    n['notification_id'],
+                    n['notification_type'],
+                    n['title'],
+                    n['message'],
+                    n.get('action_type'),
+                    _json_dumps(n['action_data']) if n.get('action_data') else None
+                )
+                for n in notifications
+            ]
+            with self.conn:
+                self.conn.executemany('''
+                    INSERT INTO notifications (
+                        notification_id, type, title, message, action_type, action_data
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+            logger.info(f"Created {len(rows)} notifications")
+            return True
+        except Exception as e:
+            logger.error(f"Error creating notifications: {e}")
+            return False
+
     def get_notifications(self, include_deleted: bool = False, limit: int = 50) -> List[Dict]:
         """Get notifications with optional filtering"""
         cursor = self.conn.cursor()
@@ -550,7 +877,7 @@ class DatabaseManager:
         for notification in notifications:
             if notification.get('action_data'):
                 try:
-                    notification['action_data'] = json.loads(notification['action_data'])
+                    notification['action_data'] = _json_loads(notification['action_data'])
                 except:
                     notification['action_data'] = None
         
@@ -648,8 +975,84 @@ class DatabaseManager:
         cursor.execute("DELETE FROM data_uploads")
         cursor.execute("DELETE FROM notifications")
         self.conn.commit()
+        self.invalidate_assignment_indexes()
         logger.info("Cleared all data from database")
 
+    def reset_assignments(self):
+        """Delete every assignment in one transaction (for testing/reset)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM assignments")
+        self.invalidate_assignment_indexes()
+        logger.info("Cleared all assignments from database")
+
+    def get_travel_cache(self, min_fetched_at: int = 0, min_failed_at: int = 0) -> List[tuple]:
+        """
+        (origin, dest, mode, slot, minutes, status, fetched_at) rows still within their TTL:
+        'OK' rows fetched at or after min_fetched_at, 'FAIL' rows at or after min_failed_at (unix seconds)
+        """
+        try:
+            with self._travel_lock:
+                cursor = self._travel_conn.execute(
+                    "SELECT origin, dest, mode, slot, minutes, status, fetched_at FROM travel_cache "
+                    "WHERE fetched_at >= CASE status WHEN 'FAIL' THEN ? ELSE ? END",
+                    (min_failed_at, min_fetched_at)
+                )
+                return [tuple(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error loading travel cache: {e}")
+            return []
+
+    def get_travel_times(self, keys: List[tuple], min_fetched_at: int = 0, min_failed_at: int = 0) -> List[tuple]:
+        """
+        get_travel_cache rows for just the given (origin, dest, mode, slot) keys. Each statement joins
+        up to TRAVEL_KEYS_PER_QUERY keys (a VALUES list) against the primary key index
+        """
+        try:
+            rows = []
+            with self._travel_lock:
+                cursor = self._travel_conn.cursor()
+                for start in range(0, len(keys), TRAVEL_KEYS_PER_QUERY):
+                    chunk = keys[start:start + TRAVEL_KEYS_PER_QUERY]
+                    # CROSS JOIN keeps the key list as the outer loop, so each key is one index lookup
+                    cursor.execute(
+                        f"WITH wanted(origin, dest, mode, slot) AS (VALUES {','.join(['(?, ?, ?, ?)'] * len(chunk))}) "
+                        "SELECT t.origin, t.dest, t.mode, t.slot, t.minutes, t.status, t.fetched_at "
+                        "FROM wanted CROSS JOIN travel_cache t "
+                        "ON t.origin = wanted.origin AND t.dest = wanted.dest AND t.mode = wanted.mode AND t.slot = wanted.slot "
+                        "WHERE t.fetched_at >= CASE t.status WHEN 'FAIL' THEN ? ELSE ? END",
+                        [value for key in chunk for value in key] + [min_failed_at, min_fetched_at]
+                    )
+                    rows.extend(tuple(row) for row in cursor.fetchall())
+            return rows
+        except Exception as e:
+            logger.error(f"Error loading travel times: {e}")
+            return []
+
+    def save_travel_times(self, rows: List[tuple], fetched_at: int) -> bool:
+        """Upsert (origin, dest, mode, slot, minutes, status) rows in one transaction"""
+        if not rows:
+            return True
+        try:
+            with self._travel_lock, self._travel_conn:
+                self._travel_conn.executemany(
+                    "INSERT OR REPLACE INTO travel_cache (origin, dest, mode, slot, minutes, status, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(*row, fetched_at) for row in rows]
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving travel times: {e}")
+            return False
+
+    def clear_travel_cache(self) -> bool:
+        try:
+            with self._travel_lock, self._travel_conn:
+                self._travel_conn.execute("DELETE FROM travel_cache")
+            logger.info("Cleared travel cache")
+            return True
+        except Exception as e:
+            logger.error(f"Error clearing travel cache: {e}")
+            return False
+
     def clear_employees(self):
         try:
             cursor = self.conn.cursor()
@@ -685,6 +1088,7 @@ class DatabaseManager:
             return False
 
     def close(self):
+        self._travel_conn.close()
         self.conn.close() 
 
     # --- Scheduling helpers ---
@@ -729,6 +1133,86 @@ class DatabaseManager:
             logger.error(f"Error checking overlap for employee {employee_id}: {e}")
             return False
 
+    def get_overlap_map(self, employee_ids: Optional[Iterable[str]], start_iso: str, end_iso: str) -> Dict[str, bool]:
+        """Batch form of has_overlap_for_employee: {employee_id: True} for every employee with an
+        assignment overlapping the interval, in one query. employee_ids=None checks all employees.
+        """
+        try:
+            try:
+                new_start = datetime.fromisoformat(start_iso)
+                new_end = datetime.fromisoformat(end_iso)
+            except Exception:
+                # If the proposed times aren't ISO, fail-safe to no-overlap
+                return {}
+
+            # Day-level pre-filter in SQL; non-ISO rows have NULL DATE() and were skipped anyway
+            sql = "SELECT employee_id, start_time, end_time FROM assignments WHERE DATE(start_time) <= DATE(?) AND DATE(end_time) >= DATE(?)"
+            params: List[Any] = [end_iso, start_iso]
+            if employee_ids is not None:
+                employee_ids = list(employee_ids)
+                if not employee_ids:
+                    return {}
+                sql += f" AND employee_id IN ({','.join('?' * len(employee_ids))})"
+                params.extend(employee_ids)
+
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            overlaps: Dict[str, bool] = {}
+            for employee_id, existing_start_raw, existing_end_raw in cursor.fetchall():
+                if employee_id in overlaps or not existing_start_raw or not existing_end_raw:
+                    continue
+                try:
+                    existing_start = datetime.fromisoformat(existing_start_raw)
+                    existing_end = datetime.fromisoformat(existing_end_raw)
+                except Exception:
+                    continue
+                if not (existing_end <= new_start or existing_start >= new_end):
+                    overlaps[employee_id] = True
+            return overlaps
+        except Exception as e:
+            logger.error(f"Error building overlap map: {e}")
+            return {}
+
+    def get_employees_assigned_on_date(self, date_iso: str) -> Set[str]:
+        """IDs of employees with at least one assignment on the date of date_iso"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT DISTINCT employee_id FROM assignments WHERE DATE(start_time) = DATE(?)",
+                (date_iso,)
+            )
+            return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error fetching employees assigned on date: {e}")
+            return set()
+
+    def get_day_assignments_by_employee(self, date_iso: str) -> Dict[str, List[tuple]]:
+        """{employee_id: [(start, end, patient_id), ...]} for ISO assignments touching the date, sorted by start.
+
+        start/end are datetimes; non-ISO (legacy HH:MM) rows are skipped as in has_overlap_for_employee.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT employee_id, patient_id, start_time, end_time FROM assignments "
+                "WHERE DATE(start_time) <= DATE(?) AND DATE(end_time) >= DATE(?)",
+                (date_iso, date_iso)
+            )
+            by_employee: Dict[str, List[tuple]] = {}
+            for employee_id, patient_id, start_raw, end_raw in cursor.fetchall():
+                try:
+                    start = datetime.fromisoformat(start_raw)
+                    end = datetime.fromisoformat(end_raw)
+                except Exception:
+                    continue
+                by_employee.setdefault(employee_id, []).append((start, end, patient_id))
+            for intervals in by_employee.values():
+                intervals.sort(key=lambda interval: interval[0])
+            return by_employee
+        except Exception as e:
+            logger.error(f"Error fetching day assignments: {e}")
+            return {}
+
     def has_employee_patient_assignment_on_date(self, employee_id: str, patient_id: str, date_iso: str) -> bool:
         """Check if an employee already has an assignment with the patient on the given date.
 
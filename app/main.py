@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from typing import List, Optional
 import os
 import asyncio
+import logging
 import uuid
 import io
 from datetime import datetime
@@ -23,6 +24,8 @@ from .models.schemas import RotaRequest, RotaResponse, EmployeeAssignment, Assig
 from .models.filter_schemas import FilterConfig, FilterGroup, FilterCondition
 from .database import DatabaseManager
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="AI Rota System for Healthcare",
     description="An AI-powered system for assigning healthcare employees to patients based on various rules and constraints",
@@ -42,7 +45,7 @@ app.add_middleware(
 db_manager = DatabaseManager()
 data_processor = DataProcessor(db_manager)
 openai_service = OpenAIService()
-travel_service = TravelService()
+travel_service = TravelService(db_manager)
 rota_service = RotaService(data_processor, openai_service, db_manager, travel_service)
 notification_service = NotificationService(db_manager)
 filter_service = FilterService(db_manager)
@@ -53,8 +56,7 @@ stats_service = StatsService(db_manager, openai_service)
 try:
     maps_status = travel_service.check_connectivity()
     ai_status = openai_service.check_connectivity()
-    import logging
-    logging.getLogger(__name__).info(f"Startup checks - Google Maps: {maps_status}, OpenAI: {ai_status}")
+    logger.info("Startup checks - Google Maps: %s, OpenAI: %s", maps_status, ai_status)
     db_manager.log_operation("startup_health", "Third-party connectivity checks", {
         "google_maps": maps_status,
         "openai": ai_status
@@ -65,6 +67,38 @@ except Exception:
 # Update progress service with notification service
 progress_service.notification_service = notification_service
 
+@app.on_event("startup")
+async def start_progress_cleanup():
+    """Sweep finished progress tasks in the background"""
+    progress_service.start_periodic_cleanup()
+
+@app.on_event("startup")
+async def warm_travel_matrices():
+    """Precompute travel matrices for the loaded staff and patients without delaying startup"""
+    def warm():
+        try:
+            rota_service.scheduler_core.warmup_travel()
+        except Exception as e:
+            logger.warning("Travel warmup failed: %s", e)
+    asyncio.get_running_loop().run_in_executor(None, warm)
+
+@app.on_event("shutdown")
+async def stop_progress_cleanup():
+    progress_service.stop_periodic_cleanup()
+
+@app.on_event("shutdown")
+async def flush_operation_log():
+    """Write operations_log rows still queued by an interrupted run"""
+    try:
+        db_manager.flush_operation_log()
+    except Exception as e:
+        logger.warning("Failed to flush operation log: %s", e)
+
+@app.on_event("shutdown")
+async def close_travel_service():
+    travel_service.close()
+    await travel_service.aclose()
+
 # Ensure input_files directory exists
 INPUT_FILES_DIR = Path("input_files")
 INPUT_FILES_DIR.mkdir(exist_ok=True)
@@ -239,15 +273,23 @@ async def save_filter_config(page: str, config: FilterConfig):
         raise HTTPException(status_code=500, detail=f"Error saving filter config: {str(e)}")
 
 @app.post("/filters/apply/{page}")
-async def apply_filters(page: str, filters: List[FilterGroup]):
+async def apply_filters(
+    page: str,
+    filters: List[FilterGroup],
+    sort_by: Optional[str] = Query(None, description="Column to sort by"),
+    sort_order: str = Query("asc", description="asc or desc"),
+    page_size: Optional[int] = Query(None, ge=1, description="Rows per page; omit for all rows"),
+    page_number: int = Query(1, ge=1),
+):
     """Apply filters to data for a specific page"""
     try:
+        paging = dict(sort_by=sort_by, sort_order=sort_order, page_size=page_size, page_number=page_number)
         if page == "assignments":
-            filtered_data = filter_service.apply_filters_to_assignments(filters)
+            filtered_data = filter_service.apply_filters_to_assignments(filters, **paging)
         elif page == "employees":
-            filtered_data = filter_service.apply_filters_to_employees(filters)
+            filtered_data = filter_service.apply_filters_to_employees(filters, **paging)
         elif page == "patients":
-            filtered_data = filter_service.apply_filters_to_patients(filters)
+            filtered_data = filter_service.apply_filters_to_patients(filters, **paging)
         else:
             raise HTTPException(status_code=400, detail="Invalid page")
         
@@ -490,6 +532,7 @@ async def bulk_delete_assignments(request: BulkDeleteRequest):
         if request.mode == "all":
             cursor.execute("DELETE FROM assignments")
             db_manager.conn.commit()
+            db_manager.invalidate_assignment_indexes()
             return {"success": True, "deleted": cursor.rowcount}
 
         elif request.mode == "selected":
@@ -498,6 +541,7 @@ async def bulk_delete_assignments(request: BulkDeleteRequest):
             placeholders = ",".join(["?"] * len(request.ids))
             cursor.execute(f"DELETE FROM assignments WHERE id IN ({placeholders})", tuple(request.ids))
             db_manager.conn.commit()
+            db_manager.invalidate_assignment_indexes()
             return {"success": True, "deleted": cursor.rowcount}
 
         elif request.mode == "filtered":
@@ -509,6 +553,7 @@ async def bulk_delete_assignments(request: BulkDeleteRequest):
             placeholders = ",".join(["?"] * len(ids))
             cursor.execute(f"DELETE FROM assignments WHERE id IN ({placeholders})", tuple(ids))
             db_manager.conn.commit()
+            db_manager.invalidate_assignment_indexes()
             return {"success": True, "deleted": cursor.rowcount}
 
         else:
@@ -876,4 +921,5 @@ async def reload_from_database():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # Progress frames are compressed once per broadcast (see progress_service), not per socket
+    uvicorn.run(app, host="0.0.0.0", port=8000, ws_per_message_deflate=False) 
\ No newline at end of file
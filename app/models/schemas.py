@@ -1,3 +1,4 @@
+from functools import cached_property
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, time
@@ -66,6 +67,11 @@ class Employee(BaseModel):
     current_assignments: int = Field(default=0, description="Current number of assignments")
     specializations: List[str] = Field(default=[], description="Employee specializations")
 
+    @cached_property
+    def full_address(self) -> str:
+        """Address with the postcode appended when it isn't already part of it (built once per object)"""
+        return f"{self.Address}, {self.PostCode}" if self.PostCode and self.PostCode not in self.Address else self.Address
+
 class Patient(BaseModel):
     PatientID: str = Field(..., alias="PatientID")
     PatientName: str = Field(..., alias="PatientName")
@@ -97,6 +103,11 @@ class Patient(BaseModel):
     @property
     def location(self) -> str:
         return self.Address
+
+    @cached_property
+    def full_address(self) -> str:
+        """Address with the postcode appended when it isn't already part of it (built once per object)"""
+        return f"{self.Address}, {self.PostCode}" if self.PostCode and self.PostCode not in self.Address else self.Address
     
     @property
     def preferred_language(self) -> str:
@@ -134,6 +145,7 @@ class EmployeeAssignment(BaseModel):
     end_time: str
     priority_score: float
     assignment_reason: str
+    db_id: Optional[int] = None  # assignments.id once persisted
 
 class AssignmentUpdateRequest(BaseModel):
     employee_id: Optional[str] = None
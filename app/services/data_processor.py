@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from pathlib import Path
 import logging
 from datetime import datetime, time
@@ -9,12 +10,59 @@ from ..database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+
+def _clock_minutes(value: str, default: int) -> int:
+    """'HH[:MM]' -> minutes since midnight, or default when blank/invalid"""
+    try:
+        if not value:
+            return default
+        parts = value.strip().split(":")
+        hour = int(parts[0])
+        minute = int(parts[1]) if len(parts) > 1 else 0
+        time(hour, minute)  # range check
+        return hour * 60 + minute
+    except Exception:
+        return default
+
+def _visit_service_type(support: str) -> ServiceType:
+    """Service a scheduled visit covers, from a lower-cased RequiredSupport string"""
+    if "medicine" in support:
+        return ServiceType.MEDICINE
+    if "exercise" in support:
+        return ServiceType.EXERCISE
+    if "compan" in support:
+        return ServiceType.COMPANIONSHIP
+    return ServiceType.PERSONAL_CARE
+
+
+# Default visit length per service, used when a patient record gives no duration
+_DEFAULT_SERVICE_MINUTES: Dict[ServiceType, int] = {
+    ServiceType.MEDICINE: 30,
+    ServiceType.PERSONAL_CARE: 45,
+    ServiceType.EXERCISE: 30,
+    ServiceType.COMPANIONSHIP: 60,
+}
+
+
 class DataProcessor:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.employees: List[Employee] = []
         self.patients: List[Patient] = []
         self.data_loaded = False
+        # Shift bounds aligned with self.employees, rebuilt when the list is replaced
+        self._shift_minutes: Tuple[np.ndarray, np.ndarray] = (np.empty(0), np.empty(0))
+        self._shift_minutes_source: Optional[List[Employee]] = None
+        # Per-patient scheduling attributes aligned with self.patients (structure of arrays)
+        self._patient_arrays: Tuple[np.ndarray, np.ndarray] = (np.empty(0, dtype=bool), np.empty(0, dtype=object))
+        self._patient_visits: Tuple[List[ServiceType], List[int]] = ([], [])
+        self._patient_arrays_source: Optional[List[Patient]] = None
+        # ID lookups with the (list, length) they were built from, rebuilt when the list is replaced or grown.
+        # The list itself is kept (not its id()), so a replacement can't be mistaken for it
+        self._employees_by_id: Dict[str, Employee] = {}
+        self._employees_by_id_source: Tuple[Optional[List[Employee]], int] = (None, 0)
+        self._patients_by_id: Dict[str, Patient] = {}
+        self._patients_by_id_source: Tuple[Optional[List[Patient]], int] = (None, 0)
         # Try to load existing data from database
         self._load_from_database()
     
@@ -646,17 +694,64 @@ class DataProcessor:
     
     def get_employee_by_id(self, employee_id: str) -> Optional[Employee]:
         """Get employee by ID"""
-        for emp in self.employees:
-            if emp.EmployeeID == employee_id:
-                return emp
-        return None
+        source, size = self._employees_by_id_source
+        if source is not self.employees or size != len(self.employees):
+            self._employees_by_id = {}
+            for emp in self.employees:
+                # First match wins, as with the old linear scan
+                self._employees_by_id.setdefault(emp.EmployeeID, emp)
+            self._employees_by_id_source = (self.employees, len(self.employees))
+        return self._employees_by_id.get(employee_id)
     
+    def get_shift_minutes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(earliest, latest) shift bounds in minutes since midnight, index-aligned with self.employees"""
+        if self._shift_minutes_source is not self.employees:
+            self._shift_minutes = (
+                np.array([_clock_minutes(emp.EarliestStart, 9 * 60) for emp in self.employees], dtype=np.int32),
+                np.array([_clock_minutes(emp.LatestEnd, 17 * 60) for emp in self.employees], dtype=np.int32),
+            )
+            self._shift_minutes_source = self.employees
+        return self._shift_minutes
+
+    def get_patient_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(requires_nurse, language) index-aligned with self.patients.
+
+        language is the lower-cased preference, '' when English (which every employee is assumed to speak).
+        """
+        self._refresh_patient_arrays()
+        return self._patient_arrays
+
+    def get_patient_visit_defaults(self) -> Tuple[List[ServiceType], List[int]]:
+        """(service type, default minutes) of a scheduled visit, index-aligned with self.patients"""
+        self._refresh_patient_arrays()
+        return self._patient_visits
+
+    def _refresh_patient_arrays(self):
+        if self._patient_arrays_source is self.patients:
+            return
+        # RequiredSupport is lower-cased once per patient; every flag below is derived from that
+        supports = [(p.RequiredSupport or "").lower() for p in self.patients]
+        languages = [(p.LanguagePreference or "English").strip().lower() for p in self.patients]
+        service_types = [_visit_service_type(support) for support in supports]
+        self._patient_arrays = (
+            np.array(["medicine" in support for support in supports], dtype=bool),
+            np.array(["" if lang == "english" else lang for lang in languages], dtype=object),
+        )
+        self._patient_visits = (
+            service_types,
+            [self.get_default_service_duration(service_type) for service_type in service_types],
+        )
+        self._patient_arrays_source = self.patients
+
     def get_patient_by_id(self, patient_id: str) -> Optional[Patient]:
         """Get patient by ID"""
-        for pat in self.patients:
-            if pat.PatientID == patient_id:
-                return pat
-        return None
+        source, size = self._patients_by_id_source
+        if source is not self.patients or size != len(self.patients):
+            self._patients_by_id = {}
+            for pat in self.patients:
+                self._patients_by_id.setdefault(pat.PatientID, pat)
+            self._patients_by_id_source = (self.patients, len(self.patients))
+        return self._patients_by_id.get(patient_id)
     
     def get_qualified_employees_for_service(self, service_type: ServiceType) -> List[Employee]:
         """Get employees qualified for a specific service type"""
@@ -680,13 +775,7 @@ class DataProcessor:
 
     def get_default_service_duration(self, service_type: ServiceType) -> int:
         """Default minutes per service when not otherwise specified."""
-        defaults = {
-            ServiceType.MEDICINE: 30,
-            ServiceType.PERSONAL_CARE: 45,
-            ServiceType.EXERCISE: 30,
-            ServiceType.COMPANIONSHIP: 60,
-        }
-        return defaults.get(service_type, 30)
+        return _DEFAULT_SERVICE_MINUTES.get(service_type, 30)
 
     def derive_patient_daily_demand(self, patient: Patient) -> int:
         """Estimate daily minutes of support required for a patient.
@@ -1,5 +1,6 @@
 import openpyxl
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.formatting.rule import FormulaRule
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.worksheet.worksheet import Worksheet
 from typing import List, Dict, Any
@@ -7,8 +8,64 @@ import io
 from datetime import datetime
 import logging
 
+import numpy as np
+
+try:
+    import xlsxwriter
+except ImportError:  # openpyxl path below remains the fallback
+    xlsxwriter = None
+
+from .fast_xlsx import write_fast_xlsx
+
 logger = logging.getLogger(__name__)
 
+# Exports at or above this many rows (all sheets) skip the styled writers
+FAST_XLSX_MIN_ROWS = 5000
+
+ASSIGNMENT_HEADERS = [
+    "Assignment ID", "Employee ID", "Employee Name", "Patient ID", "Patient Name",
+    "Service Type", "Assigned Time", "Start Time", "End Time", "Duration (mins)",
+    "Travel Time (mins)", "Priority Score", "Assignment Reason", "Status"
+]
+
+PATIENT_HEADERS = [
+    "Patient ID", "Patient Name", "Address", "Post Code", "Gender", "Ethnicity", "Religion",
+    "Required Support", "Required Hours", "Additional Requirements", "Illness",
+    "Contact Number", "Requires Medication", "Emergency Contact", "Emergency Relation",
+    "Language Preference", "Notes", "Assignment Status", "Assigned Employee", "Service Type"
+]
+
+EMPLOYEE_HEADERS = [
+    "Employee ID", "Name", "Address", "Post Code", "Gender", "Ethnicity", "Religion",
+    "Transport Mode", "Qualification", "Languages Spoken", "Certificate Expiry",
+    "Earliest Start", "Latest End", "Shifts", "Contact Number", "Notes",
+    "Current Assignments", "Max Patients/Day", "Workload %", "Availability Status",
+    "Assigned Patients", "Total Working Hours", "Total Travel Time"
+]
+
+# Conditional formatting for the openpyxl sheets: (first column, last column, condition on row 2, color key)
+ASSIGNMENT_FORMAT_RULES = [
+    ("L", "L", "$L2>=8", 'priority_high'),
+    ("L", "L", "AND($L2>=6,$L2<8)", 'priority_medium'),
+    ("L", "L", "$L2<6", 'priority_low'),
+]
+
+PATIENT_FORMAT_RULES = [
+    ("R", "R", '$R2="Assigned"', 'assigned'),
+    ("R", "R", '$R2<>"Assigned"', 'unassigned'),
+]
+
+EMPLOYEE_FORMAT_RULES = [
+    ("S", "T", '$T2="Fully Booked"', 'unavailable'),
+    ("S", "T", '$T2="Limited Availability"', 'priority_medium'),
+    ("S", "S", '$T2="Moderate Availability"', 'available'),
+    ("T", "T", '$T2="Moderate Availability"', 'priority_low'),
+    ("S", "T", '$T2="Available"', 'available'),
+]
+
+# Indexed by np.digitize(workload %, [50, 80, 100])
+AVAILABILITY_STATUSES = ("Available", "Moderate Availability", "Limited Availability", "Fully Booked")
+
 class ExcelExportService:
     def __init__(self):
         # Define color schemes for highlighting
@@ -33,7 +90,8 @@ class ExcelExportService:
 
     def export_assignments_data(self, assignments: List[Dict], patients: List[Dict], employees: List[Dict]) -> bytes:
         """
-        Export assignments data to Excel with three sheets:
+        Export assignments data to Excel with three sheets (items are expected to be dicts;
+        anything else is dropped before the sheets are built):
         1. Assignments - All current assignments
         2. Patients - All patients with assignment status
         3. Employees - All employees with availability and workload
@@ -51,7 +109,28 @@ class ExcelExportService:
             if not isinstance(employees, list):
                 logger.warning("Employees is not a list, converting to empty list")
                 employees = []
+
+            # Row builders assume dicts; drop anything else once here instead of per row
+            assignments = [a for a in assignments if isinstance(a, dict)]
+            patients = [p for p in patients if isinstance(p, dict)]
+            employees = [e for e in employees if isinstance(e, dict)]
             
+            logger.info("Building sheet rows...")
+            assignment_rows, patient_rows, employee_rows = self._build_sheet_rows(assignments, patients, employees)
+
+            total_rows = len(assignment_rows) + len(patient_rows) + len(employee_rows)
+            if total_rows >= FAST_XLSX_MIN_ROWS:
+                logger.info(f"Creating Excel workbook (streaming XML, {total_rows} rows)...")
+                result = self._fast_xlsx_export(assignment_rows, patient_rows, employee_rows)
+                logger.info(f"Excel export completed successfully. Size: {len(result)} bytes")
+                return result
+
+            if xlsxwriter is not None:
+                logger.info("Creating Excel workbook (xlsxwriter)...")
+                result = self._xlsxwriter_export(assignment_rows, patient_rows, employee_rows)
+                logger.info(f"Excel export completed successfully. Size: {len(result)} bytes")
+                return result
+
             logger.info("Creating Excel workbook...")
             
             # Create a new workbook
@@ -61,16 +140,16 @@ class ExcelExportService:
             wb.remove(wb.active)
             
             logger.info("Creating assignments sheet...")
-            # Create assignments sheet
-            self._create_assignments_sheet(wb, assignments)
+            self._create_sheet(wb, "Assignments", ASSIGNMENT_HEADERS, assignment_rows,
+                               ASSIGNMENT_FORMAT_RULES, "No assignments found")
             
             logger.info("Creating patients sheet...")
-            # Create patients sheet
-            self._create_patients_sheet(wb, patients, assignments)
+            self._create_sheet(wb, "Patients", PATIENT_HEADERS, patient_rows,
+                               PATIENT_FORMAT_RULES, "No patients found")
             
             logger.info("Creating employees sheet...")
-            # Create employees sheet
-            self._create_employees_sheet(wb, employees, assignments)
+            self._create_sheet(wb, "Employees", EMPLOYEE_HEADERS, employee_rows,
+                               EMPLOYEE_FORMAT_RULES, "No employees found")
             
             logger.info("Saving workbook to bytes...")
             # Save to bytes
@@ -89,177 +168,263 @@ class ExcelExportService:
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise Exception(f"Failed to export Excel data: {str(e)}")
 
-    def _create_assignments_sheet(self, wb: openpyxl.Workbook, assignments: List[Dict]):
-        """Create the assignments sheet with detailed assignment information"""
-        ws = wb.create_sheet("Assignments")
-        
-        # Define headers
-        headers = [
-            "Assignment ID", "Employee ID", "Employee Name", "Patient ID", "Patient Name",
-            "Service Type", "Assigned Time", "Start Time", "End Time", "Duration (mins)",
-            "Travel Time (mins)", "Priority Score", "Assignment Reason", "Status"
-        ]
-        
-        # Add headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.fill = self.colors['header']
-            cell.font = self.colors['header_font']
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = self.colors['border']
-        
-        # Add data rows
-        if assignments:
-            for row, assignment in enumerate(assignments, 2):
-                if not isinstance(assignment, dict):
-                    continue
-                    
-                # Determine status based on assignment data
-                status = "Active" if assignment.get('assigned_time') else "Pending"
-                
-                # Field compatibility across DB and legacy objects
-                duration_value = assignment.get('duration') if assignment.get('duration') is not None else assignment.get('estimated_duration', 0)
-                reasoning_value = assignment.get('reasoning') if assignment.get('reasoning') is not None else assignment.get('assignment_reason', '')
-
-                row_data = [
-                    f"ASG{row-1:04d}",
-                    assignment.get('employee_id', ''),
-                    assignment.get('employee_name', ''),
-                    assignment.get('patient_id', ''),
-                    assignment.get('patient_name', ''),
-                    assignment.get('service_type', ''),
-                    assignment.get('assigned_time', ''),
-                    assignment.get('start_time', ''),
-                    assignment.get('end_time', ''),
-                    duration_value,
-                    assignment.get('travel_time', 0),
-                    assignment.get('priority_score', 0),
-                    reasoning_value,
-                    status
-                ]
-                
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.border = self.colors['border']
-                    
-                    # Apply conditional formatting
-                    if col == 12:  # Priority Score column
-                        priority = assignment.get('priority_score', 0)
-                        if priority >= 8:
-                            cell.fill = self.colors['priority_high']
-                        elif priority >= 6:
-                            cell.fill = self.colors['priority_medium']
-                        else:
-                            cell.fill = self.colors['priority_low']
-                    
-                    # Alternate row colors
-                    if row % 2 == 0:
-                        cell.fill = self.colors['alternate_row']
-        else:
-            # Add a row indicating no assignments
-            ws.cell(row=2, column=1, value="No assignments found")
-            ws.cell(row=2, column=2, value="").fill = self.colors['alternate_row']
-        
-        # Auto-adjust column widths
-        self._auto_adjust_columns(ws)
+    def _build_sheet_rows(self, assignments: List[Dict], patients: List[Dict], employees: List[Dict]):
+        """Build the rows of all three sheets up front; writers then serialize them in order"""
+        # Pure-Python loops hold the GIL, so building them on threads would add overhead without overlap
+        return (
+            self._assignment_rows(assignments),
+            self._patient_rows(patients, assignments),
+            self._employee_rows(employees, assignments),
+        )
 
-    def _create_patients_sheet(self, wb: openpyxl.Workbook, patients: List[Dict], assignments: List[Dict]):
-        """Create the patients sheet with patient information and assignment status"""
-        ws = wb.create_sheet("Patients")
-        
-        # Define headers
-        headers = [
-            "Patient ID", "Patient Name", "Address", "Post Code", "Gender", "Ethnicity", "Religion",
-            "Required Support", "Required Hours", "Additional Requirements", "Illness",
-            "Contact Number", "Requires Medication", "Emergency Contact", "Emergency Relation",
-            "Language Preference", "Notes", "Assignment Status", "Assigned Employee", "Service Type"
-        ]
-        
-        # Add headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.fill = self.colors['header']
-            cell.font = self.colors['header_font']
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = self.colors['border']
-        
-        # Create assignment lookup
+    def _fast_xlsx_export(self, assignment_rows: List[List[Any]], patient_rows: List[List[Any]],
+                          employee_rows: List[List[Any]]) -> bytes:
+        """Stream the three sheets as raw XLSX XML; values only, header styling only"""
+        output = io.BytesIO()
+        write_fast_xlsx(output, [
+            ("Assignments", ASSIGNMENT_HEADERS, assignment_rows or [["No assignments found"]]),
+            ("Patients", PATIENT_HEADERS, patient_rows or [["No patients found"]]),
+            ("Employees", EMPLOYEE_HEADERS, employee_rows or [["No employees found"]]),
+        ])
+        return output.getvalue()
+
+    def _assignment_rows(self, assignments: List[Dict]) -> List[List[Any]]:
+        """Build the Assignments sheet rows as plain values"""
+        asg_ids = [f"ASG{i:04d}" for i in range(1, len(assignments) + 1)]
+        rows = []
+        for i, assignment in enumerate(assignments):
+            status = "Active" if assignment.get('assigned_time') else "Pending"
+
+            # Field compatibility across DB and legacy objects
+            duration_value = assignment.get('duration') if assignment.get('duration') is not None else assignment.get('estimated_duration', 0)
+            reasoning_value = assignment.get('reasoning') if assignment.get('reasoning') is not None else assignment.get('assignment_reason', '')
+
+            rows.append([
+                asg_ids[i],
+                assignment.get('employee_id', ''),
+                assignment.get('employee_name', ''),
+                assignment.get('patient_id', ''),
+                assignment.get('patient_name', ''),
+                assignment.get('service_type', ''),
+                assignment.get('assigned_time', ''),
+                assignment.get('start_time', ''),
+                assignment.get('end_time', ''),
+                duration_value,
+                assignment.get('travel_time', 0),
+                assignment.get('priority_score', 0),
+                reasoning_value,
+                status
+            ])
+        return rows
+
+    def _patient_rows(self, patients: List[Dict], assignments: List[Dict]) -> List[List[Any]]:
+        """Build the Patients sheet rows, including assignment status"""
         assignment_lookup = {}
         for assignment in assignments:
-            if isinstance(assignment, dict):
-                patient_id = assignment.get('patient_id')
-                if patient_id:
-                    assignment_lookup[patient_id] = assignment
-        
-        # Add data rows
-        if patients:
-            for row, patient in enumerate(patients, 2):
-                if not isinstance(patient, dict):
-                    continue
-                    
-                # Check assignment status
-                assignment = assignment_lookup.get(patient.get('patient_id', ''))
-                assignment_status = "Assigned" if assignment else "Unassigned"
-                assigned_employee = assignment.get('employee_name', '') if assignment else 'N/A'
-                service_type = assignment.get('service_type', '') if assignment else 'N/A'
-                
-                row_data = [
-                    patient.get('patient_id', ''),
-                    patient.get('patient_name', ''),
-                    patient.get('address', ''),
-                    patient.get('postcode', ''),
-                    patient.get('gender', ''),
-                    patient.get('ethnicity', ''),
-                    patient.get('religion', ''),
-                    patient.get('required_support', ''),
-                    patient.get('required_hours_of_support', 0),
-                    patient.get('additional_requirements', ''),
-                    patient.get('illness', ''),
-                    patient.get('contact_number', ''),
-                    patient.get('requires_medication', ''),
-                    patient.get('emergency_contact', ''),
-                    patient.get('emergency_relation', ''),
-                    patient.get('language_preference', ''),
-                    patient.get('notes', ''),
-                    assignment_status,
-                    assigned_employee,
-                    service_type
-                ]
-                
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.border = self.colors['border']
-                    
-                    # Apply conditional formatting for assignment status
-                    if col == 18:  # Assignment Status column
-                        if assignment_status == "Assigned":
-                            cell.fill = self.colors['assigned']
-                        else:
-                            cell.fill = self.colors['unassigned']
-                    
-                    # Alternate row colors
-                    if row % 2 == 0:
-                        cell.fill = self.colors['alternate_row']
-        else:
-            # Add a row indicating no patients
-            ws.cell(row=2, column=1, value="No patients found")
-            ws.cell(row=2, column=2, value="").fill = self.colors['alternate_row']
-        
-        # Auto-adjust column widths
-        self._auto_adjust_columns(ws)
+            patient_id = assignment.get('patient_id')
+            if patient_id:
+                assignment_lookup[patient_id] = assignment
 
-    def _create_employees_sheet(self, wb: openpyxl.Workbook, employees: List[Dict], assignments: List[Dict]):
-        """Create the employees sheet with employee information, availability, and workload"""
-        ws = wb.create_sheet("Employees")
-        
-        # Define headers
-        headers = [
-            "Employee ID", "Name", "Address", "Post Code", "Gender", "Ethnicity", "Religion",
-            "Transport Mode", "Qualification", "Languages Spoken", "Certificate Expiry",
-            "Earliest Start", "Latest End", "Shifts", "Contact Number", "Notes",
-            "Current Assignments", "Max Patients/Day", "Workload %", "Availability Status",
-            "Assigned Patients", "Total Working Hours", "Total Travel Time"
-        ]
+        rows = []
+        for patient in patients:
+            assignment = assignment_lookup.get(patient.get('patient_id', ''))
+            rows.append([
+                patient.get('patient_id', ''),
+                patient.get('patient_name', ''),
+                patient.get('address', ''),
+                patient.get('postcode', ''),
+                patient.get('gender', ''),
+                patient.get('ethnicity', ''),
+                patient.get('religion', ''),
+                patient.get('required_support', ''),
+                patient.get('required_hours_of_support', 0),
+                patient.get('additional_requirements', ''),
+                patient.get('illness', ''),
+                patient.get('contact_number', ''),
+                patient.get('requires_medication', ''),
+                patient.get('emergency_contact', ''),
+                patient.get('emergency_relation', ''),
+                patient.get('language_preference', ''),
+                patient.get('notes', ''),
+                "Assigned" if assignment else "Unassigned",
+                assignment.get('employee_name', '') if assignment else 'N/A',
+                assignment.get('service_type', '') if assignment else 'N/A'
+            ])
+        return rows
+
+    def _employee_rows(self, employees: List[Dict], assignments: List[Dict]) -> List[List[Any]]:
+        """Build the Employees sheet rows, including workload and availability"""
+        # Single pass over assignments: employee_id -> [count, duration minutes, travel minutes, patient names]
+        emp_stats = {}
+        for assignment in assignments:
+            employee_id = assignment.get('employee_id')
+            if employee_id:
+                stats = emp_stats.get(employee_id)
+                if stats is None:
+                    stats = emp_stats[employee_id] = [0, 0, 0, []]
+                stats[0] += 1
+                stats[1] += assignment.get('duration', 0) or 0
+                stats[2] += assignment.get('travel_time', 0) or 0
+                stats[3].append(assignment.get('patient_name', ''))
+
+        if not employees:
+            return []
+
+        empty_stats = (0, 0, 0, [])
+        stats_per_row = [emp_stats.get(e.get('employee_id', ''), empty_stats) for e in employees]
+        max_patients_per_row = [e.get('max_patients_per_day', 8) for e in employees]
+
+        # Workload, availability bucket and hours for every employee in one vectorized pass
+        counts = np.fromiter((s[0] for s in stats_per_row), dtype=np.float64, count=len(employees))
+        max_p = np.fromiter(max_patients_per_row, dtype=np.float64, count=len(employees))
+        dur_sum = np.fromiter((s[1] for s in stats_per_row), dtype=np.float64, count=len(employees))
+        workload = np.divide(counts * 100.0, max_p, out=np.zeros_like(counts), where=max_p > 0)
+        status_idx = np.digitize(workload, [50, 80, 100])
+        workload_text = [f"{w:.1f}%" for w in workload.tolist()]
+        hours_text = [f"{h:.1f}" for h in (dur_sum / 60).tolist()]
+
+        rows = []
+        for i, employee in enumerate(employees):
+            current_count, _, total_travel_time, names = stats_per_row[i]
+            assigned_patients = ', '.join(names) if names else 'None'
+
+            rows.append([
+                employee.get('employee_id', ''),
+                employee.get('name', ''),
+                employee.get('address', ''),
+                employee.get('postcode', ''),
+                employee.get('gender', ''),
+                employee.get('ethnicity', ''),
+                employee.get('religion', ''),
+                employee.get('transport_mode', ''),
+                employee.get('qualification', ''),
+                employee.get('language_spoken', ''),
+                employee.get('certificate_expiry_date', ''),
+                employee.get('earliest_start', ''),
+                employee.get('latest_end', ''),
+                employee.get('shifts', ''),
+                employee.get('contact_number', ''),
+                employee.get('notes', ''),
+                current_count,
+                max_patients_per_row[i],
+                workload_text[i],
+                AVAILABILITY_STATUSES[status_idx[i]],
+                assigned_patients,
+                hours_text[i],
+                f"{total_travel_time} mins"
+            ])
+        return rows
+
+    def _xlsxwriter_export(self, assignment_rows: List[List[Any]], patient_rows: List[List[Any]],
+                           employee_rows: List[List[Any]]) -> bytes:
+        """
+        Export the same three sheets as export_assignments_data using xlsxwriter.
+
+        constant_memory flushes each row as soon as the next one starts, so rows
+        must be written top to bottom (the sheet writers below already do).
+        'in_memory' is deliberately not set: xlsxwriter lets it override
+        constant_memory, so worksheets are streamed through temp files instead.
+        """
+        output = io.BytesIO()
+        wb = xlsxwriter.Workbook(output, {'constant_memory': True})
+        fmts = self._xlsxwriter_formats(wb)
+
+        logger.info("Creating assignments sheet...")
+        ws = wb.add_worksheet("Assignments")
+        self._xlsxwriter_write_sheet(ws, fmts, ASSIGNMENT_HEADERS, assignment_rows,
+                                     self._assignment_highlights, "No assignments found")
+
+        logger.info("Creating patients sheet...")
+        ws = wb.add_worksheet("Patients")
+        self._xlsxwriter_write_sheet(ws, fmts, PATIENT_HEADERS, patient_rows,
+                                     self._patient_highlights, "No patients found")
+
+        logger.info("Creating employees sheet...")
+        ws = wb.add_worksheet("Employees")
+        self._xlsxwriter_write_sheet(ws, fmts, EMPLOYEE_HEADERS, employee_rows,
+                                     self._employee_highlights, "No employees found")
+
+        logger.info("Saving workbook to bytes...")
+        wb.close()
+        return output.getvalue()
+
+    def _xlsxwriter_formats(self, wb) -> Dict[str, Any]:
+        """Build every Format object once per workbook (mirrors self.colors)"""
+        def fill(color: str) -> Any:
+            return wb.add_format({'bg_color': f'#{color}', 'border': 1})
+
+        return {
+            'header': wb.add_format({
+                'bg_color': '#366092', 'font_color': '#FFFFFF', 'bold': True,
+                'border': 1, 'align': 'center', 'valign': 'vcenter'
+            }),
+            'border': wb.add_format({'border': 1}),
+            'alternate_row': fill('F2F2F2'),
+            'priority_high': fill('FFCDD2'),
+            'priority_medium': fill('FFF3E0'),
+            'priority_low': fill('E8F5E8'),
+            'unassigned': fill('FFEBEE'),
+            'assigned': fill('E8F5E8'),
+            'available': fill('E3F2FD'),
+            'unavailable': fill('FFEBEE'),
+        }
+
+    def _assignment_highlights(self, row_data: List[Any]) -> List[tuple]:
+        """(column, color key) pairs for an assignments row: priority score"""
+        priority = row_data[11]
+        if priority >= 8:
+            return [(11, 'priority_high')]
+        if priority >= 6:
+            return [(11, 'priority_medium')]
+        return [(11, 'priority_low')]
+
+    def _patient_highlights(self, row_data: List[Any]) -> List[tuple]:
+        """(column, color key) pairs for a patients row: assignment status"""
+        return [(17, 'assigned' if row_data[17] == "Assigned" else 'unassigned')]
+
+    def _employee_highlights(self, row_data: List[Any]) -> List[tuple]:
+        """(column, color key) pairs for an employees row: workload and availability"""
+        status = row_data[19]
+        if status == "Fully Booked":
+            return [(18, 'unavailable'), (19, 'unavailable')]
+        if status == "Limited Availability":
+            return [(18, 'priority_medium'), (19, 'priority_medium')]
+        if status == "Moderate Availability":
+            return [(18, 'available'), (19, 'priority_low')]
+        return [(18, 'available'), (19, 'available')]
+
+    def _xlsxwriter_write_sheet(self, ws, fmts: Dict[str, Any], headers: List[str], rows: List[List[Any]],
+                                highlights, empty_message: str):
+        """Write header + rows top to bottom, then size columns like _auto_adjust_columns"""
+        ws.write_row(0, 0, headers, fmts['header'])
+        widths = [len(str(h)) for h in headers]
+
+        if not rows:
+            ws.write(1, 0, empty_message)
+            ws.write(1, 1, "", fmts['alternate_row'])
+
+        for row, row_data in enumerate(rows, 1):
+            # Excel row index is zero-based here, so openpyxl's even rows are odd ones;
+            # the alternate row fill wins over highlights, as in the openpyxl sheets
+            if row % 2:
+                ws.write_row(row, 0, row_data, fmts['alternate_row'])
+            else:
+                ws.write_row(row, 0, row_data, fmts['border'])
+                for col, key in highlights(row_data):
+                    ws.write(row, col, row_data[col], fmts[key])
+
+            for col, value in enumerate(row_data):
+                length = len(str(value))
+                if length > widths[col]:
+                    widths[col] = length
+
+        for col, width in enumerate(widths):
+            ws.set_column(col, col, min(width + 2, 50))
+
+    def _create_sheet(self, wb: openpyxl.Workbook, title: str, headers: List[str], rows: List[List[Any]],
+                      format_rules: List[tuple], empty_message: str):
+        """Create a styled sheet from prebuilt rows; format_rules become worksheet conditional formatting"""
+        ws = wb.create_sheet(title)
         
         # Add headers
         for col, header in enumerate(headers, 1):
@@ -269,101 +434,28 @@ class ExcelExportService:
             cell.alignment = Alignment(horizontal='center', vertical='center')
             cell.border = self.colors['border']
         
-        # Create assignment lookup for employees
-        employee_assignments = {}
-        for assignment in assignments:
-            if isinstance(assignment, dict):
-                employee_id = assignment.get('employee_id')
-                if employee_id:
-                    if employee_id not in employee_assignments:
-                        employee_assignments[employee_id] = []
-                    employee_assignments[employee_id].append(assignment)
-        
         # Add data rows
-        if employees:
-            for row, employee in enumerate(employees, 2):
-                if not isinstance(employee, dict):
-                    continue
-                    
-                employee_id = employee.get('employee_id', '')
-                current_assignments = employee_assignments.get(employee_id, [])
-                current_count = len(current_assignments)
-                max_patients = employee.get('max_patients_per_day', 8)
-                workload_percentage = (current_count / max_patients) * 100 if max_patients > 0 else 0
-                
-                # Determine availability status
-                if workload_percentage >= 100:
-                    availability_status = "Fully Booked"
-                elif workload_percentage >= 80:
-                    availability_status = "Limited Availability"
-                elif workload_percentage >= 50:
-                    availability_status = "Moderate Availability"
-                else:
-                    availability_status = "Available"
-                
-                # Calculate total working hours and travel time
-                total_working_hours = sum(assignment.get('duration', 0) for assignment in current_assignments) / 60
-                total_travel_time = sum(assignment.get('travel_time', 0) for assignment in current_assignments)
-                
-                # Get assigned patient names
-                assigned_patients = ', '.join([a.get('patient_name', '') for a in current_assignments]) if current_assignments else 'None'
-                
-                row_data = [
-                    employee.get('employee_id', ''),
-                    employee.get('name', ''),
-                    employee.get('address', ''),
-                    employee.get('postcode', ''),
-                    employee.get('gender', ''),
-                    employee.get('ethnicity', ''),
-                    employee.get('religion', ''),
-                    employee.get('transport_mode', ''),
-                    employee.get('qualification', ''),
-                    employee.get('language_spoken', ''),
-                    employee.get('certificate_expiry_date', ''),
-                    employee.get('earliest_start', ''),
-                    employee.get('latest_end', ''),
-                    employee.get('shifts', ''),
-                    employee.get('contact_number', ''),
-                    employee.get('notes', ''),
-                    current_count,
-                    max_patients,
-                    f"{workload_percentage:.1f}%",
-                    availability_status,
-                    assigned_patients,
-                    f"{total_working_hours:.1f}",
-                    f"{total_travel_time} mins"
-                ]
-                
+        if rows:
+            for row, row_data in enumerate(rows, 2):
                 for col, value in enumerate(row_data, 1):
                     cell = ws.cell(row=row, column=col, value=value)
                     cell.border = self.colors['border']
-                    
-                    # Apply conditional formatting for workload
-                    if col == 19:  # Workload % column
-                        if workload_percentage >= 100:
-                            cell.fill = self.colors['unavailable']
-                        elif workload_percentage >= 80:
-                            cell.fill = self.colors['priority_medium']
-                        else:
-                            cell.fill = self.colors['available']
-                    
-                    # Apply conditional formatting for availability status
-                    if col == 20:  # Availability Status column
-                        if availability_status == "Fully Booked":
-                            cell.fill = self.colors['unavailable']
-                        elif availability_status == "Limited Availability":
-                            cell.fill = self.colors['priority_medium']
-                        elif availability_status == "Moderate Availability":
-                            cell.fill = self.colors['priority_low']
-                        else:
-                            cell.fill = self.colors['available']
-                    
-                    # Alternate row colors
-                    if row % 2 == 0:
-                        cell.fill = self.colors['alternate_row']
+                
+                # Alternate row colors
+                if row % 2 == 0:
+                    for col in range(1, len(row_data) + 1):
+                        ws.cell(row=row, column=col).fill = self.colors['alternate_row']
+
+            # One rule per highlight instead of per-cell fills; ISODD keeps the
+            # alternate (even) rows on their plain fill, as before
+            last_row = len(rows) + 1
+            for first_col, last_col, condition, key in format_rules:
+                ws.conditional_formatting.add(
+                    f"{first_col}2:{last_col}{last_row}",
+                    FormulaRule(formula=[f"AND(ISODD(ROW()),{condition})"], fill=self.colors[key])
+                )
         else:
-            # Add a row indicating no employees
-            ws.cell(row=2, column=1, value="No employees found")
+            ws.cell(row=2, column=1, value=empty_message)
             ws.cell(row=2, column=2, value="").fill = self.colors['alternate_row']
         
         # Auto-adjust column widths
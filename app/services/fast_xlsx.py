@@ -0,0 +1,152 @@
+"""
+Minimal streaming XLSX writer for large, flat exports.
+
+Rows are written straight into the worksheet XML inside the zip container,
+so no per-cell objects are created. Only plain values and a single header
+style are supported - use openpyxl/xlsxwriter when richer formatting is needed.
+"""
+from html import escape
+import math
+import re
+from typing import Any, BinaryIO, Iterable, List, Sequence, Tuple, Union
+import zipfile
+
+# (sheet name, header row, data rows)
+Sheet = Tuple[str, Sequence[str], Iterable[Sequence[Any]]]
+
+# Rows are buffered and flushed to the zip stream in chunks of this size
+_FLUSH_ROWS = 1000
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+# Style 0 is the default; style 1 is the bold white-on-blue header used by the other export paths
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font></fonts>'
+    '<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF366092"/><bgColor indexed="64"/></patternFill></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+# XML 1.0 forbids these control characters; OOXML writes them as _xHHHH_ escapes (as xlsxwriter does)
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Text that already looks like an _xHHHH_ escape gets its underscore escaped so Excel shows it verbatim
+_ESCAPE_LIKE_RE = re.compile(r"(_x[0-9a-fA-F]{4}_)")
+
+
+def _xml_text(value: str) -> str:
+    value = _ESCAPE_LIKE_RE.sub(r"_x005F\1", value)
+    value = _CONTROL_CHARS_RE.sub(lambda m: f"_x{ord(m.group()):04X}_", value)
+    return escape(value, quote=False)
+
+
+def _column_letter(index: int) -> str:
+    """Zero-based column index -> Excel column letters (0 -> A, 26 -> AA)"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(ref: str, value: Any, style: str = "") -> str:
+    if value is None or value == "":
+        return ""
+    # bool is an int subclass but Excel would show 1/0, so keep it as text
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{_xml_text(str(value))}</t></is></c>'
+
+
+def _write_sheet(zf: zipfile.ZipFile, part: str, header: Sequence[str], rows: Iterable[Sequence[Any]]):
+    columns = [_column_letter(i) for i in range(len(header))]
+    with zf.open(part, "w") as stream:
+        stream.write(_SHEET_HEAD.encode("utf-8"))
+        header_cells = "".join(_cell(f"{col}1", value, ' s="1"') for col, value in zip(columns, header))
+        buffer: List[str] = [f'<row r="1">{header_cells}</row>']
+
+        for r, row in enumerate(rows, 2):
+            cells = "".join(_cell(f"{col}{r}", value) for col, value in zip(columns, row))
+            buffer.append(f'<row r="{r}">{cells}</row>')
+            if len(buffer) >= _FLUSH_ROWS:
+                stream.write("".join(buffer).encode("utf-8"))
+                buffer.clear()
+
+        buffer.append(_SHEET_TAIL)
+        stream.write("".join(buffer).encode("utf-8"))
+
+
+def write_fast_xlsx(path: Union[str, BinaryIO], sheets: Sequence[Sheet]):
+    """
+    Write a workbook with one worksheet per (name, header, rows) entry.
+
+    path may be a filesystem path or a writable binary file object (e.g. io.BytesIO).
+    """
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(sheets) + 1)
+        )
+        zf.writestr("[Content_Types].xml", f"{_CONTENT_TYPES_HEAD}{overrides}</Types>")
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+
+        sheet_entries = "".join(
+            f'<sheet name="{escape(_CONTROL_CHARS_RE.sub("", name[:31]))}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, (name, _, _) in enumerate(sheets, 1)
+        )
+        zf.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheet_entries}</sheets></workbook>'
+        )
+
+        sheet_rels = "".join(
+            f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(sheets) + 1)
+        )
+        styles_id = len(sheets) + 1
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{sheet_rels}'
+            f'<Relationship Id="rId{styles_id}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        )
+        zf.writestr("xl/styles.xml", _STYLES)
+
+        for i, (_, header, rows) in enumerate(sheets, 1):
+            _write_sheet(zf, f"xl/worksheets/sheet{i}.xml", header, rows)
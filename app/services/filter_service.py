@@ -1,10 +1,258 @@
-import json
+import operator
+import os
+import sys
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+from pydantic import TypeAdapter
+
 from ..models.filter_schemas import FilterConfig, FilterGroup, FilterCondition, FilterSuggestion, FilterPageConfig
 from ..database import DatabaseManager
 
+# Filter payloads are stored as UTF-8 JSON bytes (BLOB), serialised and validated
+# by pydantic-core; validate_json also accepts the str values written by older versions
+_FILTER_GROUPS = TypeAdapter(List[FilterGroup])
+
+def _match_all(field_value: Any, operand: Any) -> bool:
+    return True
+
+
+# Python-side operator dispatch: fn(field_value, operand) -> bool (see _condition_operand)
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "equals": operator.eq,
+    "not_equals": operator.ne,
+    # NULL never contains anything, as in the SQL pushdown (str(None) would match "none")
+    "contains": lambda value, needle: value is not None and needle in str(value).lower(),
+    "not_contains": lambda value, needle: value is None or needle not in str(value).lower(),
+    "greater_than": operator.gt,
+    "less_than": operator.lt,
+    "greater_than_equal": operator.ge,
+    "less_than_equal": operator.le,
+    "in": lambda value, options: value in options,
+    "not_in": lambda value, options: value not in options,
+    "between": lambda value, bounds: bounds[0] <= value <= bounds[1],
+    "is_null": lambda value, _: value is None,
+    "is_not_null": lambda value, _: value is not None,
+}
+
+# Relative per-row cost of the _OPS entries; contains/not_contains stringify and lower-case
+# the field, so they run after the cheap comparisons in a group
+_OP_COST: Dict[str, int] = {"contains": 2, "not_contains": 2}
+
+# Row predicates are pure Python, so chunked threads only scale without the GIL (3.13t+)
+_GIL_DISABLED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+PARALLEL_FILTER_MIN_ROWS = 20000
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Vectorized counterparts of _OPS for numeric columns: fn(column, *operands) -> bool array
+_NUMERIC_OPS: Dict[str, Callable[..., np.ndarray]] = {
+    "equals": np.equal,
+    "not_equals": np.not_equal,
+    "greater_than": np.greater,
+    "less_than": np.less,
+    "greater_than_equal": np.greater_equal,
+    "less_than_equal": np.less_equal,
+    "between": lambda column, low, high: (column >= low) & (column <= high),
+}
+
+# Operators that translate directly to a SQL comparison
+_SQL_COMPARISONS = {
+    "greater_than": ">",
+    "less_than": "<",
+    "greater_than_equal": ">=",
+    "less_than_equal": "<=",
+}
+
+# Values that can be bound as SQLite parameters
+_SQL_SCALARS = (str, int, float, type(None))
+
+# Fixed statements for filter_configs; identical SQL text hits the sqlite3 driver's statement cache
+_SQL_UPSERT_FILTER_CONFIG = '''
+    INSERT INTO filter_configs (
+        config_id, page, filters, sort_by, sort_order, page_size, page_number
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(page) DO UPDATE SET
+        config_id = excluded.config_id,
+        filters = excluded.filters,
+        sort_by = excluded.sort_by,
+        sort_order = excluded.sort_order,
+        page_size = excluded.page_size,
+        page_number = excluded.page_number,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+# page is unique (idx_filter_configs_page), so this is a single index lookup; the [TIMESTAMP]
+# column aliases make the driver return both timestamps as datetime
+_SQL_SELECT_FILTER_CONFIG = '''
+    SELECT page, filters, sort_by, sort_order, page_size, page_number,
+        created_at AS "created_at [TIMESTAMP]", updated_at AS "updated_at [TIMESTAMP]"
+    FROM filter_configs
+    WHERE page = ?
+'''
+
+# Suggestions are static, so each page config is built once at import and shared
+_ASSIGNMENT_SUGGESTIONS = FilterPageConfig(page="assignments", suggestions=[
+    FilterSuggestion(
+        field="employee_name",
+        label="Employee Name",
+        type="text",
+        placeholder="Enter employee name"
+    ),
+    FilterSuggestion(
+        field="patient_name",
+        label="Patient Name",
+        type="text",
+        placeholder="Enter patient name"
+    ),
+    FilterSuggestion(
+        field="service_type",
+        label="Service Type",
+        type="select",
+        options=[
+            {"value": "medicine", "label": "Medicine"},
+            {"value": "exercise", "label": "Exercise"},
+            {"value": "companionship", "label": "Companionship"},
+            {"value": "personal_care", "label": "Personal Care"}
+        ]
+    ),
+    FilterSuggestion(
+        field="priority_score",
+        label="Priority Score",
+        type="number",
+        min_value=1,
+        max_value=10,
+        placeholder="Enter priority score"
+    ),
+    FilterSuggestion(
+        field="travel_time",
+        label="Travel Time (minutes)",
+        type="number",
+        min_value=0,
+        max_value=300,
+        placeholder="Enter travel time"
+    ),
+    FilterSuggestion(
+        field="assigned_time",
+        label="Assigned Time",
+        type="date",
+        placeholder="Select date"
+    ),
+    FilterSuggestion(
+        field="is_unassigned",
+        label="Unassigned Patients",
+        type="select",
+        options=[
+            {"value": "true", "label": "Show Unassigned Only"},
+            {"value": "false", "label": "Show Assigned Only"}
+        ]
+    )
+])
+
+_EMPLOYEE_SUGGESTIONS = FilterPageConfig(page="employees", suggestions=[
+    FilterSuggestion(
+        field="name",
+        label="Employee Name",
+        type="text",
+        placeholder="Enter employee name"
+    ),
+    FilterSuggestion(
+        field="qualification",
+        label="Qualification",
+        type="select",
+        options=[
+            {"value": "nurse", "label": "Nurse"},
+            {"value": "carer", "label": "Carer"},
+            {"value": "specialist", "label": "Specialist"}
+        ]
+    ),
+    FilterSuggestion(
+        field="language_spoken",
+        label="Language",
+        type="text",
+        placeholder="Enter language"
+    ),
+    FilterSuggestion(
+        field="transport_mode",
+        label="Transport Mode",
+        type="select",
+        options=[
+            {"value": "car", "label": "Car"},
+            {"value": "public_transport", "label": "Public Transport"},
+            {"value": "walking", "label": "Walking"}
+        ]
+    ),
+    FilterSuggestion(
+        field="available_hours",
+        label="Available Hours",
+        type="number",
+        min_value=0,
+        max_value=168,
+        placeholder="Enter available hours"
+    ),
+    FilterSuggestion(
+        field="is_available",
+        label="Availability",
+        type="select",
+        options=[
+            {"value": "true", "label": "Available"},
+            {"value": "false", "label": "Unavailable"}
+        ]
+    )
+])
+
+_PATIENT_SUGGESTIONS = FilterPageConfig(page="patients", suggestions=[
+    FilterSuggestion(
+        field="patient_name",
+        label="Patient Name",
+        type="text",
+        placeholder="Enter patient name"
+    ),
+    FilterSuggestion(
+        field="required_support",
+        label="Required Support",
+        type="select",
+        options=[
+            {"value": "medicine", "label": "Medicine"},
+            {"value": "exercise", "label": "Exercise"},
+            {"value": "companionship", "label": "Companionship"},
+            {"value": "personal_care", "label": "Personal Care"}
+        ]
+    ),
+    FilterSuggestion(
+        field="required_hours_of_support",
+        label="Required Hours",
+        type="number",
+        min_value=1,
+        max_value=168,
+        placeholder="Enter required hours"
+    ),
+    FilterSuggestion(
+        field="requires_medication",
+        label="Requires Medication",
+        type="select",
+        options=[
+            {"value": "yes", "label": "Yes"},
+            {"value": "no", "label": "No"}
+        ]
+    ),
+    FilterSuggestion(
+        field="is_assigned",
+        label="Assignment Status",
+        type="select",
+        options=[
+            {"value": "true", "label": "Assigned"},
+            {"value": "false", "label": "Unassigned"}
+        ]
+    )
+])
+
 class FilterService:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
@@ -20,7 +268,7 @@ class FilterService:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 config_id TEXT UNIQUE NOT NULL,
                 page TEXT NOT NULL,
-                filters TEXT NOT NULL,
+                filters BLOB NOT NULL,
                 sort_by TEXT,
                 sort_order TEXT DEFAULT 'asc',
                 page_size INTEGER DEFAULT 50,
@@ -30,59 +278,53 @@ class FilterService:
             )
         ''')
         
+        # One config per page: keep the newest row of any duplicates, then enforce it
+        cursor.execute('''
+            DELETE FROM filter_configs
+            WHERE id NOT IN (SELECT MAX(id) FROM filter_configs GROUP BY page)
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_filter_configs_page ON filter_configs(page)')
+        
         self.db_manager.conn.commit()
 
     def save_filter_config(self, page: str, filters: List[FilterGroup], 
                           sort_by: str = None, sort_order: str = "asc",
                           page_size: int = 50, page_number: int = 1) -> str:
-        """Save filter configuration to database"""
+        """Save filter configuration to database, replacing the page's existing one"""
         config_id = str(uuid.uuid4())
         
-        cursor = self.db_manager.conn.cursor()
-        cursor.execute('''
-            INSERT INTO filter_configs (
-                config_id, page, filters, sort_by, sort_order, page_size, page_number
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            config_id,
-            page,
-            json.dumps([group.dict() for group in filters]),
-            sort_by,
-            sort_order,
-            page_size,
-            page_number
-        ))
+        with self.db_manager.conn:
+            self.db_manager.conn.execute(_SQL_UPSERT_FILTER_CONFIG, (
+                config_id,
+                page,
+                _FILTER_GROUPS.dump_json(filters),
+                sort_by,
+                sort_order,
+                page_size,
+                page_number
+            ))
         
-        self.db_manager.conn.commit()
         return config_id
 
     def get_filter_config(self, page: str) -> Optional[FilterConfig]:
         """Get the latest filter configuration for a page"""
         cursor = self.db_manager.conn.cursor()
-        cursor.execute('''
-            SELECT * FROM filter_configs 
-            WHERE page = ? 
-            ORDER BY updated_at DESC 
-            LIMIT 1
-        ''', (page,))
+        cursor.execute(_SQL_SELECT_FILTER_CONFIG, (page,))
         
+        # Rows are sqlite3.Row (see DatabaseManager), so columns are read by name directly
         row = cursor.fetchone()
         if row:
-            columns = [col[0] for col in cursor.description]
-            data = dict(zip(columns, row))
-            
-            filters_data = json.loads(data['filters'])
-            filters = [FilterGroup(**group) for group in filters_data]
+            filters = _FILTER_GROUPS.validate_json(row['filters'])
             
             return FilterConfig(
-                page=data['page'],
+                page=row['page'],
                 filters=filters,
-                sort_by=data['sort_by'],
-                sort_order=data['sort_order'],
-                page_size=data['page_size'],
-                page_number=data['page_number'],
-                created_at=datetime.fromisoformat(data['created_at']),
-                updated_at=datetime.fromisoformat(data['updated_at'])
+                sort_by=row['sort_by'],
+                sort_order=row['sort_order'],
+                page_size=row['page_size'],
+                page_number=row['page_number'],
+                created_at=row['created_at'],
+                updated_at=row['updated_at']
             )
         
         return None
@@ -90,301 +332,335 @@ class FilterService:
     def update_filter_config(self, page: str, filters: List[FilterGroup], 
                            sort_by: str = None, sort_order: str = "asc",
                            page_size: int = 50, page_number: int = 1) -> str:
-        """Update existing filter configuration or create new one"""
-        # Delete existing config for this page
-        cursor = self.db_manager.conn.cursor()
-        cursor.execute('DELETE FROM filter_configs WHERE page = ?', (page,))
-        
-        # Save new config
+        """Update existing filter configuration or create new one (single UPSERT)"""
         return self.save_filter_config(page, filters, sort_by, sort_order, page_size, page_number)
 
     def get_assignment_filter_suggestions(self) -> FilterPageConfig:
         """Get filter suggestions for assignments page"""
-        suggestions = [
-            FilterSuggestion(
-                field="employee_name",
-                label="Employee Name",
-                type="text",
-                placeholder="Enter employee name"
-            ),
-            FilterSuggestion(
-                field="patient_name",
-                label="Patient Name",
-                type="text",
-                placeholder="Enter patient name"
-            ),
-            FilterSuggestion(
-                field="service_type",
-                label="Service Type",
-                type="select",
-                options=[
-                    {"value": "medicine", "label": "Medicine"},
-                    {"value": "exercise", "label": "Exercise"},
-                    {"value": "companionship", "label": "Companionship"},
-                    {"value": "personal_care", "label": "Personal Care"}
-                ]
-            ),
-            FilterSuggestion(
-                field="priority_score",
-                label="Priority Score",
-                type="number",
-                min_value=1,
-                max_value=10,
-                placeholder="Enter priority score"
-            ),
-            FilterSuggestion(
-                field="travel_time",
-                label="Travel Time (minutes)",
-                type="number",
-                min_value=0,
-                max_value=300,
-                placeholder="Enter travel time"
-            ),
-            FilterSuggestion(
-                field="assigned_time",
-                label="Assigned Time",
-                type="date",
-                placeholder="Select date"
-            ),
-            FilterSuggestion(
-                field="is_unassigned",
-                label="Unassigned Patients",
-                type="select",
-                options=[
-                    {"value": "true", "label": "Show Unassigned Only"},
-                    {"value": "false", "label": "Show Assigned Only"}
-                ]
-            )
-        ]
-        
-        return FilterPageConfig(page="assignments", suggestions=suggestions)
+        return _ASSIGNMENT_SUGGESTIONS
 
     def get_employee_filter_suggestions(self) -> FilterPageConfig:
         """Get filter suggestions for employees page"""
-        suggestions = [
-            FilterSuggestion(
-                field="name",
-                label="Employee Name",
-                type="text",
-                placeholder="Enter employee name"
-            ),
-            FilterSuggestion(
-                field="qualification",
-                label="Qualification",
-                type="select",
-                options=[
-                    {"value": "nurse", "label": "Nurse"},
-                    {"value": "carer", "label": "Carer"},
-                    {"value": "specialist", "label": "Specialist"}
-                ]
-            ),
-            FilterSuggestion(
-                field="language_spoken",
-                label="Language",
-                type="text",
-                placeholder="Enter language"
-            ),
-            FilterSuggestion(
-                field="transport_mode",
-                label="Transport Mode",
-                type="select",
-                options=[
-                    {"value": "car", "label": "Car"},
-                    {"value": "public_transport", "label": "Public Transport"},
-                    {"value": "walking", "label": "Walking"}
-                ]
-            ),
-            FilterSuggestion(
-                field="available_hours",
-                label="Available Hours",
-                type="number",
-                min_value=0,
-                max_value=168,
-                placeholder="Enter available hours"
-            ),
-            FilterSuggestion(
-                field="is_available",
-                label="Availability",
-                type="select",
-                options=[
-                    {"value": "true", "label": "Available"},
-                    {"value": "false", "label": "Unavailable"}
-                ]
-            )
-        ]
-        
-        return FilterPageConfig(page="employees", suggestions=suggestions)
+        return _EMPLOYEE_SUGGESTIONS
 
     def get_patient_filter_suggestions(self) -> FilterPageConfig:
         """Get filter suggestions for patients page"""
-        suggestions = [
-            FilterSuggestion(
-                field="patient_name",
-                label="Patient Name",
-                type="text",
-                placeholder="Enter patient name"
-            ),
-            FilterSuggestion(
-                field="required_support",
-                label="Required Support",
-                type="select",
-                options=[
-                    {"value": "medicine", "label": "Medicine"},
-                    {"value": "exercise", "label": "Exercise"},
-                    {"value": "companionship", "label": "Companionship"},
-                    {"value": "personal_care", "label": "Personal Care"}
-                ]
-            ),
-            FilterSuggestion(
-                field="required_hours_of_support",
-                label="Required Hours",
-                type="number",
-                min_value=1,
-                max_value=168,
-                placeholder="Enter required hours"
-            ),
-            FilterSuggestion(
-                field="requires_medication",
-                label="Requires Medication",
-                type="select",
-                options=[
-                    {"value": "yes", "label": "Yes"},
-                    {"value": "no", "label": "No"}
-                ]
-            ),
-            FilterSuggestion(
-                field="is_assigned",
-                label="Assignment Status",
-                type="select",
-                options=[
-                    {"value": "true", "label": "Assigned"},
-                    {"value": "false", "label": "Unassigned"}
-                ]
-            )
-        ]
-        
-        return FilterPageConfig(page="patients", suggestions=suggestions)
+        return _PATIENT_SUGGESTIONS
 
-    def apply_filters_to_assignments(self, filters: List[FilterGroup]) -> List[Dict]:
-        """Apply filters to assignments data"""
-        assignments = self.db_manager.get_assignments()
+    def apply_filters_to_assignments(self, filters: List[FilterGroup], sort_by: str = None,
+                                     sort_order: str = "asc", page_size: int = None,
+                                     page_number: int = 1) -> List[Dict]:
+        """Apply filters to assignments data, optionally sorted and paged"""
+        if not filters and sort_by is None and page_size is None:
+            return self.db_manager.get_assignments()
         
-        if not filters:
-            return assignments
+        columns = self.db_manager.get_table_columns("assignments")
+        where_sql, params, python_groups = self._build_where_clause(filters, columns)
+        order_by = self._order_by(sort_by, sort_order, columns)
         
-        filtered_assignments = []
+        if self._can_page_in_sql(python_groups, sort_by, order_by):
+            limit, offset = self._limit_offset(page_size, page_number)
+            return self.db_manager.query_assignments(where_sql, params, order_by, limit, offset)
         
-        for assignment in assignments:
-            if self._evaluate_filters(assignment, filters):
-                filtered_assignments.append(assignment)
+        rows = self.db_manager.iter_assignments(where_sql, params, order_by)
+        if page_size and self._sql_ordered(sort_by, order_by):
+            return self._stream_page(rows, python_groups, page_size, page_number)
+        return self._paginate(self._filter_rows(list(rows), python_groups),
+                              None if order_by else sort_by, sort_order, page_size, page_number)
+
+    def apply_filters_to_employees(self, filters: List[FilterGroup], sort_by: str = None,
+                                   sort_order: str = "asc", page_size: int = None,
+                                   page_number: int = 1) -> List[Dict]:
+        """Apply filters to employees data, optionally sorted and paged"""
+        if not filters and sort_by is None and page_size is None:
+            return self.db_manager.get_employees()
+        
+        # available_hours / is_available are computed, so groups using them stay in Python
+        columns = self.db_manager.get_table_columns("employees")
+        where_sql, params, python_groups = self._build_where_clause(filters, columns)
+        order_by = self._order_by(sort_by, sort_order, columns)
+        by_emp, _, _ = self.db_manager.get_assignment_indexes()
+        
+        if self._can_page_in_sql(python_groups, sort_by, order_by):
+            limit, offset = self._limit_offset(page_size, page_number)
+            employees = self.db_manager.query_employees(where_sql, params, order_by, limit, offset)
+            return list(self._with_available_hours(employees, by_emp))
         
-        return filtered_assignments
+        rows = self._with_available_hours(self.db_manager.iter_employees(where_sql, params, order_by), by_emp)
+        if page_size and self._sql_ordered(sort_by, order_by):
+            return self._stream_page(rows, python_groups, page_size, page_number)
+        return self._paginate(self._filter_rows(list(rows), python_groups),
+                              None if order_by else sort_by, sort_order, page_size, page_number)
 
-    def apply_filters_to_employees(self, filters: List[FilterGroup]) -> List[Dict]:
-        """Apply filters to employees data"""
-        employees = self.db_manager.get_employees()
+    def apply_filters_to_patients(self, filters: List[FilterGroup], sort_by: str = None,
+                                  sort_order: str = "asc", page_size: int = None,
+                                  page_number: int = 1) -> List[Dict]:
+        """Apply filters to patients data, optionally sorted and paged"""
+        if not filters and sort_by is None and page_size is None:
+            return self.db_manager.get_patients()
         
-        if not filters:
-            return employees
+        # is_assigned is computed, so groups using it stay in Python
+        columns = self.db_manager.get_table_columns("patients")
+        where_sql, params, python_groups = self._build_where_clause(filters, columns)
+        order_by = self._order_by(sort_by, sort_order, columns)
+        _, by_pat, _ = self.db_manager.get_assignment_indexes()
         
-        filtered_employees = []
+        if self._can_page_in_sql(python_groups, sort_by, order_by):
+            limit, offset = self._limit_offset(page_size, page_number)
+            patients = self.db_manager.query_patients(where_sql, params, order_by, limit, offset)
+            return list(self._with_assignment_status(patients, by_pat))
         
+        rows = self._with_assignment_status(self.db_manager.iter_patients(where_sql, params, order_by), by_pat)
+        if page_size and self._sql_ordered(sort_by, order_by):
+            return self._stream_page(rows, python_groups, page_size, page_number)
+        return self._paginate(self._filter_rows(list(rows), python_groups),
+                              None if order_by else sort_by, sort_order, page_size, page_number)
+
+    def _with_available_hours(self, employees: Iterable[Dict], by_emp: Dict[str, List[Dict]]) -> Iterator[Dict]:
+        """Add the computed available_hours / is_available fields as rows stream past"""
         for employee in employees:
-            # Calculate available hours based on assignments
-            available_hours = self._calculate_employee_available_hours(employee)
+            available_hours = self._calculate_employee_available_hours(employee, by_emp)
             employee['available_hours'] = available_hours
             employee['is_available'] = available_hours > 0
-            
-            if self._evaluate_filters(employee, filters):
-                filtered_employees.append(employee)
-        
-        return filtered_employees
+            yield employee
 
-    def apply_filters_to_patients(self, filters: List[FilterGroup]) -> List[Dict]:
-        """Apply filters to patients data"""
-        patients = self.db_manager.get_patients()
-        assignments = self.db_manager.get_assignments()
-        
-        if not filters:
-            return patients
-        
-        # Add assignment status to patients
-        assigned_patient_ids = {a['patient_id'] for a in assignments}
-        
+    def _with_assignment_status(self, patients: Iterable[Dict], by_pat: Dict[str, List[Dict]]) -> Iterator[Dict]:
+        """Add the computed is_assigned field as rows stream past"""
         for patient in patients:
-            patient['is_assigned'] = patient['patient_id'] in assigned_patient_ids
+            patient['is_assigned'] = patient['patient_id'] in by_pat
+            yield patient
+
+    def _stream_page(self, rows: Iterator[Dict], python_groups: List[FilterGroup],
+                     page_size: int, page_number: int) -> List[Dict]:
+        """Filter already-ordered rows one at a time, stopping as soon as the page is full"""
+        limit, offset = self._limit_offset(page_size, page_number)
+        predicate = self._compile_filters(python_groups)
+        return list(islice((row for row in rows if predicate(row)), offset, offset + limit))
+
+    def _order_by(self, sort_by: Optional[str], sort_order: str, columns: set) -> Optional[str]:
+        """ORDER BY fragment for a real column (never interpolates unchecked input), else None"""
+        if not sort_by or sort_by not in columns:
+            return None
+        direction = "DESC" if str(sort_order).lower() == "desc" else "ASC"
+        # id breaks ties so LIMIT/OFFSET pages are stable
+        return f'"{sort_by}" {direction}, id {direction}'
+
+    def _sql_ordered(self, sort_by: Optional[str], order_by: Optional[str]) -> bool:
+        """True when SQL returns rows in their final order (no sort on a computed field)"""
+        return sort_by is None or order_by is not None
+
+    def _can_page_in_sql(self, python_groups: List[FilterGroup], sort_by: Optional[str],
+                         order_by: Optional[str]) -> bool:
+        """LIMIT/OFFSET can only be pushed down when SQL alone decides both the rows and their order"""
+        return not python_groups and self._sql_ordered(sort_by, order_by)
+
+    def _limit_offset(self, page_size: Optional[int], page_number: int) -> Tuple[Optional[int], Optional[int]]:
+        if not page_size or page_size < 1:
+            return None, None
+        return page_size, (max(page_number or 1, 1) - 1) * page_size
+
+    def _paginate(self, rows: List[Dict], sort_by: Optional[str], sort_order: str,
+                  page_size: Optional[int], page_number: int) -> List[Dict]:
+        """Python-side sort (computed fields) and page slice for rows SQL could not page"""
+        if sort_by:
+            # Missing values are grouped apart so they are never compared with real ones
+            rows.sort(key=lambda row: (row.get(sort_by) is None, row.get(sort_by) if row.get(sort_by) is not None else 0),
+                      reverse=str(sort_order).lower() == "desc")
+        limit, offset = self._limit_offset(page_size, page_number)
+        if limit is None:
+            return rows
+        return rows[offset:offset + limit]
+
+    def _build_where_clause(self, filters: List[FilterGroup], columns: set) -> Tuple[str, List[Any], List[FilterGroup]]:
+        """Translate filter groups into a parameterized WHERE clause.
+
+        Groups are ANDed together, so each group is pushed down only if every
+        condition maps to a real column and a supported operator; the rest are
+        returned for Python evaluation on the narrowed rows.
+        """
+        clauses = []
+        params: List[Any] = []
+        python_groups = []
+
+        for group in filters:
+            if not group.conditions:
+                continue
+
+            group_clauses = []
+            group_params: List[Any] = []
+            for condition in group.conditions:
+                translated = self._condition_to_sql(condition, columns)
+                if translated is None:
+                    break
+                group_clauses.append(translated[0])
+                group_params.extend(translated[1])
+            else:
+                joiner = " AND " if group.operator == "AND" else " OR "
+                clauses.append(f"({joiner.join(group_clauses)})")
+                params.extend(group_params)
+                continue
+
+            python_groups.append(group)
+
+        return " AND ".join(clauses), params, python_groups
+
+    def _condition_to_sql(self, condition: FilterCondition, columns: set) -> Optional[Tuple[str, List[Any]]]:
+        """SQL fragment and params for one condition, or None if it must be evaluated in Python"""
+        field = condition.field
+        if field not in columns:
+            return None
+
+        op = condition.operator.value
+        value = condition.value
+
+        if op == "is_null":
+            return f"{field} IS NULL", []
+        if op == "is_not_null":
+            return f"{field} IS NOT NULL", []
+
+        if op in ("in", "not_in"):
+            if not isinstance(value, (list, tuple)) or not all(isinstance(v, _SQL_SCALARS) for v in value):
+                return None
+            if not value:
+                return ("0" if op == "in" else "1"), []
+            placeholders = ", ".join("?" * len(value))
+            if op == "in":
+                return f"{field} IN ({placeholders})", list(value)
+            return f"({field} IS NULL OR {field} NOT IN ({placeholders}))", list(value)
+
+        if not isinstance(value, _SQL_SCALARS):
+            return None
+
+        if op == "equals":
+            return f"{field} IS ?", [value]
+        if op == "not_equals":
+            return f"{field} IS NOT ?", [value]
+        if op == "contains":
+            return f"instr(LOWER(CAST({field} AS TEXT)), ?) > 0", [str(value).lower()]
+        if op == "not_contains":
+            return f"({field} IS NULL OR instr(LOWER(CAST({field} AS TEXT)), ?) = 0)", [str(value).lower()]
+        if op == "between":
+            if not isinstance(condition.value2, _SQL_SCALARS) or condition.value2 is None:
+                return None
+            return f"{field} BETWEEN ? AND ?", [value, condition.value2]
+        if op in _SQL_COMPARISONS and value is not None:
+            return f"{field} {_SQL_COMPARISONS[op]} ?", [value]
+
+        return None
+
+    def _filter_rows(self, rows: List[Dict], filters: List[FilterGroup]) -> List[Dict]:
+        """Filter rows in Python: numeric-only groups as NumPy masks, the rest via the compiled predicate"""
+        if not filters or not rows:
+            return rows
         
-        filtered_patients = []
+        mask = None
+        remaining = []
+        columns: Dict[str, Optional[np.ndarray]] = {}
+        for group in filters:
+            group_mask = self._numeric_group_mask(rows, group, columns)
+            if group_mask is None:
+                remaining.append(group)
+            else:
+                mask = group_mask if mask is None else mask & group_mask
         
-        for patient in patients:
-            if self._evaluate_filters(patient, filters):
-                filtered_patients.append(patient)
+        if mask is not None:
+            rows = [row for row, keep in zip(rows, mask.tolist()) if keep]
+        if not remaining:
+            return rows
+        return self._parallel_filter(rows, self._compile_filters(remaining))
+
+    def _parallel_filter(self, rows: List[Dict], predicate: Callable[[Dict], bool],
+                         chunks: Optional[int] = None) -> List[Dict]:
+        """Apply predicate over row chunks on a thread pool (free-threaded builds only), keeping row order"""
+        chunks = chunks or os.cpu_count() or 1
+        if not _GIL_DISABLED or chunks < 2 or len(rows) < PARALLEL_FILTER_MIN_ROWS:
+            return [row for row in rows if predicate(row)]
         
-        return filtered_patients
+        size = -(-len(rows) // chunks)
+        parts = [rows[i:i + size] for i in range(0, len(rows), size)]
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            results = executor.map(lambda part: [row for row in part if predicate(row)], parts)
+        return [row for part in results for row in part]
 
-    def _evaluate_filters(self, item: Dict, filters: List[FilterGroup]) -> bool:
-        """Evaluate if an item matches the given filters"""
-        for group in filters:
-            group_result = True
+    def _numeric_group_mask(self, rows: List[Dict], group: FilterGroup,
+                            columns: Dict[str, Optional[np.ndarray]]) -> Optional[np.ndarray]:
+        """Boolean mask for a group made only of numeric comparisons, or None if it needs the Python path"""
+        if not group.conditions:
+            return None
+        
+        condition_masks = []
+        for condition in group.conditions:
+            op = condition.operator.value
+            operands = [condition.value, condition.value2] if op == "between" else [condition.value]
+            if op not in _NUMERIC_OPS or not all(_is_number(v) for v in operands):
+                return None
             
-            for condition in group.conditions:
-                condition_result = self._evaluate_condition(item, condition)
-                
-                if group.operator == "AND":
-                    group_result = group_result and condition_result
-                else:  # OR
-                    group_result = group_result or condition_result
+            if condition.field not in columns:
+                columns[condition.field] = self._numeric_column(rows, condition.field)
+            column = columns[condition.field]
+            if column is None:
+                return None
             
-            if not group_result:
-                return False
+            condition_masks.append(_NUMERIC_OPS[op](column, *operands))
         
-        return True
+        if group.operator == "AND":
+            return np.logical_and.reduce(condition_masks)
+        return np.logical_or.reduce(condition_masks)
 
-    def _evaluate_condition(self, item: Dict, condition: FilterCondition) -> bool:
-        """Evaluate a single filter condition"""
-        field_value = item.get(condition.field)
+    def _numeric_column(self, rows: List[Dict], field: str) -> Optional[np.ndarray]:
+        """Field values as a float64 array, or None if any value is missing or non-numeric"""
+        values = [row.get(field) for row in rows]
+        if not all(_is_number(v) for v in values):
+            return None
+        return np.fromiter(values, dtype=np.float64, count=len(values))
+
+    def _compile_filters(self, filters: List[FilterGroup]) -> Callable[[Dict], bool]:
+        """Compile filter groups into a single predicate; operator functions and operands are resolved once"""
+        group_predicates = []
         
-        if condition.operator.value == "equals":
-            return field_value == condition.value
-        elif condition.operator.value == "not_equals":
-            return field_value != condition.value
-        elif condition.operator.value == "contains":
-            return str(field_value).lower().find(str(condition.value).lower()) != -1
-        elif condition.operator.value == "not_contains":
-            return str(field_value).lower().find(str(condition.value).lower()) == -1
-        elif condition.operator.value == "greater_than":
-            return field_value > condition.value
-        elif condition.operator.value == "less_than":
-            return field_value < condition.value
-        elif condition.operator.value == "greater_than_equal":
-            return field_value >= condition.value
-        elif condition.operator.value == "less_than_equal":
-            return field_value <= condition.value
-        elif condition.operator.value == "in":
-            return field_value in condition.value
-        elif condition.operator.value == "not_in":
-            return field_value not in condition.value
-        elif condition.operator.value == "between":
-            return condition.value <= field_value <= condition.value2
-        elif condition.operator.value == "is_null":
-            return field_value is None
-        elif condition.operator.value == "is_not_null":
-            return field_value is not None
+        for group in filters:
+            # Cheapest conditions first so all()/any() can stop before the string scans
+            ordered = sorted(group.conditions, key=lambda c: _OP_COST.get(c.operator.value, 1))
+            conditions = tuple(
+                (condition.field, _OPS.get(condition.operator.value, _match_all), self._condition_operand(condition))
+                for condition in ordered
+            )
+            if not conditions:
+                continue
+            
+            if group.operator == "AND":
+                def group_predicate(item: Dict, conditions=conditions) -> bool:
+                    return all(op(item.get(field), operand) for field, op, operand in conditions)
+            else:  # OR
+                def group_predicate(item: Dict, conditions=conditions) -> bool:
+                    return any(op(item.get(field), operand) for field, op, operand in conditions)
+            group_predicates.append((max(_OP_COST.get(c.operator.value, 1) for c in ordered), group_predicate))
         
-        return True
-
-    def _calculate_employee_available_hours(self, employee: Dict) -> int:
-        """Calculate available hours for an employee based on assignments"""
-        assignments = self.db_manager.get_assignments()
-        employee_assignments = [a for a in assignments if a['employee_id'] == employee['employee_id']]
+        # Cheap groups first as well; the first failing group rejects the row
+        group_predicates = tuple(fn for _, fn in sorted(group_predicates, key=lambda entry: entry[0]))
+        
+        def predicate(item: Dict) -> bool:
+            return all(group_predicate(item) for group_predicate in group_predicates)
         
-        # Calculate total assigned hours
+        return predicate
+
+    def _condition_operand(self, condition: FilterCondition) -> Any:
+        """Second argument for the condition's _OPS function (lowered needle, bounds, ...)"""
+        op = condition.operator.value
+        if op in ("contains", "not_contains"):
+            return str(condition.value).lower()
+        if op == "between":
+            return (condition.value, condition.value2)
+        return condition.value
+
+    def _calculate_employee_available_hours(self, employee: Dict, by_emp: Dict[str, List[Dict]]) -> int:
+        """Calculate available hours for an employee from the assignments-by-employee index"""
         total_assigned_hours = sum(
-            a.get('duration', 0) or 0 for a in employee_assignments
+            a.get('duration', 0) or 0 for a in by_emp.get(employee['employee_id'], ())
         )
         
         # Assume 40 hours per week as standard
         standard_hours = 40
         available_hours = max(0, standard_hours - total_assigned_hours)
         
-        return available_hours 
\ No newline at end of file
+        return available_hours 
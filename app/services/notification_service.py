@@ -25,6 +25,31 @@ class NotificationService:
         else:
             raise Exception("Failed to create notification")
 
+    def create_notifications(self, items: List[Dict]) -> List[str]:
+        """Create several notifications in one database transaction and return their IDs.
+
+        Each item takes the create_notification keyword arguments
+        (notification_type, title, message, action_type, action_data).
+        """
+        notifications = [
+            {
+                'notification_id': str(uuid.uuid4()),
+                'notification_type': item['notification_type'],
+                'title': item['title'],
+                'message': item['message'],
+                'action_type': item.get('action_type'),
+                'action_data': item.get('action_data')
+            }
+            for item in items
+        ]
+        if not notifications:
+            return []
+        
+        if self.db_manager.bulk_insert_notifications(notifications):
+            return [n['notification_id'] for n in notifications]
+        else:
+            raise Exception("Failed to create notifications")
+
     def get_notifications(self, include_deleted: bool = False, limit: int = 50) -> List[Dict]:
         """Get notifications with optional filtering"""
         return self.db_manager.get_notifications(include_deleted=include_deleted, limit=limit)
@@ -3,6 +3,7 @@ from typing import Dict, List, Optional, Any
 import json
 import logging
 import os
+import re
 from dotenv import load_dotenv
 
 from ..models.schemas import Employee, Patient, ServiceType, EmployeeAssignment
@@ -12,11 +13,58 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Prompt payloads are serialized compactly (no indent) to keep prompt tokens down
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+    _json_loads = json.loads
+
+# Static prompt for extract_assignment_details, built once at import
+SYSTEM_PROMPT_EXTRACT = """
+You are an AI assistant for a healthcare rota system.
+Extract the following information from the user's prompt:
+- patient_id: The patient identifier (e.g., P001, P002)
+- service_type: The type of service required (medicine, exercise, companionship, personal_care)
+- preferred_time: If mentioned, the preferred time for the service
+- urgency: How urgent the request is (high, medium, low)
+
+Return the information as a JSON object. If information is not provided, use null.
+
+Example:
+Input: "The patient P001 is required Exercise today can you assign available employee."
+Output: {
+    "patient_id": "P001",
+    "service_type": "exercise",
+    "preferred_time": null,
+    "urgency": "medium"
+}
+"""
+
+# Patient IDs like P001 for the no-AI fallback in extract_assignment_details
+_PATIENT_ID_RE = re.compile(r'\bP\d{1,4}\b', re.IGNORECASE)
+
+# JSON mode: the API guarantees the reply parses as a single JSON object
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+
 class OpenAIService:
     def __init__(self):
+        # Sync client for the startup connectivity check; request paths use the async
+        # client so completions don't block the event loop
         self.client = openai.OpenAI(
             api_key=os.getenv("OPENAI_API_KEY")
         )
+        self.async_client = openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY")
+        )
         self.model = "gpt-3.5-turbo"  # You can change to gpt-4 if needed
     
     def check_connectivity(self) -> dict:
@@ -33,47 +81,24 @@ class OpenAIService:
         Extract assignment details from natural language prompt
         """
         try:
-            system_prompt = """
-            You are an AI assistant for a healthcare rota system. 
-            Extract the following information from the user's prompt:
-            - patient_id: The patient identifier (e.g., P001, P002)
-            - service_type: The type of service required (medicine, exercise, companionship, personal_care)
-            - preferred_time: If mentioned, the preferred time for the service
-            - urgency: How urgent the request is (high, medium, low)
-            
-            Return the information as a JSON object. If information is not provided, use null.
-            
-            Example:
-            Input: "The patient P001 is required Exercise today can you assign available employee."
-            Output: {
-                "patient_id": "P001",
-                "service_type": "exercise",
-                "preferred_time": null,
-                "urgency": "medium"
-            }
-            """
-            
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": SYSTEM_PROMPT_EXTRACT},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1
+                temperature=0.1,
+                response_format=JSON_RESPONSE_FORMAT
             )
             
             result = response.choices[0].message.content
-            return json.loads(result)
+            return _json_loads(result)
             
         except Exception as e:
             logger.error(f"Error extracting assignment details: {str(e)}")
             # Fallback: try to extract patient ID manually
-            words = prompt.upper().split()
-            patient_id = None
-            for word in words:
-                if word.startswith('P') and len(word) <= 5:
-                    patient_id = word
-                    break
+            match = _PATIENT_ID_RE.search(prompt)
+            patient_id = match.group(0).upper() if match else None
             
             return {
                 "patient_id": patient_id,
@@ -130,9 +155,9 @@ class OpenAIService:
             4. Schedule Optimization: Balance workload, respect shift constraints, ensure coverage, handle emergencies.
             5. Other: Respect earliest start/latest end times, transport limitations.
             
-            Patient Details: {json.dumps(patient_data, indent=2)}
+            Patient Details: {_json_dumps(patient_data)}
             Service Required: {service_type.value}
-            Qualified Employees: {json.dumps(employees_data, indent=2)}
+            Qualified Employees: {_json_dumps(employees_data)}
             
             Select the best employee and provide:
             1. employee_id: The selected employee's ID
@@ -144,16 +169,17 @@ class OpenAIService:
             Return as JSON format only.
             """
             
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt}
                 ],
-                temperature=0.2
+                temperature=0.2,
+                response_format=JSON_RESPONSE_FORMAT
             )
             
             result = response.choices[0].message.content
-            return json.loads(result)
+            return _json_loads(result)
             
         except Exception as e:
             logger.error(f"Error finding best assignment: {str(e)}")
@@ -192,7 +218,7 @@ class OpenAIService:
             system_prompt = f"""
             You are an AI assistant for optimizing healthcare staff schedules.
             
-            Current assignments: {json.dumps(assignments_data, indent=2)}
+            Current assignments: {_json_dumps(assignments_data)}
             
             Analyze the schedule and provide optimization suggestions:
             1. conflicts: Any time conflicts or overbooked employees
@@ -203,16 +229,17 @@ class OpenAIService:
             Return as JSON format.
             """
             
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt}
                 ],
-                temperature=0.3
+                temperature=0.3,
+                response_format=JSON_RESPONSE_FORMAT
             )
             
             result = response.choices[0].message.content
-            return json.loads(result)
+            return _json_loads(result)
             
         except Exception as e:
             logger.error(f"Error generating schedule optimization: {str(e)}")
@@ -0,0 +1,93 @@
+"""
+Compact UK postcode -> (lat, lon) lookup table.
+
+The table is a flat binary file that is memory-mapped and searched with bisect,
+so lookups need no database and almost no memory:
+
+    b"PCT1" | uint32 count | count x (8-byte key, int32 lat_e6, int32 lon_e6)
+
+Keys are upper-case postcodes without spaces, NUL-padded to 8 bytes and sorted.
+Build one from any (postcode, lat, lon) source, e.g. the ONS Postcode Directory CSV,
+with build_postcode_table().
+"""
+import bisect
+import mmap
+import re
+import struct
+from typing import Iterable, Optional, Tuple
+
+_MAGIC = b"PCT1"
+_HEADER = struct.Struct("<4sI")
+_RECORD = struct.Struct("<8sii")
+_KEY_SIZE = 8
+_SCALE = 1_000_000
+
+# Full UK postcode (outward + inward code), with or without the space
+POSTCODE_RE = re.compile(r"\b([A-Z]{1,2}[0-9][A-Z0-9]?)\s*([0-9][A-Z]{2})\b")
+
+
+def postcode_key(postcode: str) -> bytes:
+    """Normalized table key for a postcode ('sw1a 1aa' -> b'SW1A1AA\\x00')"""
+    return postcode.replace(" ", "").upper().encode("ascii", "ignore")[:_KEY_SIZE].ljust(_KEY_SIZE, b"\0")
+
+
+def find_postcode(text: str) -> str:
+    """Last full UK postcode in free text (e.g. an address), or ''"""
+    matches = POSTCODE_RE.findall((text or "").upper())
+    return "".join(matches[-1]) if matches else ""
+
+
+def build_postcode_table(rows: Iterable[Tuple[str, float, float]], path: str) -> int:
+    """Write (postcode, lat, lon) rows as a table file; returns the number of records"""
+    records = {}
+    for postcode, lat, lon in rows:
+        if postcode and lat is not None and lon is not None:
+            records[postcode_key(postcode)] = (round(lat * _SCALE), round(lon * _SCALE))
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(records)))
+        for key in sorted(records):
+            f.write(_RECORD.pack(key, *records[key]))
+    return len(records)
+
+
+class _Keys:
+    """Sequence view of the record keys, so bisect can search the mapped file in place"""
+
+    def __init__(self, buf: mmap.mmap, count: int):
+        self._buf = buf
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytes:
+        offset = _HEADER.size + index * _RECORD.size
+        return self._buf[offset:offset + _KEY_SIZE]
+
+
+class PostcodeTable:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC or len(self._buf) < _HEADER.size + count * _RECORD.size:
+            self._buf.close()
+            raise ValueError(f"Not a postcode table: {path}")
+        self._keys = _Keys(self._buf, count)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def latlon(self, postcode: str) -> Optional[Tuple[float, float]]:
+        """(lat, lon) in degrees, or None if the postcode is not in the table"""
+        if not postcode:
+            return None
+        key = postcode_key(postcode)
+        index = bisect.bisect_left(self._keys, key)
+        if index == len(self._keys) or self._keys[index] != key:
+            return None
+        _, lat, lon = _RECORD.unpack_from(self._buf, _HEADER.size + index * _RECORD.size)
+        return lat / _SCALE, lon / _SCALE
+
+    def close(self):
+        self._buf.close()
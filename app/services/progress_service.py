@@ -1,11 +1,67 @@
 import asyncio
 import json
+import logging
+import time
 import uuid
-from typing import Dict, Optional, Callable
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Callable
 from datetime import datetime
 from fastapi import WebSocket
 from enum import Enum
 
+# Lazy %-style arguments: nothing is formatted when the level is disabled
+logger = logging.getLogger(__name__)
+
+# JSON frames are produced as UTF-8 bytes and sent as binary frames, skipping the
+# str -> bytes encode of send_text; the frontend decodes either frame type
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        # Naive datetimes come from SQLite CURRENT_TIMESTAMP, which is UTC
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC)
+except ImportError:  # stdlib fallback
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, default=str).encode("utf-8")
+
+try:
+    import msgpack
+except ImportError:  # clients then always get JSON
+    msgpack = None
+
+# WebSocket subprotocols: binary MessagePack frames, or zlib-compressed JSON. Clients that
+# request neither get plain JSON frames
+MSGPACK_SUBPROTOCOL = "msgpack"
+DEFLATE_SUBPROTOCOL = "json.deflate"
+
+# Broadcast frames are compressed once here instead of per socket by permessage-deflate
+# (disabled on the server); level 1 since progress frames are small and latency matters
+DEFLATE_LEVEL = 1
+
+# Progress timestamps only need seconds precision, so the formatted string is reused
+# until the wall-clock second changes
+_last_ts_sec = 0
+_last_ts_str = ""
+
+
+def _now_iso() -> str:
+    global _last_ts_sec, _last_ts_str
+    now = int(time.time())
+    if now != _last_ts_sec:
+        _last_ts_sec = now
+        _last_ts_str = datetime.fromtimestamp(now).isoformat()
+    return _last_ts_str
+
+# Finished tasks kept for the /progress endpoints; the oldest are evicted past this cap
+MAX_TASKS = 1000
+
+# How often the background sweep started by start_periodic_cleanup runs
+CLEANUP_INTERVAL_SECONDS = 300
+
+# Frames buffered per client; a client this far behind is dropped rather than slowing the rest
+CLIENT_QUEUE_SIZE = 64
+
 class ProgressStatus(Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -16,138 +72,290 @@ class ProgressType(Enum):
     WEEKLY_ROTA = "weekly_rota"
     CREATE_ASSIGNMENT = "create_assignment"
 
+# Plain status strings resolved once, since tasks store the values rather than the members
+_STATUS_PENDING, _STATUS_IN_PROGRESS, _STATUS_COMPLETED, _STATUS_FAILED = (s.value for s in ProgressStatus)
+
+class ProgressTask:
+    """A tracked background task; clients receive it as a dict via to_dict()"""
+    # Hand-written slots: @dataclass(slots=True) needs Python 3.10
+    __slots__ = ("id", "type", "status", "description", "progress", "current_step", "total_steps",
+                 "created_at", "updated_at", "result", "error")
+
+    def __init__(self, id: str, type: str, status: str, description: str, progress: int = 0,
+                 current_step: str = "", total_steps: int = 0, created_at: str = "", updated_at: str = "",
+                 result: Any = None, error: Optional[str] = None):
+        self.id = id
+        self.type = type
+        self.status = status
+        self.description = description
+        self.progress = progress
+        self.current_step = current_step
+        self.total_steps = total_steps
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.result = result
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Shallow on purpose: large results are passed through, not copied
+        return {name: getattr(self, name) for name in self.__slots__}
+
 class ProgressService:
     def __init__(self, notification_service=None):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.progress_tasks: Dict[str, Dict] = {}
+        # client_id -> negotiated subprotocol (None for plain JSON)
+        self.client_protocols: Dict[str, Optional[str]] = {}
+        # Per-client outbound frames, drained by one writer task per connection
+        self._outboxes: Dict[str, asyncio.Queue] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+        self.progress_tasks: Dict[str, ProgressTask] = {}
         self.task_callbacks: Dict[str, Callable] = {}
         self.notification_service = notification_service
+        # task_id -> task awaiting broadcast; update_progress calls within one
+        # event-loop turn are coalesced into a single frame by _flush_pending
+        self._pending: Dict[str, ProgressTask] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Finished task_id -> completion time (time.monotonic), oldest first, so cleanup only
+        # touches expired tasks; a monotonic clock keeps that order valid across wall-clock changes
+        self._terminal: "OrderedDict[str, float]" = OrderedDict()
+        self._cleanup_handle: Optional[asyncio.TimerHandle] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
     
     async def connect(self, websocket: WebSocket, client_id: str):
-        """Connect a new WebSocket client"""
-        await websocket.accept()
+        """Connect a new WebSocket client, negotiating MessagePack or compressed JSON frames if requested"""
+        requested = websocket.scope.get("subprotocols") or []
+        if msgpack and MSGPACK_SUBPROTOCOL in requested:
+            subprotocol = MSGPACK_SUBPROTOCOL
+        elif DEFLATE_SUBPROTOCOL in requested:
+            subprotocol = DEFLATE_SUBPROTOCOL
+        else:
+            subprotocol = None
+        await websocket.accept(subprotocol=subprotocol)
+        # A reconnect under the same id replaces the old connection's writer
+        self._stop_writer(client_id)
         self.active_connections[client_id] = websocket
-        print(f"Client {client_id} connected. Total connections: {len(self.active_connections)}")
+        self.client_protocols[client_id] = subprotocol
+        outbox = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._outboxes[client_id] = outbox
+        self._writers[client_id] = asyncio.create_task(self._writer(client_id, websocket, outbox))
+        logger.info("Client %s connected. Total connections: %d", client_id, len(self.active_connections))
     
     def disconnect(self, client_id: str):
         """Disconnect a WebSocket client"""
         if client_id in self.active_connections:
             del self.active_connections[client_id]
-        print(f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}")
+        self.client_protocols.pop(client_id, None)
+        self._stop_writer(client_id)
+        logger.info("Client %s disconnected. Total connections: %d", client_id, len(self.active_connections))
     
-    async def broadcast_progress(self, task_id: str, progress_data: Dict):
-        """Broadcast progress to all connected clients"""
-        message = {
+    def _stop_writer(self, client_id: str):
+        self._outboxes.pop(client_id, None)
+        writer = self._writers.pop(client_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+    
+    async def _writer(self, client_id: str, websocket: WebSocket, outbox: asyncio.Queue):
+        """Send a client's queued frames in order; None means it fell behind and is closed"""
+        try:
+            while True:
+                frame = await outbox.get()
+                if frame is None:
+                    await websocket.close(code=1013)  # try again later; the frontend reconnects
+                    return
+                await websocket.send_bytes(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Failed to send message to client %s: %s", client_id, e)
+            if self.active_connections.get(client_id) is websocket:
+                self.disconnect(client_id)
+    
+    def _progress_message(self, task_id: str, progress_data: Dict, timestamp: str = None) -> Dict:
+        return {
             "type": "progress_update",
             "task_id": task_id,
             "data": progress_data,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp or _now_iso()
         }
+    
+    async def broadcast_progress(self, task_id: str, progress_data: Dict):
+        """Broadcast progress to all connected clients"""
+        await self._broadcast(self._progress_message(task_id, progress_data))
+    
+    def _schedule_progress(self, task_id: str, task: ProgressTask):
+        """Queue a task for the next coalesced flush"""
+        self._pending[task_id] = task
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending())
+    
+    async def _flush_pending(self):
+        """Send everything queued during the current event-loop turn as one frame"""
+        await asyncio.sleep(0)
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        if len(pending) == 1:
+            task_id, task = next(iter(pending.items()))
+            await self.broadcast_progress(task_id, task.to_dict())
+            return
+        # Several tasks moved at once: one progress_batch frame carrying a progress_update per task
+        timestamp = _now_iso()
+        await self._broadcast({
+            "type": "progress_batch",
+            "updates": [self._progress_message(task_id, task.to_dict(), timestamp) for task_id, task in pending.items()],
+            "timestamp": timestamp
+        })
+    
+    async def _broadcast(self, message: Dict):
+        """Send one message to every connected client"""
+        # Same payload for every client, so serialize (and compress) it once per wire format
+        payload = _json_dumps(message)
+        frames = {None: payload}
+        protocols = set(self.client_protocols.values())
+        if MSGPACK_SUBPROTOCOL in protocols:
+            frames[MSGPACK_SUBPROTOCOL] = msgpack.packb(message, use_bin_type=True, default=str)
+        if DEFLATE_SUBPROTOCOL in protocols:
+            frames[DEFLATE_SUBPROTOCOL] = zlib.compress(payload, DEFLATE_LEVEL)
         
-        disconnected_clients = []
-        for client_id, websocket in self.active_connections.items():
+        # Only enqueue here; each client's writer task does the actual send, so a slow
+        # socket can't delay the others and a client that stops reading is dropped.
+        # Iterate a snapshot: _drop_slow_client removes entries from _outboxes mid-loop
+        clients = list(self._outboxes.items())
+        # Loop-invariant lookups bound to locals once per broadcast
+        protocol_of = self.client_protocols.get
+        frame_for = frames.get
+        for client_id, outbox in clients:
+            frame = frame_for(protocol_of(client_id), payload)
             try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                print(f"Failed to send message to client {client_id}: {e}")
-                disconnected_clients.append(client_id)
-        
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+                outbox.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning("Client %s is not keeping up; dropping connection", client_id)
+                self._drop_slow_client(client_id, outbox)
+    
+    def _drop_slow_client(self, client_id: str, outbox: asyncio.Queue):
+        """Discard a backed-up client's frames and let its writer close the socket"""
+        while not outbox.empty():
+            outbox.get_nowait()
+        outbox.put_nowait(None)
+        # Unregister without cancelling the writer, which still has to send the close frame
+        self._writers.pop(client_id, None)
+        self.disconnect(client_id)
     
     def create_task(self, task_type: ProgressType, description: str) -> str:
         """Create a new progress task"""
         task_id = str(uuid.uuid4())
-        self.progress_tasks[task_id] = {
-            "id": task_id,
-            "type": task_type.value,
-            "status": ProgressStatus.PENDING.value,
-            "description": description,
-            "progress": 0,
-            "current_step": "",
-            "total_steps": 0,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
-            "result": None,
-            "error": None
-        }
+        now = _now_iso()
+        self.progress_tasks[task_id] = ProgressTask(
+            id=task_id,
+            type=task_type.value,
+            status=_STATUS_PENDING,
+            description=description,
+            created_at=now,
+            updated_at=now
+        )
+        # Evict the longest-finished tasks first; running tasks are never dropped
+        while len(self.progress_tasks) > MAX_TASKS and self._terminal:
+            finished_id, _ = self._terminal.popitem(last=False)
+            self.progress_tasks.pop(finished_id, None)
         return task_id
     
     async def update_progress(self, task_id: str, progress: int, current_step: str = "", total_steps: int = None):
         """Update progress for a specific task"""
-        if task_id not in self.progress_tasks:
+        task = self.progress_tasks.get(task_id)
+        if task is None:
             return
         
-        self.progress_tasks[task_id]["progress"] = progress
-        self.progress_tasks[task_id]["current_step"] = current_step
+        task.progress = progress
+        task.current_step = current_step
         if total_steps:
-            self.progress_tasks[task_id]["total_steps"] = total_steps
-        self.progress_tasks[task_id]["updated_at"] = datetime.now().isoformat()
+            task.total_steps = total_steps
+        task.updated_at = _now_iso()
         
-        await self.broadcast_progress(task_id, self.progress_tasks[task_id])
+        self._schedule_progress(task_id, task)
     
     async def complete_task(self, task_id: str, result: Dict = None, error: str = None):
         """Mark a task as completed"""
-        if task_id not in self.progress_tasks:
+        task = self.progress_tasks.get(task_id)
+        if task is None:
             return
         
-        self.progress_tasks[task_id]["status"] = ProgressStatus.COMPLETED.value if not error else ProgressStatus.FAILED.value
-        self.progress_tasks[task_id]["progress"] = 100 if not error else 0
-        self.progress_tasks[task_id]["updated_at"] = datetime.now().isoformat()
-        self.progress_tasks[task_id]["result"] = result
-        self.progress_tasks[task_id]["error"] = error
+        task.status = _STATUS_COMPLETED if not error else _STATUS_FAILED
+        task.progress = 100 if not error else 0
+        task.updated_at = _now_iso()
+        task.result = result
+        task.error = error
+        self._terminal[task_id] = time.monotonic()
+        self._terminal.move_to_end(task_id)
         
         # Create notification in database if notification service is available
         if self.notification_service:
             try:
-                task_data = self.progress_tasks[task_id]
                 if error:
                     self.notification_service.create_task_failure_notification(
-                        task_data["type"], error
+                        task.type, error
                     )
                 else:
                     self.notification_service.create_task_completion_notification(
-                        task_data["type"], result
+                        task.type, result
                     )
             except Exception as e:
-                print(f"Failed to create notification: {e}")
+                logger.error("Failed to create notification: %s", e)
         
-        await self.broadcast_progress(task_id, self.progress_tasks[task_id])
+        # This broadcast carries the full final state, so a queued update would only arrive stale
+        self._pending.pop(task_id, None)
+        await self.broadcast_progress(task_id, task.to_dict())
     
     async def start_task(self, task_id: str):
         """Start a task"""
-        if task_id not in self.progress_tasks:
+        task = self.progress_tasks.get(task_id)
+        if task is None:
             return
         
-        self.progress_tasks[task_id]["status"] = ProgressStatus.IN_PROGRESS.value
-        self.progress_tasks[task_id]["updated_at"] = datetime.now().isoformat()
+        task.status = _STATUS_IN_PROGRESS
+        task.updated_at = _now_iso()
         
-        await self.broadcast_progress(task_id, self.progress_tasks[task_id])
+        await self.broadcast_progress(task_id, task.to_dict())
     
     def get_task(self, task_id: str) -> Optional[Dict]:
         """Get task information"""
-        return self.progress_tasks.get(task_id)
+        task = self.progress_tasks.get(task_id)
+        return task.to_dict() if task else None
     
     def get_all_tasks(self) -> Dict[str, Dict]:
         """Get all tasks"""
-        return self.progress_tasks
+        return {task_id: task.to_dict() for task_id, task in self.progress_tasks.items()}
     
     async def cleanup_old_tasks(self, max_age_hours: int = 24):
-        """Clean up old completed tasks"""
-        cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
-        tasks_to_remove = []
+        """Clean up tasks that finished more than max_age_hours ago"""
+        cutoff_time = time.monotonic() - (max_age_hours * 3600)
+        removed = 0
         
-        for task_id, task in self.progress_tasks.items():
-            task_time = datetime.fromisoformat(task["created_at"]).timestamp()
-            if task_time < cutoff_time and task["status"] in [ProgressStatus.COMPLETED.value, ProgressStatus.FAILED.value]:
-                tasks_to_remove.append(task_id)
+        # _terminal is ordered by completion time, so stop at the first task still in its window
+        while self._terminal and next(iter(self._terminal.values())) < cutoff_time:
+            task_id, _ = self._terminal.popitem(last=False)
+            self.progress_tasks.pop(task_id, None)
+            removed += 1
         
-        for task_id in tasks_to_remove:
-            del self.progress_tasks[task_id]
+        if removed:
+            logger.info("Cleaned up %d old tasks", removed)
+
+    def start_periodic_cleanup(self, interval_s: float = CLEANUP_INTERVAL_SECONDS, max_age_hours: int = 24):
+        """Run cleanup_old_tasks every interval_s seconds on the running event loop"""
+        if self._cleanup_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
         
-        if tasks_to_remove:
-            print(f"Cleaned up {len(tasks_to_remove)} old tasks")
+        def tick():
+            self._cleanup_task = loop.create_task(self.cleanup_old_tasks(max_age_hours))
+            self._cleanup_handle = loop.call_later(interval_s, tick)
+        
+        self._cleanup_handle = loop.call_later(interval_s, tick)
+    
+    def stop_periodic_cleanup(self):
+        """Cancel the sweep scheduled by start_periodic_cleanup"""
+        if self._cleanup_handle is not None:
+            self._cleanup_handle.cancel()
+            self._cleanup_handle = None
 
 # Global instance
 progress_service = ProgressService() 
\ No newline at end of file
@@ -1,7 +1,11 @@
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set
+from collections import defaultdict
 from datetime import datetime, timedelta
 import logging
 
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
 from .data_processor import DataProcessor
 from .openai_service import OpenAIService
 from .travel_service import TravelService
@@ -14,14 +18,51 @@ from .scheduler_core import SchedulerCore
 
 logger = logging.getLogger(__name__)
 
+# Stored service_type value -> enum member (avoids ServiceType(...) per row)
+_SERVICE_TYPES = {member.value: member for member in ServiceType}
+
+# Free-text service names from the AI extraction -> enum (unknown values fall back to medicine)
+_SERVICE_ALIASES = {
+    "medicine": ServiceType.MEDICINE,
+    "exercise": ServiceType.EXERCISE,
+    "companionship": ServiceType.COMPANIONSHIP,
+    "personal_care": ServiceType.PERSONAL_CARE,
+    "personal": ServiceType.PERSONAL_CARE,
+    "care": ServiceType.PERSONAL_CARE
+}
+
+# Assignment columns that must be non-empty for a row to become an EmployeeAssignment
+_REQUIRED_ASSIGNMENT_FIELDS = ('employee_id', 'employee_name', 'patient_id', 'patient_name', 'assigned_time')
+
+
+# Legacy weekly schedule cost model: travel minutes plus this many minutes per visit already on the employee
+WORKLOAD_PENALTY_MINUTES = 10
+# Cost for unqualified (patient, employee) pairs; pairs solved at this cost are discarded
+_INFEASIBLE_COST = 1e9
+
+
+def _or_default(value: Any, default: Any) -> Any:
+    """NULL-column fallback that keeps legitimate zeros"""
+    return default if value is None else value
+
 class RotaService:
     def __init__(self, data_processor: DataProcessor, openai_service: OpenAIService, db_manager: DatabaseManager, travel_service: TravelService):
         self.data_processor = data_processor
         self.openai_service = openai_service
         self.current_assignments: List[EmployeeAssignment] = []
+        # assignments.id -> position in current_assignments
+        self._by_db_id: Dict[int, int] = {}
+        # Per-employee assignments and running totals for schedule summaries
+        self._by_employee: Dict[str, List[EmployeeAssignment]] = defaultdict(list)
+        self._sum_duration_by_emp: Dict[str, int] = defaultdict(int)
+        self._sum_travel_by_emp: Dict[str, int] = defaultdict(int)
         self.db_manager = db_manager
         self.travel_service = travel_service
         self.scheduler_core = SchedulerCore(self.data_processor, self.travel_service, self.db_manager)
+        # Employees with spare capacity per service type; rebuilt whenever the employee list is replaced
+        self._free_employees_by_service: Dict[ServiceType, Dict[str, Employee]] = {}
+        self._qualified_services: Dict[str, Set[ServiceType]] = {}
+        self._free_index_source: Optional[List[Employee]] = None
         # Load existing assignments from database
         self._load_assignments_from_database()
     
@@ -29,27 +70,36 @@ class RotaService:
         """Load existing assignments from database"""
         try:
             db_assignments = self.db_manager.get_assignments()
-            self.current_assignments = []
-            for assignment_data in db_assignments:
-                try:
-                    assignment = EmployeeAssignment(
-                        employee_id=assignment_data['employee_id'],
-                        employee_name=assignment_data['employee_name'],
-                        patient_id=assignment_data['patient_id'],
-                        patient_name=assignment_data['patient_name'],
-                        service_type=ServiceType(assignment_data['service_type']),
-                        assigned_time=assignment_data['assigned_time'],
-                        estimated_duration=assignment_data.get('duration', 30),
-                        travel_time=assignment_data.get('travel_time', 15),
-                        start_time=assignment_data.get('start_time', ''),
-                        end_time=assignment_data.get('end_time', ''),
-                        priority_score=assignment_data.get('priority_score', 5.0),
-                        assignment_reason=assignment_data.get('reasoning', '')
-                    )
-                    self.current_assignments.append(assignment)
-                except Exception as e:
-                    logger.warning(f"Error loading assignment {assignment_data.get('id', 'unknown')}: {str(e)}")
             
+            # Rows come from our own schema, so validate just the parts that can be wrong
+            # up front and build the models without per-field pydantic validation
+            valid_rows = []
+            for row in db_assignments:
+                if row.get('service_type') in _SERVICE_TYPES and all(row.get(f) for f in _REQUIRED_ASSIGNMENT_FIELDS):
+                    valid_rows.append(row)
+                else:
+                    logger.warning(f"Error loading assignment {row.get('id', 'unknown')}: missing fields or unknown service type")
+            
+            self.current_assignments = [
+                EmployeeAssignment.model_construct(
+                    db_id=row.get('id'),
+                    employee_id=row['employee_id'],
+                    employee_name=row['employee_name'],
+                    patient_id=row['patient_id'],
+                    patient_name=row['patient_name'],
+                    service_type=_SERVICE_TYPES[row['service_type']],
+                    assigned_time=row['assigned_time'],
+                    estimated_duration=_or_default(row.get('duration'), 30),
+                    travel_time=_or_default(row.get('travel_time'), 15),
+                    start_time=row.get('start_time') or '',
+                    end_time=row.get('end_time') or '',
+                    priority_score=_or_default(row.get('priority_score'), 5.0),
+                    assignment_reason=row.get('reasoning') or ''
+                )
+                for row in valid_rows
+            ]
+            
+            self._reindex()
             logger.info(f"Loaded {len(self.current_assignments)} assignments from database")
         except Exception as e:
             logger.error(f"Error loading assignments from database: {str(e)}")
@@ -85,22 +135,15 @@ class RotaService:
                 raise Exception(f"No qualified employees available for {service_type.value} service")
             
             # Step 5: Filter available employees based on current workload
-            available_employees = self._filter_available_employees(qualified_employees)
+            available_employees = self._filter_available_employees(service_type)
             
             if not available_employees:
                 raise Exception("No employees available at this time")
             
             # Calculate travel times (cached) using full addresses with postcodes when available
-            employee_travel_times = {}
-            patient_origin_full = f"{patient.Address}, {patient.PostCode}" if patient.PostCode and patient.PostCode not in patient.Address else patient.Address
-            for emp in available_employees:
-                emp_origin_full = f"{emp.Address}, {emp.PostCode}" if emp.PostCode and emp.PostCode not in emp.Address else emp.Address
-                travel_time = self.travel_service.get_travel_time(
-                    origin=emp_origin_full,
-                    destination=patient_origin_full,
-                    mode=emp.TransportMode.value
-                )
-                employee_travel_times[emp.EmployeeID] = travel_time
+            employee_origins = [(emp.EmployeeID, emp.full_address, emp.TransportMode.value) for emp in available_employees]
+            # One batched matrix lookup per transport mode rather than one request per employee
+            employee_travel_times = self.travel_service.get_travel_time_matrix(employee_origins, patient.full_address)
 
             # Enhanced context with more details
             context = {
@@ -128,11 +171,8 @@ class RotaService:
                 preferred_time=preferred_time
             )
             
-            # Step 8: Add to current assignments
-            self.current_assignments.append(assignment)
-            
-            # Step 9: Update employee's current assignment count
-            selected_employee.current_assignments += 1
+            # Steps 8-9: Record the assignment and update the employee's assignment count
+            self._record_assignment(assignment, selected_employee)
             
             logger.info(f"Assignment created: {selected_employee.Name} -> {patient.PatientName} for {service_type.value}")
             
@@ -143,9 +183,6 @@ class RotaService:
                 details={"prompt": prompt, "service_type": service_type_str}
             )
 
-            # After creating assignment
-            self.db_manager.log_assignment(assignment.dict())
-
             return assignment
             
         except Exception as e:
@@ -160,23 +197,15 @@ class RotaService:
         self.db_manager.log_operation("weekly_schedule", f"Starting weekly schedule generation (engine={engine})")
         try:
             if engine == "core":
-                summary = self.scheduler_core.generate_weekly_rota()
+                summary = await self.scheduler_core.generate_weekly_rota()
                 logger.info(f"SchedulerCore summary: {summary}")
                 # Return DB rows with IDs
                 assignments = self.db_manager.get_assignments()
                 self.db_manager.log_operation("weekly_schedule", "Completed weekly schedule (core)", {"assignments_count": len(assignments)})
                 return assignments
             else:
-                # Legacy AI-driven per-patient flow
-                legacy_assignments: List[EmployeeAssignment] = []
-                for patient in self.data_processor.patients:
-                    try:
-                        prompt = f"Assign employee for patient {patient.PatientID} requiring {patient.RequiredSupport}"
-                        assignment = await self.process_assignment_request(prompt)
-                        legacy_assignments.append(assignment)
-                    except Exception as e:
-                        logger.error(f"Failed to assign for {patient.PatientID}: {str(e)}")
-                legacy_assignments.sort(key=lambda a: a.assigned_time)
+                # Legacy flow: one visit per patient, solved as a single min-cost assignment
+                legacy_assignments = self._solve_legacy_assignments()
                 self.db_manager.log_operation("weekly_schedule", "Completed weekly schedule (legacy)", {"assignments_count": len(legacy_assignments)})
                 # For compatibility with frontend editing, return DB rows instead
                 return self.db_manager.get_assignments()
@@ -184,29 +213,168 @@ class RotaService:
             logger.error(f"Error in generate_weekly_schedule: {e}")
             raise
     
+    def _track_assignment(self, assignment: EmployeeAssignment, employee: Employee) -> int:
+        """Add a new assignment to memory and bump the employee's count; returns its position"""
+        self.current_assignments.append(assignment)
+        self._bucket_add(assignment)
+        employee.current_assignments += 1
+        self._sync_free_employee(employee)
+        return len(self.current_assignments) - 1
+
+    def _record_assignment(self, assignment: EmployeeAssignment, employee: Employee):
+        """Track a new assignment and persist it"""
+        position = self._track_assignment(assignment, employee)
+        assignment.db_id = self.db_manager.log_assignment(assignment.model_dump(mode="json"))
+        self._by_db_id[assignment.db_id] = position
+
+    def _solve_legacy_assignments(self) -> List[EmployeeAssignment]:
+        """Assign one visit per patient by minimising travel plus workload over all patients at once.
+
+        Each employee contributes one column per remaining daily slot, so capacity is respected and
+        later slots cost more, which spreads visits across employees. Unqualified pairs are infeasible.
+        """
+        patients = self.data_processor.patients
+        employees = self.data_processor.employees
+        if not patients or not employees:
+            return []
+
+        # Column -> employee index, one column per free slot (never more than there are patients)
+        slot_employee: List[int] = []
+        slot_load: List[int] = []
+        for j, emp in enumerate(employees):
+            free = min(emp.max_patients_per_day - emp.current_assignments, len(patients))
+            slot_employee.extend([j] * max(free, 0))
+            slot_load.extend(range(emp.current_assignments, emp.current_assignments + max(free, 0)))
+        if not slot_employee:
+            logger.warning("No employee capacity left for the weekly schedule")
+            return []
+        slot_employee_arr = np.array(slot_employee)
+        workload = np.array(slot_load, dtype=np.float64) * WORKLOAD_PENALTY_MINUTES
+
+        qualified: Dict[ServiceType, np.ndarray] = {}
+        service_types: List[ServiceType] = []
+        travel_minutes = np.empty((len(patients), len(employees)), dtype=np.float64)
+        cost = np.empty((len(patients), len(slot_employee)), dtype=np.float64)
+        for i, patient in enumerate(patients):
+            services = self.data_processor.get_patient_services(patient)
+            service_type = services[0] if services else ServiceType.MEDICINE
+            service_types.append(service_type)
+            if service_type not in qualified:
+                ids = {emp.EmployeeID for emp in self.data_processor.get_qualified_employees_for_service(service_type)}
+                qualified[service_type] = np.array([emp.EmployeeID in ids for emp in employees])
+            travel = self.travel_service.get_travel_time_matrix(
+                [(j, emp.full_address, emp.TransportMode.value) for j, emp in enumerate(employees)],
+                patient.full_address
+            )
+            travel_minutes[i] = [travel[j] for j in range(len(employees))]
+            row = travel_minutes[i][slot_employee_arr] + workload
+            row[~qualified[service_type][slot_employee_arr]] = _INFEASIBLE_COST
+            cost[i] = row
+
+        patient_idx, slot_idx = linear_sum_assignment(cost)
+
+        assignments: List[EmployeeAssignment] = []
+        positions: List[int] = []
+        for i, col in zip(patient_idx, slot_idx):
+            patient = patients[i]
+            if cost[i, col] >= _INFEASIBLE_COST:
+                logger.error(f"Failed to assign for {patient.PatientID}: no qualified employee with capacity")
+                continue
+            j = slot_employee[col]
+            employee = employees[j]
+            service_type = service_types[i]
+            assignment = self._create_assignment(
+                employee=employee,
+                patient=patient,
+                service_type=service_type,
+                ai_result={
+                    "estimated_travel_time": int(travel_minutes[i, j]),
+                    "estimated_duration": self.data_processor.get_default_service_duration(service_type),
+                    "reasoning": "Weekly schedule: lowest combined travel and workload across all patients"
+                }
+            )
+            positions.append(self._track_assignment(assignment, employee))
+            assignments.append(assignment)
+
+        # Persist the whole plan in one transaction
+        db_ids = self.db_manager.log_assignments_bulk([a.model_dump(mode="json") for a in assignments])
+        for assignment, position, db_id in zip(assignments, positions, db_ids):
+            assignment.db_id = db_id
+            self._by_db_id[db_id] = position
+
+        unassigned = len(patients) - len(assignments)
+        if unassigned:
+            logger.warning(f"{unassigned} patients left unassigned by the weekly schedule")
+        assignments.sort(key=lambda a: a.assigned_time)
+        return assignments
+
+    def _reindex(self):
+        """Rebuild the db id and per-employee lookups after current_assignments is replaced"""
+        self._by_db_id = {
+            assignment.db_id: i
+            for i, assignment in enumerate(self.current_assignments)
+            if assignment.db_id is not None
+        }
+        self._by_employee = defaultdict(list)
+        self._sum_duration_by_emp = defaultdict(int)
+        self._sum_travel_by_emp = defaultdict(int)
+        for assignment in self.current_assignments:
+            self._bucket_add(assignment)
+
+    def _bucket_add(self, assignment: EmployeeAssignment):
+        emp_id = assignment.employee_id
+        self._by_employee[emp_id].append(assignment)
+        self._sum_duration_by_emp[emp_id] += assignment.estimated_duration
+        self._sum_travel_by_emp[emp_id] += assignment.travel_time
+
+    def _bucket_remove(self, assignment: EmployeeAssignment):
+        emp_id = assignment.employee_id
+        bucket = self._by_employee.get(emp_id, [])
+        for i, existing in enumerate(bucket):
+            if existing is assignment:
+                del bucket[i]
+                self._sum_duration_by_emp[emp_id] -= assignment.estimated_duration
+                self._sum_travel_by_emp[emp_id] -= assignment.travel_time
+                break
+        if not bucket:
+            self._by_employee.pop(emp_id, None)
+            self._sum_duration_by_emp.pop(emp_id, None)
+            self._sum_travel_by_emp.pop(emp_id, None)
+
     def _map_service_type(self, service_str: str) -> ServiceType:
         """Map string to ServiceType enum"""
-        service_mapping = {
-            "medicine": ServiceType.MEDICINE,
-            "exercise": ServiceType.EXERCISE,
-            "companionship": ServiceType.COMPANIONSHIP,
-            "personal_care": ServiceType.PERSONAL_CARE,
-            "personal": ServiceType.PERSONAL_CARE,
-            "care": ServiceType.PERSONAL_CARE
-        }
-        
-        return service_mapping.get(service_str.lower(), ServiceType.MEDICINE)
+        return _SERVICE_ALIASES.get(service_str.lower(), ServiceType.MEDICINE)
     
-    def _filter_available_employees(self, employees: List[Employee]) -> List[Employee]:
-        """Filter employees based on availability and current workload"""
-        available = []
-        
-        for emp in employees:
-            # Check if employee is not overloaded
-            if emp.current_assignments < emp.max_patients_per_day:
-                available.append(emp)
-        
-        return available
+    def _filter_available_employees(self, service_type: ServiceType) -> List[Employee]:
+        """Qualified employees for the service who are not yet at their daily cap"""
+        if self._free_index_source is not self.data_processor.employees:
+            self._rebuild_free_index()
+        return list(self._free_employees_by_service.get(service_type, {}).values())
+
+    def _rebuild_free_index(self):
+        """Index qualified employees with spare capacity by service type"""
+        self._free_index_source = self.data_processor.employees
+        self._free_employees_by_service = {}
+        self._qualified_services = {}
+        for service_type in ServiceType:
+            free = {}
+            for emp in self.data_processor.get_qualified_employees_for_service(service_type):
+                self._qualified_services.setdefault(emp.EmployeeID, set()).add(service_type)
+                if emp.current_assignments < emp.max_patients_per_day:
+                    free[emp.EmployeeID] = emp
+            self._free_employees_by_service[service_type] = free
+
+    def _sync_free_employee(self, employee: Employee):
+        """Add or drop an employee from the free index after their assignment count changed"""
+        if self._free_index_source is not self.data_processor.employees:
+            # Index is stale (employees reloaded); the next lookup rebuilds it
+            return
+        has_capacity = employee.current_assignments < employee.max_patients_per_day
+        for service_type in self._qualified_services.get(employee.EmployeeID, ()):
+            if has_capacity:
+                self._free_employees_by_service[service_type][employee.EmployeeID] = employee
+            else:
+                self._free_employees_by_service[service_type].pop(employee.EmployeeID, None)
     
     def _create_assignment(
         self, 
@@ -224,14 +392,15 @@ class RotaService:
         # Use preferred time if provided, otherwise use current time + 1 hour
         if preferred_time:
             try:
-                assigned_time = datetime.strptime(preferred_time, "%H:%M").time()
+                # "HH:MM" only, same as strptime("%H:%M") but without the regex machinery
+                hour, _, minute = preferred_time.partition(":")
                 start_datetime = current_time.replace(
-                    hour=assigned_time.hour, 
-                    minute=assigned_time.minute, 
+                    hour=int(hour), 
+                    minute=int(minute), 
                     second=0, 
                     microsecond=0
                 )
-            except:
+            except Exception:
                 start_datetime = current_time + timedelta(hours=1)
         else:
             start_datetime = current_time + timedelta(hours=1)
@@ -294,22 +463,21 @@ class RotaService:
             
             if success:
                 # Update the in-memory assignment
-                for i, assignment in enumerate(self.current_assignments):
-                    # Try to match by all unique identifiers since we don't store DB ID in memory
-                    if (assignment.employee_id == db_assignment['employee_id'] and 
-                        assignment.patient_id == db_assignment['patient_id'] and
-                        assignment.assigned_time == db_assignment['assigned_time']):
-                        
-                        # Apply updates to the in-memory assignment
-                        assignment_dict = assignment.dict()
-                        assignment_dict.update(updates)
-                        
-                        # Create updated assignment object
-                        updated_assignment = EmployeeAssignment(**assignment_dict)
-                        self.current_assignments[i] = updated_assignment
-                        
-                        logger.info(f"Updated assignment {assignment_id} in memory and database")
-                        break
+                i = self._by_db_id.get(assignment_id)
+                if i is not None:
+                    # Apply updates to the in-memory assignment; the API has already validated them,
+                    # so copy rather than re-validating every field
+                    current = self.current_assignments[i]
+                    changes = {k: v for k, v in updates.items() if k in EmployeeAssignment.model_fields}
+                    if isinstance(changes.get('service_type', ServiceType.MEDICINE), ServiceType):
+                        updated_assignment = current.model_copy(update=changes)
+                    else:
+                        updated_assignment = EmployeeAssignment(**{**current.model_dump(), **changes})
+                    self._bucket_remove(self.current_assignments[i])
+                    self.current_assignments[i] = updated_assignment
+                    self._bucket_add(updated_assignment)
+                    
+                    logger.info(f"Updated assignment {assignment_id} in memory and database")
                 
                 # Log operation
                 self.db_manager.log_operation(
@@ -339,20 +507,23 @@ class RotaService:
             success = self.db_manager.delete_assignment(assignment_id)
             
             if success:
-                # Remove from in-memory assignments
-                for i, assignment in enumerate(self.current_assignments):
-                    if (assignment.employee_id == db_assignment['employee_id'] and 
-                        assignment.patient_id == db_assignment['patient_id'] and
-                        assignment.assigned_time == db_assignment['assigned_time']):
-                        
-                        del self.current_assignments[i]
-                        logger.info(f"Removed assignment {assignment_id} from memory")
-                        break
+                # Remove from in-memory assignments; the last entry is moved into the gap
+                # so no other positions shift (listing order comes from the database)
+                i = self._by_db_id.pop(assignment_id, None)
+                if i is not None:
+                    self._bucket_remove(self.current_assignments[i])
+                    last = self.current_assignments.pop()
+                    if i < len(self.current_assignments):
+                        self.current_assignments[i] = last
+                        if last.db_id is not None:
+                            self._by_db_id[last.db_id] = i
+                    logger.info(f"Removed assignment {assignment_id} from memory")
                 
                 # Update employee assignment count if possible
                 employee = self.data_processor.get_employee_by_id(db_assignment['employee_id'])
                 if employee and employee.current_assignments > 0:
                     employee.current_assignments -= 1
+                    self._sync_free_employee(employee)
                 
                 # Log operation
                 self.db_manager.log_operation(
@@ -378,20 +549,13 @@ class RotaService:
         if not employee:
             raise Exception(f"Employee {employee_id} not found")
         
-        # Filter assignments for this employee and date
-        employee_assignments = [
-            assignment for assignment in self.current_assignments
-            if assignment.employee_id == employee_id
-        ]
+        # Assignments for this employee
+        employee_assignments = list(self._by_employee.get(employee_id, ()))
         
-        # Calculate metrics
-        total_working_hours = sum(
-            assignment.estimated_duration for assignment in employee_assignments
-        ) / 60.0  # Convert to hours
+        # Calculate metrics from the running totals
+        total_working_hours = self._sum_duration_by_emp.get(employee_id, 0) / 60.0  # Convert to hours
         
-        total_travel_time = sum(
-            assignment.travel_time for assignment in employee_assignments
-        )
+        total_travel_time = self._sum_travel_by_emp.get(employee_id, 0)
         
         # Calculate workload percentage (assuming 8-hour workday)
         workload_percentage = (total_working_hours / 8.0) * 100
@@ -413,29 +577,24 @@ class RotaService:
         
         # This would use the OpenAI service to optimize
         # For now, return basic analysis
-        employees_workload = {}
-        for assignment in self.current_assignments:
-            emp_id = assignment.employee_id
-            if emp_id not in employees_workload:
-                employees_workload[emp_id] = []
-            employees_workload[emp_id].append(assignment)
+        employees_involved = len(self._by_employee)
         
         return {
             "total_assignments": len(self.current_assignments),
-            "employees_involved": len(employees_workload),
-            "average_assignments_per_employee": len(self.current_assignments) / max(1, len(employees_workload))
+            "employees_involved": employees_involved,
+            "average_assignments_per_employee": len(self.current_assignments) / max(1, employees_involved)
         }
     
     def clear_assignments(self):
         """Clear all current assignments (for testing/reset)"""
         self.current_assignments = []
+        self._reindex()
         # Clear assignments from database
-        cursor = self.db_manager.conn.cursor()
-        cursor.execute("DELETE FROM assignments")
-        self.db_manager.conn.commit()
-        # Reset employee assignment counts
+        self.db_manager.reset_assignments()
+        # Reset employee assignment counts (they only live on the in-memory models)
         for employee in self.data_processor.employees:
             employee.current_assignments = 0
+        self._rebuild_free_index()
         logger.info("Cleared all assignments from memory and database")
     
     def validate_assignment_rules(self, assignment: EmployeeAssignment) -> List[str]:
@@ -450,12 +609,11 @@ class RotaService:
             return violations
         
         # Rule 1: Medicine services require qualified personnel (nurses)
-        if assignment.service_type == ServiceType.MEDICINE:
-            if employee.Qualification != QualificationEnum.NURSE:
-                violations.append("Medicine services require a qualified nurse")
+        if assignment.service_type is ServiceType.MEDICINE and employee.Qualification is not QualificationEnum.NURSE:
+            violations.append("Medicine services require a qualified nurse")
         
-        # Rule 3: Language preference check
-        if patient.LanguagePreference not in employee.LanguageSpoken and patient.LanguagePreference != "English":
+        # Rule 3: Language preference check (English needs no check; LanguageSpoken is free text)
+        if patient.LanguagePreference != "English" and patient.LanguagePreference not in employee.LanguageSpoken:
             violations.append(f"Employee doesn't speak patient's preferred language ({patient.LanguagePreference})")
         
         # Workload check
@@ -465,74 +623,70 @@ class RotaService:
         # No multiple same-employee-to-same-patient visits per day (post-clean) safeguard
         try:
             start_iso = assignment.start_time
-            if self.db_manager.has_employee_patient_assignment_on_date(employee.EmployeeID, patient.PatientID, start_iso):
+            day = start_iso[:10]
+            if day[4:5] == "-" and day[7:8] == "-":
+                # Cached per day in the DB manager until the next assignment write
+                pairs = self.db_manager.get_assignment_pairs_on_dates([day])[day]
+                already_assigned = (employee.EmployeeID, patient.PatientID) in pairs
+            else:
+                already_assigned = self.db_manager.has_employee_patient_assignment_on_date(employee.EmployeeID, patient.PatientID, start_iso)
+            if already_assigned:
                 violations.append("Employee already assigned to this patient today")
         except Exception:
             pass
         
         return violations 
 
-    def _parse_shift_bounds(self, earliest: str, latest: str):
-        from datetime import time as dtime
-        def _parse(t: str, default: dtime) -> dtime:
-            try:
-                if not t:
-                    return default
-                parts = t.strip().split(":")
-                hour = int(parts[0])
-                minute = int(parts[1]) if len(parts) > 1 else 0
-                return dtime(hour, minute)
-            except Exception:
-                return default
-        return _parse(earliest, dtime(9,0)), _parse(latest, dtime(17,0))
-
-    def _in_shift(self, employee: Employee, start_iso: str, end_iso: str) -> bool:
+    def _shift_mask(self, start_iso: str, end_iso: str) -> np.ndarray:
+        """Boolean mask over data_processor.employees: True where [start, end] fits inside the shift"""
+        earliest, latest = self.data_processor.get_shift_minutes()
         try:
             start_dt = datetime.fromisoformat(start_iso)
             end_dt = datetime.fromisoformat(end_iso)
-            e, l = self._parse_shift_bounds(getattr(employee, 'EarliestStart', ''), getattr(employee, 'LatestEnd', ''))
-            day = start_dt.date()
-            shift_start = start_dt.replace(hour=e.hour, minute=e.minute, second=0, microsecond=0)
-            shift_end = start_dt.replace(hour=l.hour, minute=l.minute, second=0, microsecond=0)
-            return start_dt >= shift_start and end_dt <= shift_end
         except Exception:
-            return True
-
-    def _employee_same_day_assigned(self, employee_id: str, date_iso: str) -> bool:
-        records = self.db_manager.get_employee_assignments_for_date(employee_id, date_iso)
-        return len(records) > 0
+            return np.ones(len(earliest), dtype=bool)
+        # Minutes from midnight of the start day; shift bounds are whole minutes on that day
+        midnight = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_min = (start_dt - midnight).total_seconds() / 60
+        end_min = (end_dt - midnight).total_seconds() / 60
+        return (start_min >= earliest) & (end_min <= latest)
 
     def _calc_travel_minutes(self, employee: Employee, patient: Patient) -> int:
-        origin = f"{employee.Address}, {employee.PostCode}" if employee.PostCode and employee.PostCode not in employee.Address else employee.Address
-        destination = f"{patient.Address}, {patient.PostCode}" if patient.PostCode and patient.PostCode not in patient.Address else patient.Address
+        origin = employee.full_address
+        destination = patient.full_address
         return self.travel_service.get_travel_time(origin=origin, destination=destination, mode=employee.TransportMode.value)
 
-    def _choose_best_employee_for_reassignment(self, candidates: List[Employee], patient: Patient, start_iso: str, end_iso: str) -> Optional[Employee]:
+    def _travel_minutes_to(self, patient: Patient, employees: List[Employee], known: Dict[str, int]) -> Dict[str, int]:
+        """Fill known (emp_id -> minutes to patient) for any employees not yet in it, in one matrix lookup"""
+        missing = [(emp.EmployeeID, emp.full_address, emp.TransportMode.value) for emp in employees if emp.EmployeeID not in known]
+        if missing:
+            known.update(self.travel_service.get_travel_time_matrix(missing, patient.full_address))
+        return known
+
+    def _choose_best_employee_for_reassignment(self, candidates: List[Employee], patient: Patient, start_iso: str, end_iso: str, travel: Dict[str, int]) -> Optional[Employee]:
         # Rank: has same-day assignments (True first), then by travel time ascending
-        scored: List[tuple[int, int, Employee]] = []
-        for emp in candidates:
-            same_day = 1 if self._employee_same_day_assigned(emp.EmployeeID, start_iso) else 0
-            travel = self._calc_travel_minutes(emp, patient)
-            scored.append(( -same_day, travel, emp ))
-        if not scored:
+        if not candidates:
             return None
-        scored.sort()
-        return scored[0][2]
+        assigned_that_day = self.db_manager.get_employees_assigned_on_date(start_iso)
+        self._travel_minutes_to(patient, candidates, travel)
+        n = len(candidates)
+        same_day = np.fromiter((emp.EmployeeID in assigned_that_day for emp in candidates), dtype=np.int64, count=n)
+        minutes = np.fromiter((travel[emp.EmployeeID] for emp in candidates), dtype=np.int64, count=n)
+        # Travel is clamped to <= 180 min, so the same-day bit shifted past it dominates the key;
+        # argmin keeps the first candidate on ties
+        return candidates[int(np.argmin(minutes - (same_day << 20)))]
 
-    def _get_candidate_employees(self, start_iso: str, end_iso: str, current_employee_id: str) -> List[Employee]:
-        candidates: List[Employee] = []
-        for emp in self.data_processor.employees:
-            if emp.EmployeeID == current_employee_id:
-                continue
-            if not self._in_shift(emp, start_iso, end_iso):
-                continue
-            if self.db_manager.has_overlap_for_employee(emp.EmployeeID, start_iso, end_iso):
-                continue
-            candidates.append(emp)
-        return candidates
+    def _get_candidate_employees(self, start_iso: str, end_iso: str, current_employee_id: str, overlaps: Dict[str, bool]) -> List[Employee]:
+        employees = self.data_processor.employees
+        mask = self._shift_mask(start_iso, end_iso)
+        return [
+            employees[i] for i in np.flatnonzero(mask)
+            if employees[i].EmployeeID != current_employee_id and employees[i].EmployeeID not in overlaps
+        ]
 
-    def _update_assignment_employee(self, assignment_id: int, new_employee: Employee, patient: Patient, start_iso: str, end_iso: str) -> bool:
-        travel_min = self._calc_travel_minutes(new_employee, patient)
+    def _update_assignment_employee(self, assignment_id: int, new_employee: Employee, patient: Patient, start_iso: str, end_iso: str, travel_min: Optional[int] = None) -> bool:
+        if travel_min is None:
+            travel_min = self._calc_travel_minutes(new_employee, patient)
         updates = {
             'employee_id': new_employee.EmployeeID,
             'employee_name': new_employee.Name,
@@ -550,37 +704,42 @@ class RotaService:
         - Fallback to nearest available employee even if no same-day assignments
         - Optional future enhancement: time change when allow_time_change=True (not implemented yet)
         """
-        updated: List[Dict[str, Any]] = []
+        updated_ids: List[int] = []
+        rows_by_id = self.db_manager.get_assignments_by_ids(assignment_ids)
+        # Resolve each patient once and share travel minutes across all of their assignments in the batch
+        patients_by_id = {pid: self.data_processor.get_patient_by_id(pid) for pid in {row.get('patient_id') for row in rows_by_id.values()}}
+        travel_by_patient: Dict[str, Dict[str, int]] = {pid: {} for pid in patients_by_id}
         for aid in assignment_ids:
-            row = self.db_manager.get_assignment_by_id(aid)
+            row = rows_by_id.get(aid)
             if not row:
                 continue
             start_iso = row.get('start_time')
             end_iso = row.get('end_time')
             if not start_iso or not end_iso:
                 continue
-            patient = self.data_processor.get_patient_by_id(row.get('patient_id'))
+            patient = patients_by_id.get(row.get('patient_id'))
             if not patient:
                 continue
+            travel = travel_by_patient[patient.PatientID]
             current_emp_id = row.get('employee_id')
-            candidates = self._get_candidate_employees(start_iso, end_iso, current_emp_id)
-            chosen = self._choose_best_employee_for_reassignment(candidates, patient, start_iso, end_iso)
+            # One overlap query per window; earlier reassignments in this batch are already in the DB
+            overlaps = self.db_manager.get_overlap_map(None, start_iso, end_iso)
+            candidates = self._get_candidate_employees(start_iso, end_iso, current_emp_id, overlaps)
+            chosen = self._choose_best_employee_for_reassignment(candidates, patient, start_iso, end_iso, travel)
             if not chosen:
                 # fallback: nearest overall ignoring shift bounds but still non-overlapping
-                fallback = []
-                for emp in self.data_processor.employees:
-                    if emp.EmployeeID == current_emp_id:
-                        continue
-                    if self.db_manager.has_overlap_for_employee(emp.EmployeeID, start_iso, end_iso):
-                        continue
-                    travel = self._calc_travel_minutes(emp, patient)
-                    fallback.append((travel, emp))
-                fallback.sort()
-                chosen = fallback[0][1] if fallback else None
+                fallback = [
+                    emp for emp in self.data_processor.employees
+                    if emp.EmployeeID != current_emp_id and emp.EmployeeID not in overlaps
+                ]
+                self._travel_minutes_to(patient, fallback, travel)
+                chosen = min(fallback, key=lambda emp: travel[emp.EmployeeID]) if fallback else None
             if not chosen:
                 continue
-            if self._update_assignment_employee(aid, chosen, patient, start_iso, end_iso):
-                updated.append(self.db_manager.get_assignment_by_id(aid))
+            if self._update_assignment_employee(aid, chosen, patient, start_iso, end_iso, travel[chosen.EmployeeID]):
+                updated_ids.append(aid)
+        fresh_rows = self.db_manager.get_assignments_by_ids(updated_ids)
+        updated: List[Dict[str, Any]] = [fresh_rows[aid] for aid in updated_ids if aid in fresh_rows]
         # Log operation
         try:
             self.db_manager.log_operation(
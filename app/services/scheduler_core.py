@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, date, time as dtime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import bisect
 import logging
+import operator
+
+import numpy as np
 
 from .data_processor import DataProcessor
 from .travel_service import TravelService
 from ..database import DatabaseManager
-from ..models.schemas import Employee, Patient, QualificationEnum, ServiceType
+from ..models.schemas import Patient, QualificationEnum
 
 logger = logging.getLogger(__name__)
 
+# (patient index, travel_minutes) -> travel_minutes
+_TRAVEL_MINUTES = operator.itemgetter(1)
+
 
 class SchedulerCore:
     """Core, non-AI weekly rota scheduler.
@@ -20,7 +28,7 @@ class SchedulerCore:
     - While time remains and there is patient demand:
       - Choose nearest feasible patient by travel time
       - Place visit block (travel + service) within shift, avoiding overlaps
-      - Write assignment to DB with ISO datetimes
+      - Write the day's assignments to DB with ISO datetimes in one batch
     """
 
     def __init__(
@@ -32,8 +40,12 @@ class SchedulerCore:
         self.data_processor = data_processor
         self.travel_service = travel_service
         self.db_manager = db_manager
+        # warmup_travel() result and the (employees, len, patients, len) it was built for; the lists
+        # themselves are kept (not their id()), so replacement lists can't be mistaken for them
+        self._travel: Dict[str, Tuple[Dict[str, int], np.ndarray]] = {}
+        self._travel_source: Optional[tuple] = None
 
-    def generate_weekly_rota(self, start_date: Optional[date] = None) -> Dict[str, int]:
+    async def generate_weekly_rota(self, start_date: Optional[date] = None) -> Dict[str, int]:
         """Generate assignments for the next 7 days.
 
         Returns summary counts.
@@ -41,20 +53,85 @@ class SchedulerCore:
         if start_date is None:
             start_date = self._next_monday(date.today())
 
+        if not self.travel_service.estimates_only:
+            # Fetch uncached legs concurrently first, so the matrices below are built from cache hits
+            await self._prefetch_travel_times()
+        # Dense per-mode travel matrices, indexed directly by the greedy loop; built off the event
+        # loop, since cache misses mean SQLite reads and Maps requests
+        travel = await asyncio.to_thread(self.warmup_travel)
+        # Who may serve whom doesn't change during the week: employees x patients, built once
+        feasibility = self._feasibility_matrix()
+
         total_created = 0
-        for day_offset in range(7):
-            day_date = start_date + timedelta(days=day_offset)
-            created = self._generate_daily_rota(day_date)
-            total_created += created
-            logger.info(f"SchedulerCore: created {created} assignments on {day_date.isoformat()}")
+        try:
+            for day_offset in range(7):
+                day_date = start_date + timedelta(days=day_offset)
+                created = self._generate_daily_rota(day_date, feasibility, travel)
+                total_created += created
+                logger.info(f"SchedulerCore: created {created} assignments on {day_date.isoformat()}")
+        finally:
+            # Daily start/end entries are queued; write the week's log in one batch
+            try:
+                self.db_manager.flush_operation_log()
+            except Exception as e:
+                logger.warning(f"SchedulerCore: failed to flush operation log: {e}")
 
         return {"created": total_created}
 
-    def _generate_daily_rota(self, day_date: date) -> int:
+    async def _prefetch_travel_times(self) -> None:
+        """Warm the travel cache for every leg the greedy loop can take (home -> patient, patient -> patient).
+
+        Addresses don't change during a run, so this replaces per-step network lookups with
+        one batch of matrix requests per transport mode; all modes' requests run concurrently.
+        """
+        patient_addresses = [patient.full_address for patient in self.data_processor.patients]
+        if not patient_addresses:
+            return
+        homes_by_mode: Dict[str, List[str]] = {}
+        for employee in self.data_processor.employees:
+            mode = getattr(employee.TransportMode, "value", str(employee.TransportMode))
+            homes_by_mode.setdefault(mode, []).append(employee.full_address)
+        modes = list(homes_by_mode)
+        results = await asyncio.gather(
+            *(self.travel_service.build_travel_matrix_async(homes_by_mode[mode] + patient_addresses, patient_addresses, mode)
+              for mode in modes),
+            return_exceptions=True,
+        )
+        for mode, result in zip(modes, results):
+            if isinstance(result, Exception):
+                logger.warning(f"SchedulerCore: travel prefetch failed for {mode}: {result}")
+
+    def warmup_travel(self) -> Dict[str, Tuple[Dict[str, int], np.ndarray]]:
+        """Per transport mode: ({address: row}, minutes) with rows for homes and patients, columns in patient order.
+
+        Estimate-only results are reused until the employee/patient lists change; API-backed ones
+        are rebuilt each time (from the travel cache) so they follow the departure-time slot.
+        """
+        employees, patients = self.data_processor.employees, self.data_processor.patients
+        source = self._travel_source
+        if (source is not None and self.travel_service.estimates_only
+                and source[0] is employees and source[1] == len(employees)
+                and source[2] is patients and source[3] == len(patients)):
+            return self._travel
+        patient_addresses = [patient.full_address for patient in patients]
+        homes_by_mode: Dict[str, List[str]] = {}
+        for employee in employees:
+            mode = getattr(employee.TransportMode, "value", str(employee.TransportMode))
+            homes_by_mode.setdefault(mode, []).append(employee.full_address)
+        travel = {}
+        for mode, homes in homes_by_mode.items():
+            origins = list(dict.fromkeys(homes + patient_addresses))
+            matrix = self.travel_service.warmup(origins, mode, patient_addresses)
+            travel[mode] = ({address: row for row, address in enumerate(origins)}, matrix)
+        self._travel, self._travel_source = travel, (employees, len(employees), patients, len(patients))
+        return travel
+
+    def _generate_daily_rota(self, day_date: date, feasibility: np.ndarray,
+                             travel: Dict[str, Tuple[Dict[str, int], np.ndarray]]) -> int:
         """Greedy chaining per employee for a single day."""
         # Operation log: start
         try:
-            self.db_manager.log_operation(
+            self.db_manager.queue_operation(
                 "daily_schedule",
                 "Starting daily schedule",
                 {"date": day_date.isoformat(), "employees": len(self.data_processor.employees), "patients": len(self.data_processor.patients)}
@@ -73,52 +150,106 @@ class SchedulerCore:
 
         created_count = 0
 
-        for employee in self.data_processor.employees:
-            earliest, latest = self._parse_shift(employee)
+        # Existing bookings for the day, loaded once: overlap and same-patient checks stay in memory
+        day_intervals = self.db_manager.get_day_assignments_by_employee(day_date.isoformat())
+        served_today: Set[Tuple[str, str]] = {
+            (employee_id, patient_id)
+            for employee_id, intervals in day_intervals.items()
+            for start, _, patient_id in intervals
+            if start.date() == day_date
+        }
+        pending: List[Dict] = []
+        try:
+            created_count = self._schedule_day(
+                day_date, patient_daily_minutes, feasibility, travel, day_intervals, served_today, pending
+            )
+        finally:
+            if pending:
+                self.db_manager.log_assignments_bulk(pending)
+
+        # Operation log: end
+        try:
+            self.db_manager.queue_operation(
+                "daily_schedule",
+                "Completed daily schedule",
+                {"date": day_date.isoformat(), "assignments_created": created_count}
+            )
+        except Exception:
+            pass
+
+        return created_count
+
+    def _schedule_day(
+        self,
+        day_date: date,
+        patient_daily_minutes: Dict[str, int],
+        feasibility: np.ndarray,
+        travel: Dict[str, Tuple[Dict[str, int], np.ndarray]],
+        day_intervals: Dict[str, List[Tuple[datetime, datetime, str]]],
+        served_today: Set[Tuple[str, str]],
+        pending: List[Dict],
+    ) -> int:
+        """Greedy loop for one day; new assignments are appended to pending rather than written."""
+        created_count = 0
+
+        # Feasibility is evaluated as boolean masks over patient positions
+        patients = self.data_processor.patients
+        has_demand = np.array([patient_daily_minutes.get(p.PatientID, 0) > 0 for p in patients], dtype=bool)
+        # Hot patient fields as flat lists (structure of arrays) so the loop indexes instead of touching models
+        patient_ids = [patient.PatientID for patient in patients]
+        addresses = [patient.full_address for patient in patients]
+        positions: Dict[str, List[int]] = {}
+        for idx, patient_id in enumerate(patient_ids):
+            positions.setdefault(patient_id, []).append(idx)
+        # Service type and default visit length depend only on the patient (precomputed per patient list)
+        visit_types, visit_minutes = self.data_processor.get_patient_visit_defaults()
+
+        # Shift bounds are parsed once per employee list by DataProcessor (minutes since midnight)
+        earliest_minutes, latest_minutes = self.data_processor.get_shift_minutes()
+        midnight = datetime.combine(day_date, dtime())
+
+        for e_idx, (employee, earliest, latest) in enumerate(
+            zip(self.data_processor.employees, earliest_minutes.tolist(), latest_minutes.tolist())
+        ):
+            employee_id = employee.EmployeeID
+            intervals = day_intervals.setdefault(employee_id, [])
             if earliest >= latest:
                 continue
 
-            current_time = datetime.combine(day_date, earliest)
-            shift_end = datetime.combine(day_date, latest)
-            current_location = f"{employee.Address}, {employee.PostCode}" if employee.PostCode and employee.PostCode not in employee.Address else employee.Address
+            current_time = midnight + timedelta(minutes=earliest)
+            shift_end = midnight + timedelta(minutes=latest)
+            current_location = employee.full_address
 
             # Limit visits to a reasonable number per day
             max_visits = getattr(employee, "max_patients_per_day", 8) or 8
             visits_done = 0
 
+            mode = getattr(employee.TransportMode, "value", str(employee.TransportMode))
+            row_index, travel_matrix = travel[mode]
+            # Row copy: served patients are masked out below without touching the weekly matrix
+            servable = feasibility[e_idx].copy()
+            # Patients this employee already visited today are excluded up front
+            for served_employee_id, patient_id in served_today:
+                if served_employee_id == employee_id and patient_id in positions:
+                    servable[positions[patient_id]] = False
+
             while current_time < shift_end and visits_done < max_visits:
                 # Build candidate list of feasible patients
-                candidates: List[Tuple[Patient, int]] = []  # (patient, travel_minutes)
-                for patient in self.data_processor.patients:
-                    if patient_daily_minutes.get(patient.PatientID, 0) <= 0:
-                        continue
-                    if not self._employee_can_serve(employee, patient):
-                        continue
-
-                    mode = getattr(employee.TransportMode, "value", str(employee.TransportMode))
-                    travel_minutes = self.travel_service.get_travel_time(
-                        origin=current_location,
-                        destination=f"{patient.Address}, {patient.PostCode}" if patient.PostCode and patient.PostCode not in patient.Address else patient.Address,
-                        mode=mode,
-                    )
-                    candidates.append((patient, travel_minutes))
-
-                if not candidates:
+                feasible = np.flatnonzero(servable & has_demand).tolist()
+                if not feasible:
                     break
 
-                # Choose nearest by travel time
-                candidates.sort(key=lambda x: x[1])
-                chosen_patient, travel_minutes = candidates[0]
+                # Travel from the current location to every feasible patient: one row of the warmed matrix
+                travel_times = travel_matrix[row_index[current_location], feasible].tolist()
+                candidates: List[Tuple[int, int]] = list(zip(feasible, travel_times))  # (patient index, travel_minutes)
+
+                # Choose nearest by travel time (min keeps the first of equals, i.e. patient order)
+                chosen_idx, travel_minutes = min(candidates, key=_TRAVEL_MINUTES)
+                patient_id = patient_ids[chosen_idx]
 
                 # Decide service duration for this visit (based on inferred service type defaults)
-                remaining = patient_daily_minutes.get(chosen_patient.PatientID, 0)
-                inferred_str = self._infer_service_type(chosen_patient)
-                try:
-                    inferred_enum = ServiceType(inferred_str)
-                except Exception:
-                    inferred_enum = ServiceType.PERSONAL_CARE
-                default_minutes = self.data_processor.get_default_service_duration(inferred_enum)
-                service_minutes = min(default_minutes, remaining)
+                remaining = patient_daily_minutes.get(patient_id, 0)
+                service_minutes = min(visit_minutes[chosen_idx], remaining)
 
                 # Compute proposed times
                 proposed_start = current_time + timedelta(minutes=travel_minutes)
@@ -133,56 +264,23 @@ class SchedulerCore:
                     service_minutes = fit_minutes
                     proposed_end = proposed_start + timedelta(minutes=service_minutes)
 
-                # Overlap check
-                start_iso = proposed_start.replace(second=0, microsecond=0).isoformat()
-                end_iso = proposed_end.replace(second=0, microsecond=0).isoformat()
-                if self.db_manager.has_overlap_for_employee(employee.EmployeeID, start_iso, end_iso):
-                    # push time forward slightly and retry
-                    current_time = current_time + timedelta(minutes=5)
+                # Overlap check: leave no earlier than the end of the clash rather than creeping forward
+                slot_start = proposed_start.replace(second=0, microsecond=0)
+                slot_end = proposed_end.replace(second=0, microsecond=0)
+                conflict_end = self._conflict_end(intervals, slot_start, slot_end)
+                if conflict_end is not None:
+                    current_time = max(current_time + timedelta(minutes=1), conflict_end)
                     continue
 
-                # Skip if employee already served this patient today
-                if self.db_manager.has_employee_patient_assignment_on_date(
-                    employee.EmployeeID, chosen_patient.PatientID, proposed_start.isoformat()
-                ):
-                    # Try next candidate if available
-                    next_candidate = None
-                    for patient, tmin in candidates[1:]:
-                        if patient_daily_minutes.get(patient.PatientID, 0) <= 0:
-                            continue
-                        if not self._employee_can_serve(employee, patient):
-                            continue
-                        next_candidate = (patient, tmin)
-                        break
-                    if next_candidate is not None:
-                        chosen_patient, travel_minutes = next_candidate
-                        remaining = patient_daily_minutes.get(chosen_patient.PatientID, 0)
-                        inferred_str = self._infer_service_type(chosen_patient)
-                        try:
-                            inferred_enum = ServiceType(inferred_str)
-                        except Exception:
-                            inferred_enum = ServiceType.PERSONAL_CARE
-                        default_minutes = self.data_processor.get_default_service_duration(inferred_enum)
-                        service_minutes = min(default_minutes, remaining)
-                        proposed_start = current_time + timedelta(minutes=travel_minutes)
-                        proposed_end = proposed_start + timedelta(minutes=service_minutes)
-                        start_iso = proposed_start.replace(second=0, microsecond=0).isoformat()
-                        end_iso = proposed_end.replace(second=0, microsecond=0).isoformat()
-                        if self.db_manager.has_overlap_for_employee(employee.EmployeeID, start_iso, end_iso):
-                            current_time = current_time + timedelta(minutes=5)
-                            continue
-                    else:
-                        # No alternative, advance time slightly
-                        current_time = current_time + timedelta(minutes=5)
-                        continue
-
-                # Persist assignment
-                service_type = self._infer_service_type(chosen_patient)
-                self.db_manager.log_assignment({
-                    "employee_id": employee.EmployeeID,
+                # Queue assignment; the day is persisted in one batch
+                service_type = visit_types[chosen_idx].value
+                start_iso = slot_start.isoformat()
+                end_iso = slot_end.isoformat()
+                pending.append({
+                    "employee_id": employee_id,
                     "employee_name": employee.Name,
-                    "patient_id": chosen_patient.PatientID,
-                    "patient_name": chosen_patient.PatientName,
+                    "patient_id": patient_id,
+                    "patient_name": patients[chosen_idx].PatientName,
                     "service_type": service_type,
                     "assigned_time": start_iso,
                     "start_time": start_iso,
@@ -192,55 +290,44 @@ class SchedulerCore:
                     "priority_score": 5.0,
                     "assignment_reason": "Scheduled by core engine",
                 })
+                bisect.insort(intervals, (slot_start, slot_end, patient_id))
+                served_today.add((employee_id, patient_id))
+                servable[positions[patient_id]] = False
 
                 created_count += 1
                 visits_done += 1
-                patient_daily_minutes[chosen_patient.PatientID] = max(0, remaining - service_minutes)
+                patient_daily_minutes[patient_id] = max(0, remaining - service_minutes)
+                if not patient_daily_minutes[patient_id]:
+                    has_demand[positions[patient_id]] = False
                 current_time = proposed_end
-                current_location = f"{chosen_patient.Address}, {chosen_patient.PostCode}" if chosen_patient.PostCode and chosen_patient.PostCode not in chosen_patient.Address else chosen_patient.Address
-
-        # Operation log: end
-        try:
-            self.db_manager.log_operation(
-                "daily_schedule",
-                "Completed daily schedule",
-                {"date": day_date.isoformat(), "assignments_created": created_count}
-            )
-        except Exception:
-            pass
+                current_location = addresses[chosen_idx]
 
         return created_count
 
-    def _employee_can_serve(self, employee: Employee, patient: Patient) -> bool:
-        # Medicine requires nurse
-        if "medicine" in (patient.RequiredSupport or "").lower():
-            if employee.Qualification != QualificationEnum.NURSE:
-                return False
+    @staticmethod
+    def _conflict_end(intervals: List[Tuple[datetime, datetime, str]], start: datetime, end: datetime) -> Optional[datetime]:
+        """Latest end among intervals in the start-sorted list that intersect [start, end), or None if free"""
+        # Only intervals starting before end can intersect; existing rows may overlap each other,
+        # so every one of those is checked rather than just the nearest
+        upto = bisect.bisect_left(intervals, (end,))
+        return max((existing_end for _, existing_end, _ in intervals[:upto] if existing_end > start), default=None)
 
-        # Language preference basic check (allow if English default)
-        pref = (patient.LanguagePreference or "English").strip().lower()
-        if pref and pref != "english":
-            langs = (employee.LanguageSpoken or "").lower()
-            if pref not in langs:
-                return False
+    def _feasibility_matrix(self) -> np.ndarray:
+        """Boolean [employee, patient] matrix of who may serve whom, aligned with DataProcessor's lists."""
+        employees = self.data_processor.employees
+        requires_nurse, languages = self.data_processor.get_patient_arrays()
 
-        return True
-
-    def _parse_shift(self, employee: Employee) -> Tuple[dtime, dtime]:
-        def _parse(t: str, default: dtime) -> dtime:
-            try:
-                if not t:
-                    return default
-                parts = t.strip().split(":")
-                hour = int(parts[0])
-                minute = int(parts[1]) if len(parts) > 1 else 0
-                return dtime(hour, minute)
-            except Exception:
-                return default
+        # Medicine requires nurse
+        is_nurse = np.array([employee.Qualification == QualificationEnum.NURSE for employee in employees], dtype=bool)
+        matrix = is_nurse[:, None] | ~requires_nurse[None, :]
 
-        earliest = _parse(getattr(employee, "EarliestStart", ""), dtime(9, 0))
-        latest = _parse(getattr(employee, "LatestEnd", ""), dtime(17, 0))
-        return earliest, latest
+        # Language preference basic check (English, stored as '', is always allowed);
+        # one pass per distinct preferred language rather than per employee/patient pair
+        spoken = [(employee.LanguageSpoken or "").lower() for employee in employees]
+        for lang in set(languages.tolist()) - {""}:
+            speaks = np.array([lang in langs for langs in spoken], dtype=bool)
+            matrix[np.ix_(~speaks, languages == lang)] = False
+        return matrix
 
     def _estimate_patient_daily_minutes(self, patient: Patient) -> int:
         # If weekly hours provided, distribute across 7 days; else default 60
@@ -249,18 +336,6 @@ class SchedulerCore:
             return max(15, int((weekly_hours * 60) / 7))
         return 60
 
-    def _infer_service_type(self, patient: Patient) -> str:
-        supports = (patient.RequiredSupport or "").lower()
-        if "medicine" in supports:
-            return "medicine"
-        if "exercise" in supports:
-            return "exercise"
-        if "compan" in supports:
-            return "companionship"
-        if "personal" in supports or "care" in supports:
-            return "personal_care"
-        return "personal_care"
-
     def _next_monday(self, today: date) -> date:
         # Monday is 0; if today is Monday, use today
         days_ahead = (0 - today.weekday()) % 7
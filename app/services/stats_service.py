@@ -1,27 +1,52 @@
 from __future__ import annotations
 
 from typing import Dict, List, Any
+import hashlib
+import json
+import os
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 import logging
 
+import numpy as np
+
 from ..database import DatabaseManager
 from .openai_service import OpenAIService
 
 logger = logging.getLogger(__name__)
 
+# Cached AI summaries older than this are regenerated
+DEFAULT_AI_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+
+def _stable(obj: Any) -> Any:
+    """Copy of obj with string dict keys, so json.dumps(sort_keys=True) works (workload may hold a None id)"""
+    if isinstance(obj, dict):
+        return {str(k): _stable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_stable(v) for v in obj]
+    return obj
+
 
 class StatsService:
     def __init__(self, db: DatabaseManager, ai: OpenAIService) -> None:
         self.db = db
         self.ai = ai
+        self.ai_cache_ttl = int(os.getenv("STATS_AI_CACHE_TTL_SECONDS", DEFAULT_AI_CACHE_TTL_SECONDS))
 
     def _compute_core_metrics(self, assignments: List[Dict[str, Any]], employees: List[Dict[str, Any]], patients: List[Dict[str, Any]]) -> Dict[str, Any]:
         total_assignments = len(assignments)
-        total_travel_minutes = sum(a.get('travel_time') or 0 for a in assignments)
-        total_service_minutes = sum((a.get('duration') or a.get('estimated_duration') or 0) for a in assignments)
-        avg_service_minutes = (total_service_minutes / total_assignments) if total_assignments else 0
-        avg_travel_minutes = (total_travel_minutes / total_assignments) if total_assignments else 0
+        # Columns are INTEGER in the assignments table, so int64 reductions match the Python sums
+        travel = np.fromiter((a.get('travel_time') or 0 for a in assignments), dtype=np.int64, count=total_assignments)
+        service = np.fromiter(
+            (a.get('duration') or a.get('estimated_duration') or 0 for a in assignments),
+            dtype=np.int64, count=total_assignments
+        )
+        total_travel_minutes = int(travel.sum())
+        total_service_minutes = int(service.sum())
+        avg_service_minutes = float(service.mean()) if total_assignments else 0
+        avg_travel_minutes = float(travel.mean()) if total_assignments else 0
 
         # Simple optimization proxies
         # Assume baseline travel 20 min per assignment
@@ -29,10 +54,14 @@ class StatsService:
         travel_time_saved = max(0, baseline_travel_minutes - total_travel_minutes)
 
         # Resource utilization: assignments per employee
-        assignments_by_employee: Dict[str, int] = {}
-        for a in assignments:
-            eid = a.get('employee_id')
-            assignments_by_employee[eid] = assignments_by_employee.get(eid, 0) + 1
+        # Employee ids get codes in first-seen order, so the dict keeps the old insertion order
+        employee_codes: Dict[str, int] = {}
+        codes = np.fromiter(
+            (employee_codes.setdefault(a.get('employee_id'), len(employee_codes)) for a in assignments),
+            dtype=np.int64, count=total_assignments
+        )
+        counts = np.bincount(codes, minlength=len(employee_codes))
+        assignments_by_employee: Dict[str, int] = dict(zip(employee_codes, counts.tolist()))
 
         # Future required resources: estimate based on patients without assignments
         assigned_patient_ids = {a.get('patient_id') for a in assignments}
@@ -68,41 +97,68 @@ class StatsService:
                 return None
         start = parse_date(start_date) if start_date else None
         end = parse_date(end_date) if end_date else None
-        dayset = set(days) if days else None
+        # ISO dates order correctly as strings, so rows are compared by their date prefix
+        start_iso = start.isoformat() if start else None
+        end_iso = end.isoformat() if end else None
+        # Bit d set <=> weekday d (0=Mon..6=Sun) is selected
+        daymask = sum(1 << d for d in set(days)) if days else None
 
-        filtered = []
-        for a in assignments:
+        # Timestamps share a handful of dates, so parse each 'YYYY-MM-DD' prefix once
+        day_cache: Dict[str, tuple | None] = {}
+        from_iso = date.fromisoformat
+
+        def day_of(a: Dict[str, Any]):
             ts = a.get('start_time') or a.get('assigned_time')
             if not ts:
-                continue
-            try:
-                dt = datetime.fromisoformat(ts)
-                d = dt.date()
-                wd = dt.weekday()  # 0=Mon..6=Sun
-            except Exception:
-                continue
-            if start and d < start:
-                continue
-            if end and d > end:
-                continue
-            if dayset is not None and wd not in dayset:
-                continue
-            filtered.append(a)
-        return filtered
+                return None
+            prefix = ts[:10]
+            if prefix not in day_cache:
+                try:
+                    day_cache[prefix] = (prefix, 1 << from_iso(prefix).weekday())
+                except Exception:
+                    # Legacy HH:MM values and other non-ISO text are skipped
+                    day_cache[prefix] = None
+            return day_cache[prefix]
+
+        return [
+            a for a, day in ((a, day_of(a)) for a in assignments)
+            if day is not None
+            and (start_iso is None or day[0] >= start_iso)
+            and (end_iso is None or day[0] <= end_iso)
+            and (daymask is None or daymask & day[1])
+        ]
 
     async def _ai_summarize(self, metrics: Dict[str, Any]) -> Dict[str, str]:
+        """AI summary/suggestions for metrics, reused from stats_ai_cache when the same metrics were summarized before"""
+        # generated_at changes on every call, so it is left out of the prompt and the cache key
+        payload = json.dumps(
+            _stable({k: v for k, v in metrics.items() if k != 'generated_at'}),
+            sort_keys=True, separators=(',', ':'), default=str
+        )
+        key = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        cached = self.db.get_ai_summary(key, int(time.time()) - self.ai_cache_ttl)
+        if cached:
+            return cached
+
+        result = await self._ai_request(payload)
+        # Failures come back empty; don't pin those in the cache
+        if result.get('summary') or result.get('suggestions'):
+            self.db.save_ai_summary(key, result['summary'], result['suggestions'])
+        return result
+
+    async def _ai_request(self, payload: str) -> Dict[str, str]:
         try:
             # Use a minimal call to summarize metrics and propose ideas
-            client = self.ai.client
+            client = self.ai.async_client
             prompt = f"""
             You are a positive analytics assistant.
             Given the rota metrics JSON below, produce:
             1) Summary: A concise, positive summary (<=120 words) highlighting achievements, efficiency gains, and strengths reflected by the numbers.
             2) Suggestions: 3 short, data-driven operational suggestions (bulleted) ONLY about resource allocation, reassignment, schedule balancing, reducing idle time, or patient acquisition. Do NOT suggest code or new features.
 
-            Metrics JSON:\n{metrics}
+            Metrics JSON:\n{payload}
             """
-            resp = client.chat.completions.create(
+            resp = await client.chat.completions.create(
                 model=self.ai.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2
@@ -175,12 +231,19 @@ class StatsService:
             return {"summary": "", "suggestions": ""}
 
     async def get_or_generate_stats(self, force: bool = False, days: List[int] | None = None, start_date: str | None = None, end_date: str | None = None) -> Dict[str, Any]:
+        # Unfiltered: use cache unless forced or assignment count changed (a COUNT(*) rather than loading the tables)
+        filtered = bool(days or start_date or end_date)
+        if not filtered and not force:
+            latest = self.db.get_latest_stats()
+            if latest and latest.get('assignments_count') == self.db.get_assignments_count():
+                return latest
+
         assignments = self.db.get_assignments()
         employees = self.db.get_employees()
         patients = self.db.get_patients()
 
         # If filters are provided, compute on the fly and do not use cache for metrics
-        if days or start_date or end_date:
+        if filtered:
             subset = self._filter_assignments(assignments, days, start_date, end_date)
             # Build filtered employees/patients based on subset participation
             emp_map = {e.get('employee_id') or e.get('EmployeeID'): e for e in employees}
@@ -201,12 +264,7 @@ class StatsService:
                 'ai_suggestions': ai.get('suggestions')
             }
 
-        # Unfiltered: use cache unless forced or assignment count changed
-        latest = self.db.get_latest_stats()
         current_assignments = len(assignments)
-        if latest and not force and latest.get('assignments_count') == current_assignments:
-            return latest
-
         metrics = self._compute_core_metrics(assignments, employees, patients)
         ai = await self._ai_summarize(metrics)
         # Persist suggestions in existing ai_ideas column; response will map to ai_suggestions
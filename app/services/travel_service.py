@@ -1,85 +1,474 @@
+import asyncio
 import os
 import googlemaps
-from datetime import datetime
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import logging
+import math
+import re
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from ..database import DatabaseManager
+from .postcode_table import PostcodeTable, find_postcode
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+# (tiles, api_mode) -> {(norm_origin, norm_destination): minutes}; _fetch_tiles or an async-backed equivalent
+TileFetcher = Callable[[List[Tuple[List[str], List[str]]], str], Dict[Tuple[str, str], Optional[int]]]
+
+# Distance Matrix per-request limits
+MATRIX_MAX_ORIGINS = 25
+MATRIX_MAX_DESTINATIONS = 25
+MATRIX_MAX_ELEMENTS = 100
+# Distance Matrix tiles in flight at once (requests are network-bound, so threads overlap the waits)
+MATRIX_MAX_WORKERS = 8
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+# Connection pool of the shared async HTTP client (tile concurrency itself is capped by MATRIX_MAX_WORKERS)
+ASYNC_MAX_CONNECTIONS = 64
+ASYNC_KEEPALIVE_SECONDS = 60.0
+# Element statuses that mean the address itself could not be resolved/routed; retrying via
+# Directions gives the same answer, so these go straight to the heuristic
+_UNROUTABLE_STATUSES = frozenset({"NOT_FOUND", "ZERO_RESULTS"})
+
+# Lookup-failure warnings are emitted at most once per interval; the rest are counted into the next one
+WARNING_INTERVAL_SECONDS = 1.0
+
+# Health checks reuse the last connectivity result for this long instead of calling the API each time
+CONNECTIVITY_TTL_SECONDS = 300
+CONNECTIVITY_ORIGIN = "London, SW1A 1AA"
+CONNECTIVITY_DESTINATION = "London, EC1A 1BB"
+
+# Persisted API results older than this are ignored (and refetched)
+DEFAULT_CACHE_TTL_SECONDS = 30 * 24 * 3600
+# In-memory travel cache bound (entries); the least recently used pairs are dropped first
+DEFAULT_CACHE_MAX_ENTRIES = 50000
+# Failed lookups (errors / unroutable addresses) serve the heuristic until this expires, then retry
+DEFAULT_NEGATIVE_CACHE_TTL_SECONDS = 3600
+
+
+# Optional postcode -> lat/lon table (see postcode_table.py) for distance-based estimates
+DEFAULT_POSTCODE_TABLE_PATH = "data/postcodes.bin"
+# Average door-to-door speeds (km/h) for the straight-line estimate
+_MODE_SPEED_KMH = {"driving": 40.0, "transit": 20.0, "bicycling": 16.0, "walking": 5.0}
+_EARTH_RADIUS_KM = 6371.0
+# Minutes added to the postcode-prefix heuristic for slower modes
+_HEURISTIC_MODE_PENALTY = {"walking": 10, "bicycling": 5}
+
+# Modes whose API durations depend on departure time (traffic / timetables)
+_TIME_SENSITIVE_MODES = frozenset({"driving", "transit"})
+
+
+def _time_slot(api_mode: str, hour: int) -> str:
+    """Departure-time bucket an API result is valid for; time-sensitive requests depart 'now'"""
+    if api_mode not in _TIME_SENSITIVE_MODES:
+        return "any"
+    if 7 <= hour < 10 or 16 <= hour < 19:
+        return "peak"
+    if hour >= 22 or hour < 6:
+        return "night"
+    return "offpeak"
+
+
+# Wall-clock granularity of slot lookups; local hours (and so slots) never change inside a bucket
+SLOT_BUCKET_SECONDS = 300
+
+
+@lru_cache(maxsize=64)
+def _bucket_slot(api_mode: str, bucket: int) -> str:
+    return _time_slot(api_mode, time.localtime(bucket * SLOT_BUCKET_SECONDS).tm_hour)
+
+
+def _current_slot(api_mode: str) -> str:
+    """_time_slot for the current time, worked out once per SLOT_BUCKET_SECONDS"""
+    return _bucket_slot(api_mode, int(time.time() // SLOT_BUCKET_SECONDS))
+
+
+def _departure_time(api_mode: str) -> Optional[str]:
+    """departure_time request value: 'now' where durations depend on it, omitted for walking/cycling"""
+    return "now" if api_mode in _TIME_SENSITIVE_MODES else None
+
+
+_MODE_MAPPING = {
+    "car": "driving",
+    "walking": "walking",
+    "bicycle": "bicycling",
+    "public transport": "transit",
+    "public_transport": "transit",
+    "bike": "bicycling",
+    # API names map to themselves, so already-mapped modes pass through unchanged
+    "driving": "driving",
+    "bicycling": "bicycling",
+    "transit": "transit"
+}
+
+
+@lru_cache(maxsize=None)
+def _api_mode(transport_mode: str) -> str:
+    # Only a handful of distinct modes exist, so the cache stays tiny
+    return _MODE_MAPPING.get(transport_mode.lower(), "driving")
+
+
+# Whitespace/comma separated token containing a digit: the postcode-ish chunk of an address
+_POSTCODE_TOKEN_RE = re.compile(r"[^\s,]*\d[^\s,]*")
+
+
+@lru_cache(maxsize=8192)
+def _postcode_token(address: str) -> str:
+    """Last postcode-ish token of an upper-cased address ('' if none); one regex pass, memoized per address"""
+    tokens = _POSTCODE_TOKEN_RE.findall(address)
+    return tokens[-1] if tokens else ""
+
+
+@lru_cache(maxsize=8192)
+def _normalize(address: str, default_country: str) -> str:
+    if not address:
+        return ""
+    addr = address.strip().strip(',')
+    # Minimal validity check
+    if len(addr) < 3:
+        return ""
+    # If no country hint present, append default country
+    if default_country.lower() not in addr.lower():
+        addr = f"{addr}, {default_country}"
+    return addr
+
+
+class _LRUCache:
+    """Thread-safe mapping that drops the least recently used entry beyond maxsize"""
+
+    __slots__ = ("maxsize", "_data", "_lock")
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
 class TravelService:
-    def __init__(self):
+    # Fixed attribute set: no per-instance __dict__, and attribute access goes through slot descriptors
+    __slots__ = (
+        "api_key", "cache_ttl", "calculate_travel_time", "client", "db_manager", "default_country",
+        "default_region", "fast_scheduler", "get_travel_time", "negative_cache_ttl", "postcodes",
+        "_cache", "_connectivity", "_http", "_http_loop", "_last_warn", "_latlon_cache",
+        "_od_matrices", "_session", "_suppressed_warnings",
+    )
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None):
         api_key = os.getenv("GOOGLE_MAPS_API_KEY")
         if not api_key:
             logger.warning("Google Maps API key not set. Using default estimates.")
-        self.client = googlemaps.Client(key=api_key) if api_key else None
-        self._cache = {}
+        # One pooled keep-alive session for every Maps call, so TLS is set up once per connection rather than per request.
+        # Pool size covers the concurrent tile fetches; googlemaps does its own retry/backoff on 5xx and 429.
+        self._session = None
+        self.client = None
+        if api_key:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=2 * MATRIX_MAX_WORKERS)
+            self._session.mount("https://", adapter)
+            self.client = googlemaps.Client(key=api_key, requests_session=self._session)
+        # Kept for the async HTTP path, which calls the Distance Matrix endpoint directly
+        self.api_key = api_key
+        # Rate limit for lookup-failure warnings (monotonic time of the last one, number suppressed since)
+        self._last_warn = 0.0
+        self._suppressed_warnings = 0
+        # (monotonic time, result) of the last check_connectivity call
+        self._connectivity: Optional[Tuple[float, dict]] = None
+        # Shared keep-alive client for that path, created on first use in the running event loop
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+        # api_mode -> (origin key -> row, destination key -> column, minutes, cache source) from warmup()
+        self._od_matrices: Dict[str, Tuple[Dict[str, int], Dict[str, int], np.ndarray, str]] = {}
+        # cache key -> (minutes, failed_at); failed_at is the unix time a failed lookup was
+        # replaced by the heuristic estimate, None for real answers
+        self._cache = _LRUCache(int(os.getenv("TRAVEL_CACHE_MAX", DEFAULT_CACHE_MAX_ENTRIES)))
         # Region/country hints to improve geocoding
         self.default_region = os.getenv("GOOGLE_MAPS_REGION", "uk")
         self.default_country = os.getenv("GOOGLE_MAPS_COUNTRY", "United Kingdom")
         # Fast estimation mode for bulk scheduling
         self.fast_scheduler = os.getenv("FAST_SCHEDULER", "true").strip().lower() in ("1","true","yes","y")
+        # Fixed for the service's lifetime: bind the heuristic or API paths once instead of branching per call
+        if self.estimates_only:
+            self.calculate_travel_time = self._estimate_travel_time
+            self.get_travel_time = self._get_estimated_travel_time
+        else:
+            self.calculate_travel_time = self._api_calculate_travel_time
+            self.get_travel_time = self._get_travel_time
+        # API results are written through to SQLite so restarts don't re-bill the same pairs
+        self.db_manager = db_manager
+        self.cache_ttl = int(os.getenv("TRAVEL_CACHE_TTL_SECONDS", DEFAULT_CACHE_TTL_SECONDS))
+        self.negative_cache_ttl = int(os.getenv("TRAVEL_NEGATIVE_CACHE_TTL_SECONDS", DEFAULT_NEGATIVE_CACHE_TTL_SECONDS))
+        self._load_persisted_cache()
+        self.postcodes = self._open_postcode_table(os.getenv("POSTCODE_TABLE_PATH", DEFAULT_POSTCODE_TABLE_PATH))
+        # address -> (lat, lon) or None, so each address is matched against the table once
+        self._latlon_cache: Dict[str, Optional[Tuple[float, float]]] = {}
+
+    def _warn(self, message: str, *args):
+        """Rate-limited warning for failed lookups, so an API outage doesn't flood the log"""
+        now = time.monotonic()
+        if now - self._last_warn < WARNING_INTERVAL_SECONDS:
+            self._suppressed_warnings += 1
+            return
+        if self._suppressed_warnings:
+            message += f" ({self._suppressed_warnings} similar warnings suppressed)"
+        self._last_warn = now
+        self._suppressed_warnings = 0
+        logger.warning(message, *args)
+
+    @staticmethod
+    def _open_postcode_table(path: str) -> Optional[PostcodeTable]:
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            table = PostcodeTable(path)
+            logger.info(f"Loaded postcode table with {len(table)} postcodes")
+            return table
+        except Exception as e:
+            logger.warning(f"Postcode table unavailable ({path}): {e}")
+            return None
+
+    def _load_persisted_cache(self):
+        if not self.db_manager:
+            return
+        now = int(time.time())
+        rows = self.db_manager.get_travel_cache(now - self.cache_ttl, now - self.negative_cache_ttl)
+        for origin, destination, api_mode, slot, minutes, status, fetched_at in rows:
+            self._cache[(origin, destination, api_mode, slot)] = (minutes, fetched_at if status == 'FAIL' else None)
+        if rows:
+            logger.info(f"Loaded {len(rows)} cached travel times from database")
+
+    def _load_persisted(self, keys: List[tuple]) -> Dict[tuple, int]:
+        """
+        {key: minutes} for API keys missing from the in-memory cache but still valid in the database.
+
+        The in-memory cache is bounded, so pairs evicted from it are read back here instead of
+        being fetched from the API again.
+        """
+        if not self.db_manager or not keys:
+            return {}
+        now = int(time.time())
+        found = {}
+        for origin, destination, api_mode, slot, minutes, status, fetched_at in self.db_manager.get_travel_times(
+                keys, now - self.cache_ttl, now - self.negative_cache_ttl):
+            key = (origin, destination, api_mode, slot)
+            self._cache[key] = (minutes, fetched_at if status == 'FAIL' else None)
+            found[key] = minutes
+        return found
+
+    def _persist(self, entries: List[Tuple[tuple, int, Optional[float]]]):
+        """
+        Write API-sourced (key, minutes, failed_at) results through to the database (estimates are
+        cheap to recompute). Takes the values themselves, as a large batch may already have pushed
+        its first keys out of the in-memory cache.
+        """
+        if not self.db_manager:
+            return
+        rows = [(*key, minutes, 'OK' if failed_at is None else 'FAIL')
+                for key, minutes, failed_at in entries if key[3] != 'fast']
+        if rows:
+            self.db_manager.save_travel_times(rows, int(time.time()))
+
+    def clear_travel_cache(self):
+        """Drop in-memory and persisted travel times"""
+        self._cache.clear()
+        self._od_matrices.clear()
+        if self.db_manager:
+            self.db_manager.clear_travel_cache()
+
+    def close(self):
+        """Release pooled Maps connections and the postcode table (app shutdown)"""
+        if self._session is not None:
+            self._session.close()
+        if self.postcodes is not None:
+            self.postcodes.close()
+
+    async def aclose(self):
+        """Close the shared async HTTP client (app shutdown)"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     def _map_transport_mode(self, transport_mode: str) -> str:
         """Map transport mode to Google Maps API mode"""
-        mode_mapping = {
-            "car": "driving",
-            "walking": "walking",
-            "bicycle": "bicycling",
-            "public transport": "transit",
-            "public_transport": "transit",
-            "bike": "bicycling"
-        }
-        return mode_mapping.get(transport_mode.lower(), "driving")
+        return _api_mode(transport_mode)
 
     def _normalize_address(self, address: str) -> str:
         """Normalize address string; append country if missing. Return '' if unusable."""
-        if not address:
-            return ""
-        addr = address.strip().strip(',')
-        # Minimal validity check
-        if len(addr) < 3:
-            return ""
-        # If no country hint present, append default country
-        lower_addr = addr.lower()
-        if self.default_country.lower() not in lower_addr:
-            addr = f"{addr}, {self.default_country}"
-        return addr
-
-    def calculate_travel_time(self, origin: str, destination: str, mode: str = "driving") -> int:
-        """Calculate travel time in minutes using Distance Matrix, with Directions fallback."""
-        if not self.client or self.fast_scheduler:
-            return self._estimate_travel_time(origin, destination, mode)
-        
-        # If API is available and not in fast mode
-        try:
-            api_mode = self._map_transport_mode(mode)
-            now = datetime.now()
+        # Memoized: the same few hundred addresses are normalized on every matrix lookup
+        return _normalize(address or "", self.default_country)
 
+    def _api_calculate_travel_time(self, origin: str, destination: str, mode: str = "driving") -> int:
+        """calculate_travel_time with the API: minutes from Distance Matrix, with Directions fallback."""
+        minutes = self._lookup_minutes(origin, destination, self._map_transport_mode(mode))
+        return self._estimate_travel_time(origin, destination, mode) if minutes is None else minutes
+
+    def _lookup_minutes(self, origin: str, destination: str, api_mode: str) -> Optional[int]:
+        """Distance Matrix minutes for one pair, with Directions fallback; None if the lookup failed"""
+        try:
             # Normalize inputs
             norm_origin = self._normalize_address(origin)
             norm_destination = self._normalize_address(destination)
             if not norm_origin or not norm_destination:
-                return self._estimate_travel_time(origin, destination, mode)
+                return None
             if norm_origin == norm_destination:
                 return 0
 
             # Prefer Distance Matrix for robustness
-            dm = self.client.distance_matrix(origins=[norm_origin], destinations=[norm_destination], mode=api_mode, departure_time=now, region=self.default_region)
+            dm = self.client.distance_matrix(origins=[norm_origin], destinations=[norm_destination], mode=api_mode, departure_time=_departure_time(api_mode), region=self.default_region)
             if dm and dm.get('rows') and dm['rows'][0].get('elements'):
                 el = dm['rows'][0]['elements'][0]
                 if el.get('status') == 'OK' and el.get('duration'):
                     return int(el['duration']['value'] / 60)
+                if el.get('status') in _UNROUTABLE_STATUSES:
+                    return None
+
+            return self._directions_minutes(origin, destination, api_mode)
+        except Exception as e:
+            # Reduce log noise but keep visibility
+            self._warn("Error calculating travel time: %s", e)
+            return None
 
-            # Fallback to Directions API
-            directions = self.client.directions(norm_origin, norm_destination, mode=api_mode, departure_time=now, region=self.default_region)
+    def _directions_minutes(self, origin: str, destination: str, api_mode: str) -> Optional[int]:
+        """Directions API minutes for a pair Distance Matrix couldn't answer; None if that fails too."""
+        try:
+            directions = self.client.directions(
+                self._normalize_address(origin), self._normalize_address(destination),
+                mode=api_mode, departure_time=_departure_time(api_mode), region=self.default_region
+            )
             if directions and directions[0].get('legs'):
                 duration = directions[0]['legs'][0]['duration']['value']
                 return int(duration / 60)
-
-            return self._estimate_travel_time(origin, destination, mode)
         except Exception as e:
-            # Reduce log noise but keep visibility
-            logger.warning(f"Error calculating travel time: {str(e)}")
-            return self._estimate_travel_time(origin, destination, mode)
+            self._warn("Error calculating travel time: %s", e)
+        return None
+
+    def calculate_travel_times_bulk(self, pairs: List[Tuple[str, str]], mode: str = "driving") -> List[int]:
+        """
+        Uncached minutes for many (origin, destination) pairs, in order.
+
+        Addresses are normalized and deduplicated once, and the pairs go out as <=25x25
+        Distance Matrix tiles rather than one request per pair.
+        """
+        if not self.client or self.fast_scheduler:
+            return [self._estimate_travel_time(origin, destination, mode) for origin, destination in pairs]
+        minutes = self._api_minutes(pairs, self._map_transport_mode(mode))
+        return [
+            self._estimate_travel_time(origin, destination, mode) if minutes[(origin, destination)] is None
+            else minutes[(origin, destination)]
+            for origin, destination in pairs
+        ]
+
+    def _address_latlon(self, address: str) -> Optional[Tuple[float, float]]:
+        if address not in self._latlon_cache:
+            self._latlon_cache[address] = self.postcodes.latlon(find_postcode(address))
+        return self._latlon_cache[address]
+
+    def _distance_estimate(self, origin: str, destination: str, mode: str) -> Optional[int]:
+        """Haversine distance at an average mode speed, or None without coordinates for both postcodes"""
+        if not self.postcodes:
+            return None
+        a = self._address_latlon(origin)
+        b = self._address_latlon(destination)
+        if not a or not b:
+            return None
+        lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+        h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        km = 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+        minutes = math.ceil(km / _MODE_SPEED_KMH.get(self._map_transport_mode(mode), 40.0) * 60)
+        return max(1, min(minutes, 60))
+
+    @property
+    def estimates_only(self) -> bool:
+        """True when lookups never reach the Maps API (no key, or FAST_SCHEDULER)"""
+        return self.fast_scheduler or not self.client
+
+    def estimate_travel_times_matrix(self, origins: List[str], destinations: List[str], mode: str = "driving") -> np.ndarray:
+        """
+        Offline estimates for every origin x destination as an (N, M) int16 array of minutes.
+
+        Pairs with both postcodes in the table are computed in one broadcast haversine and the
+        rest with the broadcast prefix heuristic, so values match _estimate_travel_time.
+        """
+        origin_ll = self._latlon_array(origins)
+        dest_ll = self._latlon_array(destinations)
+        known = ~np.isnan(origin_ll[:, :1]) & ~np.isnan(dest_ll[:, 0])
+        minutes = self._heuristic_matrix(origins, destinations, mode)
+        if known.any():
+            lat_o, lon_o = origin_ll[:, 0, None], origin_ll[:, 1, None]
+            lat_d, lon_d = dest_ll[:, 0], dest_ll[:, 1]
+            with np.errstate(invalid="ignore"):
+                h = np.sin((lat_d - lat_o) / 2) ** 2 + np.cos(lat_o) * np.cos(lat_d) * np.sin((lon_d - lon_o) / 2) ** 2
+                km = 2 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+                estimate = np.clip(np.ceil(km / _MODE_SPEED_KMH.get(self._map_transport_mode(mode), 40.0) * 60), 1, 60)
+            minutes[known] = estimate[known]
+        return minutes
+
+    def _heuristic_matrix(self, origins: List[str], destinations: List[str], mode: str) -> np.ndarray:
+        """Postcode-prefix heuristic of _estimate_travel_time for every origin x destination, as int16"""
+        # Strings are interned to integer codes once per address, so the pairwise compares are array ops
+        codes: Dict[str, int] = {}
+
+        def encode(values: List[str]) -> np.ndarray:
+            return np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int64).reshape(-1, 1)
+
+        def features(addresses: List[str]):
+            texts = [(address or "").strip().upper() for address in addresses]
+            tokens = [_postcode_token(text) for text in texts]
+            present = np.array([bool(address) for address in addresses]).reshape(-1, 1)
+            has_token = np.array([bool(token) for token in tokens]).reshape(-1, 1)
+            return present, encode(texts), has_token, encode(tokens), encode([token[:2] for token in tokens])
+
+        o_present, o_text, o_has, o_token, o_prefix = features(origins)
+        d_present, d_text, d_has, d_token, d_prefix = (f.T for f in features(destinations))
+        both = o_has & d_has
+        # Later rules take precedence, mirroring the scalar if/elif chain from the bottom up
+        base = np.full((len(origins), len(destinations)), 18, dtype=np.int16)
+        base[both & (o_prefix == d_prefix)] = 10
+        base[both & (o_token == d_token)] = 6
+        base[o_text == d_text] = 0
+        base[~(o_present & d_present)] = 15
+        base += _HEURISTIC_MODE_PENALTY.get(self._map_transport_mode(mode), 0)
+        return np.clip(base, 1, 60)
+
+    def _latlon_array(self, addresses: List[str]) -> np.ndarray:
+        """(N, 2) radians per address; NaN rows where no table coordinates are known"""
+        coords = np.full((len(addresses), 2), np.nan)
+        if self.postcodes:
+            for idx, address in enumerate(addresses):
+                latlon = self._address_latlon(address) if address else None
+                if latlon:
+                    coords[idx] = latlon
+        return np.radians(coords)
 
     def _estimate_travel_time(self, origin: str, destination: str, mode: str = "driving") -> int:
         """Heuristic travel time estimate in minutes (no external calls)."""
@@ -87,99 +476,398 @@ class TravelService:
             if not origin or not destination:
                 base = 15
             else:
+                minutes = self._distance_estimate(origin, destination, mode)
+                if minutes is not None:
+                    return minutes
+                # Postcode-prefix heuristic when coordinates are unavailable
                 o = origin.strip().upper()
                 d = destination.strip().upper()
+                po, pd = _postcode_token(o), _postcode_token(d)
                 if o == d:
                     base = 0
+                elif not po or not pd:
+                    base = 18
+                elif po == pd:
+                    base = 6
+                elif po[:2] == pd[:2]:
+                    base = 10
                 else:
-                    # Extract last token that looks like a postcode-ish chunk
-                    def _pc(s: str) -> str:
-                        parts = [p for p in s.replace(',', ' ').split() if any(ch.isdigit() for ch in p)]
-                        return parts[-1] if parts else ""
-                    po, pd = _pc(o).replace(" ", ""), _pc(d).replace(" ", "")
-                    if po and pd and po == pd:
-                        base = 6
-                    elif po and pd and po[:2] == pd[:2]:
-                        base = 10
-                    else:
-                        base = 18
-            m = self._map_transport_mode(mode)
-            if m == "walking":
-                base += 10
-            elif m == "bicycling":
-                base += 5
-            # clamp
+                    base = 18
+            base += _HEURISTIC_MODE_PENALTY.get(self._map_transport_mode(mode), 0)
             return max(1, min(base, 60))
         except Exception:
             return 15
-            return 15
 
+    @staticmethod
+    def _address_key(address: str) -> str:
+        return address.strip().lower()
+
+    def _cache_key(self, origin: str, destination: str, api_mode: str, source: str) -> tuple:
+        """source is 'fast' for heuristic estimates, else the _time_slot the API result belongs to"""
+        return (self._address_key(origin), self._address_key(destination), api_mode, source)
+
+    def _cached(self, key: tuple, now: float) -> Optional[int]:
+        """Cached minutes, or None on a miss or a failed lookup whose retry is due"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        minutes, failed_at = entry
+        if failed_at is not None and now - failed_at >= self.negative_cache_ttl:
+            return None
+        return minutes
+
+    def _remember(self, key: tuple, minutes: Optional[int], origin: str, destination: str, api_mode: str,
+                  resolved: Optional[List[Tuple[tuple, int, Optional[float]]]] = None) -> int:
+        """
+        Cache a lookup result, clamped; a failed lookup (None) caches the heuristic as a negative entry.
+        The cached (key, minutes, failed_at) is also appended to resolved, when given, for _persist.
+        """
+        failed_at = None
+        if minutes is None:
+            minutes = self._estimate_travel_time(origin, destination, api_mode)
+            failed_at = time.time()
+        value = max(1, min(minutes, 180))
+        self._cache[key] = (value, failed_at)
+        if resolved is not None:
+            resolved.append((key, value, failed_at))
+        return value
+
+    def _get_travel_time(self, origin: str, destination: str, mode: str = "driving", use_api: bool = True) -> int:
+        """Cached travel time retrieval. When use_api is False or fast_scheduler is True, use heuristic."""
         try:
+            # Single-pair form of the bulk path (cache, matrix request, clamping, persistence)
+            return self._resolve_pairs([(origin, destination, mode)], use_api)[0]
+        except Exception as e:
+            logger.error(f"Error in get_travel_time: {e}")
+            return 15
+
+    def _get_estimated_travel_time(self, origin: str, destination: str, mode: str = "driving", use_api: bool = True) -> int:
+        """get_travel_time for estimate-only services: cached heuristic, no batching or persistence"""
+        api_mode = self._map_transport_mode(mode)
+        key = self._cache_key(origin, destination, api_mode, 'fast')
+        entry = self._cache.get(key)
+        if entry is not None:
+            return entry[0]
+        return self._remember(key, self._estimate_travel_time(origin, destination, api_mode), origin, destination, api_mode)
+
+    def get_travel_time_matrix(self, origins: List[Tuple[Hashable, str, str]], destination: str,
+                               use_api: bool = True) -> Dict[Hashable, int]:
+        """
+        Travel times from many origins to one destination: {key: minutes}.
+
+        origins holds (key, address, mode) entries. Cached pairs are answered
+        directly; misses are resolved with batched Distance Matrix requests
+        per mode instead of one request per origin.
+        """
+        minutes = self._resolve_pairs([(origin, destination, mode) for _, origin, mode in origins], use_api)
+        return {key: m for (key, _, _), m in zip(origins, minutes)}
+
+    def get_travel_times_bulk(self, origin: str, destinations: List[str], mode: str = "driving",
+                              use_api: bool = True) -> List[int]:
+        """Travel times from one origin to each destination (same order), batched like get_travel_time_matrix"""
+        return self._resolve_pairs([(origin, destination, mode) for destination in destinations], use_api)
+
+    def build_travel_matrix(self, origins: List[str], destinations: List[str], mode: str = "driving",
+                            use_api: bool = True) -> Dict[Tuple[str, str], int]:
+        """
+        Warm the cache for every origin x destination pair and return {(origin, destination): minutes}.
+
+        Uncached pairs are fetched as Distance Matrix tiles, so later get_travel_time /
+        get_travel_times_bulk calls for these addresses are answered without network I/O.
+        """
+        pairs = [(origin, destination) for origin in dict.fromkeys(origins) for destination in dict.fromkeys(destinations)]
+        minutes = self._resolve_pairs([(origin, destination, mode) for origin, destination in pairs], use_api)
+        return dict(zip(pairs, minutes))
+
+    def warmup(self, addresses: List[str], mode: str = "driving", destinations: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Precompute a dense int16 travel-time matrix for a known address set (rows: addresses,
+        columns: destinations, default the same addresses), in input order.
+
+        Addresses are deduplicated case-insensitively; uncached pairs are fetched as Distance Matrix
+        tiles, or estimated in one vectorized pass for estimate-only services. The matrix is kept
+        for lookup_matrix until the departure-time slot changes.
+        """
+        destinations = addresses if destinations is None else destinations
+        api_mode = self._map_transport_mode(mode)
+        origins = self._distinct_addresses(addresses)
+        targets = self._distinct_addresses(destinations)
+        if self.estimates_only:
+            source = 'fast'
+            matrix = self.estimate_travel_times_matrix(origins, targets, mode)
+        else:
+            source = _current_slot(api_mode)
+            minutes = self.build_travel_matrix(origins, targets, mode)
+            matrix = np.fromiter((minutes[(origin, target)] for origin in origins for target in targets),
+                                 dtype=np.int16, count=len(origins) * len(targets)).reshape(len(origins), len(targets))
+        rows = {self._address_key(address): i for i, address in enumerate(origins)}
+        cols = {self._address_key(address): j for j, address in enumerate(targets)}
+        self._od_matrices[api_mode] = (rows, cols, matrix, source)
+        logger.info(f"Warmed {len(origins)}x{len(targets)} {api_mode} travel matrix")
+        return matrix[np.ix_([rows[self._address_key(address)] for address in addresses],
+                             [cols[self._address_key(address)] for address in destinations])]
+
+    def lookup_matrix(self, origin: str, destination: str, mode: str = "driving") -> int:
+        """Travel minutes from the warmed matrix when it covers both addresses, else get_travel_time"""
+        api_mode = self._map_transport_mode(mode)
+        warm = self._od_matrices.get(api_mode)
+        if warm is not None:
+            rows, cols, matrix, source = warm
+            i = rows.get(self._address_key(origin))
+            j = cols.get(self._address_key(destination))
+            if i is not None and j is not None and source in ('fast', _current_slot(api_mode)):
+                return int(matrix[i, j])
+        return self.get_travel_time(origin, destination, mode)
+
+    def _distinct_addresses(self, addresses: List[str]) -> List[str]:
+        """First spelling of each address, deduplicated the way the cache keys them"""
+        distinct: Dict[str, str] = {}
+        for address in addresses:
+            distinct.setdefault(self._address_key(address), address)
+        return list(distinct.values())
+
+    @staticmethod
+    def _run_parallel(fn: Callable[[T], R], items: List[T], max_workers: int = MATRIX_MAX_WORKERS) -> List[R]:
+        """fn over items (results in order) on a thread pool; network-bound calls overlap their waits"""
+        if len(items) < 2 or max_workers < 2:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    def _resolve_pairs(self, pairs: List[Tuple[str, str, str]], use_api: bool,
+                       fetch_tiles: Optional[TileFetcher] = None) -> List[int]:
+        """
+        Cached, clamped minutes for (origin, destination, mode) pairs; misses are fetched per mode in bulk.
+
+        fetch_tiles, when given, replaces _fetch_tiles for the Distance Matrix requests.
+        """
+        fast = (not use_api) or self.fast_scheduler or (not self.client)
+        now = time.time()
+        results: List[int] = [0] * len(pairs)
+        keys = []
+        # indexes into pairs not in the in-memory cache
+        uncached = []
+
+        for idx, (origin, destination, mode) in enumerate(pairs):
             api_mode = self._map_transport_mode(mode)
-            now = datetime.now()
+            key = self._cache_key(origin, destination, api_mode, 'fast' if fast else _current_slot(api_mode))
+            keys.append(key)
+            cached = self._cached(key, now)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                uncached.append(idx)
 
-            # Normalize inputs
+        persisted = {} if fast else self._load_persisted(list(dict.fromkeys(keys[i] for i in uncached)))
+        # api_mode -> indexes into pairs still to resolve
+        misses: Dict[str, List[int]] = {}
+        for idx in uncached:
+            if keys[idx] in persisted:
+                results[idx] = persisted[keys[idx]]
+            else:
+                misses.setdefault(keys[idx][2], []).append(idx)
+
+        resolved = []
+        for api_mode, indexes in misses.items():
+            todo = [(pairs[i][0], pairs[i][1]) for i in indexes]
+            if fast:
+                minutes = {pair: self._estimate_travel_time(pair[0], pair[1], api_mode) for pair in todo}
+            else:
+                minutes = self._api_minutes(todo, api_mode, fetch_tiles)
+            for i, pair in zip(indexes, todo):
+                results[i] = self._remember(keys[i], minutes[pair], pair[0], pair[1], api_mode, resolved)
+
+        if not fast:
+            self._persist(resolved)
+        return results
+
+    def _api_minutes(self, pairs: List[Tuple[str, str]], api_mode: str,
+                     fetch_tiles: Optional[TileFetcher] = None) -> Dict[Tuple[str, str], Optional[int]]:
+        """Uncached minutes for raw (origin, destination) pairs, batching Distance Matrix requests; None where the lookup failed"""
+        minutes: Dict[Tuple[str, str], Optional[int]] = {}
+        # normalized pair -> raw pairs that map to it
+        queries: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for origin, destination in dict.fromkeys(pairs):
             norm_origin = self._normalize_address(origin)
             norm_destination = self._normalize_address(destination)
             if not norm_origin or not norm_destination:
-                return 15
-            if norm_origin == norm_destination:
-                return 0
+                minutes[(origin, destination)] = None
+            elif norm_origin == norm_destination:
+                minutes[(origin, destination)] = 0
+            else:
+                queries.setdefault((norm_origin, norm_destination), []).append((origin, destination))
 
-            # Prefer Distance Matrix for robustness
-            dm = self.client.distance_matrix(origins=[norm_origin], destinations=[norm_destination], mode=api_mode, departure_time=now, region=self.default_region)
-            if dm and dm.get('rows') and dm['rows'][0].get('elements'):
-                el = dm['rows'][0]['elements'][0]
-                if el.get('status') == 'OK' and el.get('duration'):
-                    return int(el['duration']['value'] / 60)
+        fetched = (fetch_tiles or self._fetch_tiles)(self._query_tiles(queries), api_mode)
 
-            # Fallback to Directions API
-            directions = self.client.directions(norm_origin, norm_destination, mode=api_mode, departure_time=now, region=self.default_region)
-            if directions and directions[0].get('legs'):
-                duration = directions[0]['legs'][0]['duration']['value']
-                return int(duration / 60)
+        # No answer (failed request / transient status): try Directions per pair, concurrently
+        unanswered = [pair for norm_pair, raw_pairs in queries.items() if norm_pair not in fetched for pair in raw_pairs]
+        if unanswered:
+            minutes.update(zip(unanswered, self._run_parallel(
+                lambda pair: self._directions_minutes(pair[0], pair[1], api_mode), unanswered
+            )))
 
-            return 15
-        except Exception as e:
-            # Reduce log noise but keep visibility
-            logger.warning(f"Error calculating travel time: {str(e)}")
-            return 15 
+        for norm_pair, raw_pairs in queries.items():
+            if norm_pair not in fetched:
+                continue
+            # None (unroutable address) is kept: no Directions retry, the caller falls back to the heuristic
+            for raw_pair in raw_pairs:
+                minutes[raw_pair] = fetched[norm_pair]
+        return minutes
 
-    def get_travel_time(self, origin: str, destination: str, mode: str = "driving", use_api: bool = True) -> int:
-        """Cached travel time retrieval. When use_api is False or fast_scheduler is True, use heuristic."""
+    def _query_tiles(self, queries) -> List[Tuple[List[str], List[str]]]:
+        """Tiles covering the normalized (origin, destination) queries"""
+        destinations_by_origin: Dict[str, List[str]] = {}
+        for norm_origin, norm_destination in queries:
+            destinations_by_origin.setdefault(norm_origin, []).append(norm_destination)
+        unique_destinations = list(dict.fromkeys(norm_destination for _, norm_destination in queries))
+
+        if 2 * len(queries) >= len(destinations_by_origin) * len(unique_destinations):
+            # (Mostly) full origins x destinations grid, incl. one-to-many / many-to-one: tile it
+            return self._matrix_tiles(list(destinations_by_origin), unique_destinations)
+        # Sparse pairs: one row of destinations per origin
+        return [
+            tile for norm_origin, norm_destinations in destinations_by_origin.items()
+            for tile in self._matrix_tiles([norm_origin], norm_destinations)
+        ]
+
+    @staticmethod
+    def _matrix_tiles(origins: List[str], destinations: List[str]) -> List[Tuple[List[str], List[str]]]:
+        """Split origins x destinations into (origins, destinations) chunks within the API's per-request limits"""
+        dest_step = min(MATRIX_MAX_DESTINATIONS, len(destinations)) or 1
+        origin_step = max(1, min(MATRIX_MAX_ORIGINS, MATRIX_MAX_ELEMENTS // dest_step))
+        return [
+            (origins[o_start:o_start + origin_step], destinations[d_start:d_start + dest_step])
+            for o_start in range(0, len(origins), origin_step)
+            for d_start in range(0, len(destinations), dest_step)
+        ]
+
+    def _fetch_tiles(self, tiles: List[Tuple[List[str], List[str]]], api_mode: str) -> Dict[Tuple[str, str], Optional[int]]:
+        """Request every tile, concurrently when there is more than one, and merge the usable elements"""
+        results = self._run_parallel(lambda tile: self._fetch_tile(tile[0], tile[1], api_mode), tiles)
+        fetched: Dict[Tuple[str, str], Optional[int]] = {}
+        for result in results:
+            fetched.update(result)
+        return fetched
+
+    def _fetch_tile(self, origin_chunk: List[str], dest_chunk: List[str], api_mode: str) -> Dict[Tuple[str, str], Optional[int]]:
         try:
-            api_mode = self._map_transport_mode(mode)
-            fast = (not use_api) or self.fast_scheduler or (not self.client)
-            key = (origin.strip().lower(), destination.strip().lower(), api_mode, 'fast' if fast else 'api')
-            if key in self._cache:
-                return self._cache[key]
-            if fast:
-                minutes = self._estimate_travel_time(origin, destination, api_mode)
-            else:
-                minutes = self.calculate_travel_time(origin, destination, api_mode)
-            # Clamp to reasonable bounds
-            minutes = max(1, min(minutes, 180))
-            self._cache[key] = minutes
-            return minutes
+            dm = self.client.distance_matrix(origins=origin_chunk, destinations=dest_chunk, mode=api_mode,
+                                             departure_time=_departure_time(api_mode), region=self.default_region)
         except Exception as e:
-            logger.error(f"Error in get_travel_time: {e}")
-            return 15
+            self._warn("Error calculating travel time matrix: %s", e)
+            return {}
+        return self._parse_matrix(dm, origin_chunk, dest_chunk)
+
+    @staticmethod
+    def _parse_matrix(dm: dict, origin_chunk: List[str], dest_chunk: List[str]) -> Dict[Tuple[str, str], Optional[int]]:
+        """
+        {(origin, destination): minutes} for the usable elements of a Distance Matrix response;
+        None marks pairs the API reported as unroutable (NOT_FOUND / ZERO_RESULTS).
+        """
+        fetched: Dict[Tuple[str, str], Optional[int]] = {}
+        for row, norm_origin in zip((dm or {}).get('rows') or [], origin_chunk):
+            for el, norm_destination in zip(row.get('elements') or [], dest_chunk):
+                if el.get('status') == 'OK' and el.get('duration'):
+                    fetched[(norm_origin, norm_destination)] = int(el['duration']['value'] / 60)
+                elif el.get('status') in _UNROUTABLE_STATUSES:
+                    fetched[(norm_origin, norm_destination)] = None
+        return fetched
+
+    async def build_travel_matrix_async(self, origins: List[str], destinations: List[str], mode: str = "driving",
+                                        use_api: bool = True) -> Dict[Tuple[str, str], int]:
+        """
+        Async build_travel_matrix: uncached tiles are requested concurrently over HTTP
+        (asyncio.gather on one httpx client) instead of through the blocking googlemaps client.
+        """
+        pairs = [(origin, destination) for origin in dict.fromkeys(origins) for destination in dict.fromkeys(destinations)]
+        minutes = await self.agather_travel_times(pairs, mode, use_api)
+        return dict(zip(pairs, minutes))
+
+    async def acalculate_travel_time(self, origin: str, destination: str, mode: str = "driving") -> int:
+        """Async get_travel_time: a cache miss is fetched without blocking the event loop"""
+        return (await self.agather_travel_times([(origin, destination)], mode))[0]
+
+    async def agather_travel_times(self, pairs: List[Tuple[str, str]], mode: str = "driving",
+                                   use_api: bool = True) -> List[int]:
+        """
+        Travel times for (origin, destination) pairs (same order); uncached pairs go out as concurrent matrix tiles.
+
+        The blocking parts (SQLite cache, Directions fallback, persistence) run on a worker thread;
+        only the tile requests come back to the event loop, over the shared httpx client.
+        """
+        mode_pairs = [(origin, destination, mode) for origin, destination in pairs]
+        if (not use_api) or self.fast_scheduler or (not self.client):
+            # Heuristic-only lookups have no I/O to overlap and resolve synchronously
+            return self._resolve_pairs(mode_pairs, use_api)
+        loop = asyncio.get_running_loop()
+
+        def fetch_tiles(tiles: List[Tuple[List[str], List[str]]], api_mode: str) -> Dict[Tuple[str, str], Optional[int]]:
+            if not tiles:
+                return {}
+            return asyncio.run_coroutine_threadsafe(self._fetch_tiles_async(tiles, api_mode), loop).result()
+
+        return await asyncio.to_thread(self._resolve_pairs, mode_pairs, use_api, fetch_tiles)
+
+    def _async_http(self) -> httpx.AsyncClient:
+        """Shared keep-alive client; rebuilt if the event loop changed, since connections belong to one loop"""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            self._http = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_CONNECTIONS,
+                                    keepalive_expiry=ASYNC_KEEPALIVE_SECONDS),
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def _fetch_tiles_async(self, tiles: List[Tuple[List[str], List[str]]], api_mode: str) -> Dict[Tuple[str, str], Optional[int]]:
+        limit = asyncio.Semaphore(MATRIX_MAX_WORKERS)
+        http = self._async_http()
+
+        async def fetch(origin_chunk: List[str], dest_chunk: List[str]) -> Dict[Tuple[str, str], Optional[int]]:
+            params = {
+                "origins": "|".join(origin_chunk),
+                "destinations": "|".join(dest_chunk),
+                "mode": api_mode,
+                "region": self.default_region,
+                "key": self.api_key,
+            }
+            departure_time = _departure_time(api_mode)
+            if departure_time:
+                params["departure_time"] = departure_time
+            try:
+                async with limit:
+                    response = await http.get(DISTANCE_MATRIX_URL, params=params)
+                response.raise_for_status()
+                dm = response.json()
+                if dm.get('status') != 'OK':
+                    self._warn("Distance Matrix request failed: %s", dm.get('status'))
+                    return {}
+            except Exception as e:
+                self._warn("Error calculating travel time matrix: %s", e)
+                return {}
+            return self._parse_matrix(dm, origin_chunk, dest_chunk)
+
+        results = await asyncio.gather(*(fetch(origin_chunk, dest_chunk) for origin_chunk, dest_chunk in tiles))
+        fetched: Dict[Tuple[str, str], Optional[int]] = {}
+        for result in results:
+            fetched.update(result)
+        return fetched
 
     def check_connectivity(self) -> dict:
-        """Ping Google Maps APIs to verify connectivity and credentials."""
+        """Ping Google Maps APIs to verify connectivity and credentials (result cached for CONNECTIVITY_TTL_SECONDS)."""
         if not self.client:
             return {"available": False, "reason": "GOOGLE_MAPS_API_KEY not configured"}
+        if self._connectivity is not None and time.monotonic() - self._connectivity[0] < CONNECTIVITY_TTL_SECONDS:
+            return self._connectivity[1]
         try:
-            origin = self._normalize_address("London, SW1A 1AA")
-            dest = self._normalize_address("London, SW1A 1AA")
+            # Two distinct points, so the check exercises routing rather than a trivial same-address pair
+            origin = self._normalize_address(CONNECTIVITY_ORIGIN)
+            dest = self._normalize_address(CONNECTIVITY_DESTINATION)
             dm = self.client.distance_matrix(origins=[origin], destinations=[dest], mode="driving", region=self.default_region)
             status = dm.get('rows', [{}])[0].get('elements', [{}])[0].get('status')
-            if status == 'OK':
-                return {"available": True, "reason": "OK"}
-            # Fallback to directions
-            directions = self.client.directions(origin, dest, mode="driving", region=self.default_region)
-            if directions and directions[0].get('legs'):
-                return {"available": True, "reason": "Directions OK"}
-            return {"available": False, "reason": status or "Unknown"}
+            result = {"available": status == 'OK', "reason": status or "Unknown"}
         except Exception as e:
-            return {"available": False, "reason": str(e)}
\ No newline at end of file
+            result = {"available": False, "reason": str(e)}
+        self._connectivity = (time.monotonic(), result)
+        return result
@@ -7,6 +7,27 @@ class WebSocketService {
     this.reconnectDelay = 1000;
     this.listeners = new Map();
     this.isConnecting = false;
+    this.decoder = new TextDecoder();
+    // Inflated frames are handled in arrival order even though decompression is async
+    this.inflateChain = Promise.resolve();
+  }
+
+  // Ask for server-compressed JSON frames when the browser can inflate them
+  static supportsDeflate() {
+    return typeof DecompressionStream !== 'undefined';
+  }
+
+  async inflate(buffer) {
+    const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('deflate'));
+    return new Response(stream).text();
+  }
+
+  parseAndHandle(text) {
+    try {
+      this.handleMessage(JSON.parse(text));
+    } catch (error) {
+      console.error('Error parsing WebSocket message:', error);
+    }
   }
 
   generateClientId() {
@@ -31,7 +52,11 @@ class WebSocketService {
         const wsUrl = host.replace(/^https?:\/\//, '');
         const url = `${protocol}//${wsUrl}/ws/${this.clientId || this.generateClientId()}`;
 
-        this.ws = new WebSocket(url);
+        this.ws = WebSocketService.supportsDeflate()
+          ? new WebSocket(url, ['json.deflate'])
+          : new WebSocket(url);
+        // Progress frames arrive as binary UTF-8 JSON, zlib-compressed if json.deflate was negotiated
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
           console.log('WebSocket connected');
@@ -41,11 +66,15 @@ class WebSocketService {
         };
 
         this.ws.onmessage = (event) => {
-          try {
-            const data = JSON.parse(event.data);
-            this.handleMessage(data);
-          } catch (error) {
-            console.error('Error parsing WebSocket message:', error);
+          if (typeof event.data === 'string') {
+            this.parseAndHandle(event.data);
+          } else if (event.target.protocol === 'json.deflate') {
+            this.inflateChain = this.inflateChain
+              .then(() => this.inflate(event.data))
+              .then(text => this.parseAndHandle(text))
+              .catch(error => console.error('Error inflating WebSocket message:', error));
+          } else {
+            this.parseAndHandle(this.decoder.decode(event.data));
           }
         };
 
@@ -71,6 +100,9 @@ class WebSocketService {
   handleMessage(data) {
     if (data.type === 'progress_update') {
       this.notifyListeners('progress_update', data);
+    } else if (data.type === 'progress_batch') {
+      // Coalesced updates for several tasks; deliver each as a normal progress_update
+      (data.updates || []).forEach(update => this.notifyListeners('progress_update', update));
     }
   }
 
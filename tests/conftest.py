@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _estimate_only_travel(monkeypatch):
+    """No Maps key, default cache settings: TravelService uses heuristic estimates unless a test injects a client"""
+    monkeypatch.delenv("GOOGLE_MAPS_API_KEY", raising=False)
+    for name in ("FAST_SCHEDULER", "TRAVEL_CACHE_MAX", "TRAVEL_CACHE_TTL_SECONDS",
+                 "TRAVEL_NEGATIVE_CACHE_TTL_SECONDS", "POSTCODE_TABLE_PATH"):
+        monkeypatch.delenv(name, raising=False)
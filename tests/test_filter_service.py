@@ -0,0 +1,144 @@
+import pytest
+
+from app.database import DatabaseManager
+from app.models.filter_schemas import FilterCondition, FilterGroup, FilterOperator
+from app.services.filter_service import FilterService
+
+
+def _assignment(i, employee_id, service_type, duration, travel_time, priority_score, reasoning):
+    return {
+        "employee_id": employee_id,
+        "employee_name": f"Employee {employee_id}",
+        "patient_id": f"P{i}",
+        "patient_name": f"Patient {'Smith' if i % 2 else 'Jones'} {i}",
+        "service_type": service_type,
+        "assigned_time": f"2025-01-06T{8 + i:02d}:00:00",
+        "start_time": f"2025-01-06T{8 + i:02d}:00:00",
+        "end_time": f"2025-01-06T{8 + i:02d}:30:00",
+        "estimated_duration": duration,
+        "travel_time": travel_time,
+        "priority_score": priority_score,
+        "assignment_reason": reasoning,
+    }
+
+
+@pytest.fixture
+def service():
+    db = DatabaseManager(":memory:")
+    db.log_assignments_bulk([
+        _assignment(0, "E1", "medicine", 60, 5, 9.0, "Nearest nurse"),
+        _assignment(1, "E2", "exercise", 30, 12, 4.5, None),
+        _assignment(2, "E1", "companionship", 45, 20, 7.0, "Language match"),
+        _assignment(3, "E3", "medicine", 30, 8, 6.0, None),
+        _assignment(4, "E2", "personal_care", 90, 15, 2.0, "Gender preference"),
+        _assignment(5, "E3", "exercise", 60, 3, 8.5, "Nearest carer"),
+    ])
+    yield FilterService(db)
+    db.close()
+
+
+def _group(*conditions, operator="AND"):
+    return FilterGroup(
+        operator=operator,
+        conditions=[FilterCondition(field=field, operator=FilterOperator(op), value=value, value2=value2)
+                    for field, op, value, value2 in conditions],
+    )
+
+
+FILTER_CASES = {
+    "equals": [_group(("service_type", "equals", "medicine", None))],
+    "not_equals": [_group(("employee_id", "not_equals", "E2", None))],
+    "contains_is_case_insensitive": [_group(("patient_name", "contains", "SMITH", None))],
+    "not_contains": [_group(("patient_name", "not_contains", "jones", None))],
+    "contains_skips_null": [_group(("reasoning", "contains", "n", None))],
+    "not_contains_keeps_null": [_group(("reasoning", "not_contains", "nearest", None))],
+    "comparisons": [_group(("duration", "greater_than_equal", 45, None), ("travel_time", "less_than", 16, None))],
+    "between": [_group(("priority_score", "between", 4.5, 8.0))],
+    "in": [_group(("employee_id", "in", ["E1", "E3"], None))],
+    "empty_in": [_group(("employee_id", "in", [], None))],
+    "not_in": [_group(("service_type", "not_in", ["medicine", "exercise"], None))],
+    "is_null": [_group(("reasoning", "is_null", None, None))],
+    "is_not_null": [_group(("reasoning", "is_not_null", None, None))],
+    "or_group": [_group(("service_type", "equals", "exercise", None), ("travel_time", "less_than", 6, None),
+                        operator="OR")],
+    "groups_are_anded": [
+        _group(("service_type", "equals", "medicine", None), ("service_type", "equals", "exercise", None),
+               operator="OR"),
+        _group(("duration", "greater_than", 30, None)),
+    ],
+}
+
+
+@pytest.mark.parametrize("filters", FILTER_CASES.values(), ids=FILTER_CASES.keys())
+def test_sql_pushdown_matches_python_evaluator(service, filters):
+    columns = service.db_manager.get_table_columns("assignments")
+    _, _, python_groups = service._build_where_clause(filters, columns)
+    assert python_groups == []
+
+    pushed_down = service.apply_filters_to_assignments(filters)
+    evaluated = service._filter_rows(service.db_manager.get_assignments(), filters)
+
+    assert sorted(row["id"] for row in pushed_down) == sorted(row["id"] for row in evaluated)
+
+
+def test_or_group_matches_any_condition(service):
+    filters = FILTER_CASES["or_group"]
+
+    rows = service.apply_filters_to_assignments(filters)
+
+    assert sorted(row["patient_id"] for row in rows) == ["P0", "P1", "P5"]
+
+
+def test_unknown_field_is_evaluated_in_python(service):
+    filters = [_group(("service_type", "equals", "medicine", None), ("not_a_column", "is_null", None, None))]
+    columns = service.db_manager.get_table_columns("assignments")
+
+    where_sql, params, python_groups = service._build_where_clause(filters, columns)
+
+    assert (where_sql, params) == ("", [])
+    assert python_groups == filters
+    assert sorted(row["patient_id"] for row in service.apply_filters_to_assignments(filters)) == ["P0", "P3"]
+
+
+def test_saving_a_page_config_replaces_the_previous_one(service):
+    service.save_filter_config("assignments", FILTER_CASES["equals"], sort_by="duration")
+    service.save_filter_config("assignments", FILTER_CASES["or_group"], sort_by="travel_time", sort_order="desc")
+
+    count = service.db_manager.conn.execute(
+        "SELECT COUNT(*) FROM filter_configs WHERE page = 'assignments'").fetchone()[0]
+    config = service.get_filter_config("assignments")
+
+    assert count == 1
+    assert config.filters == FILTER_CASES["or_group"]
+    assert (config.sort_by, config.sort_order) == ("travel_time", "desc")
+    assert config.created_at is not None and config.updated_at is not None
+
+
+def test_startup_keeps_only_the_newest_config_per_page():
+    db = DatabaseManager(":memory:")
+    # Table as created before the unique page index existed, holding duplicate rows
+    db.conn.execute('''
+        CREATE TABLE filter_configs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            config_id TEXT UNIQUE NOT NULL,
+            page TEXT NOT NULL,
+            filters BLOB NOT NULL,
+            sort_by TEXT,
+            sort_order TEXT DEFAULT 'asc',
+            page_size INTEGER DEFAULT 50,
+            page_number INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    db.conn.executemany(
+        "INSERT INTO filter_configs (config_id, page, filters, sort_by) VALUES (?, ?, '[]', ?)",
+        [("a", "employees", "name"), ("b", "patients", "name"), ("c", "employees", "postcode")],
+    )
+
+    service = FilterService(db)
+
+    rows = db.conn.execute("SELECT config_id, page FROM filter_configs ORDER BY id").fetchall()
+    assert [tuple(row) for row in rows] == [("b", "patients"), ("c", "employees")]
+    assert service.get_filter_config("employees").sort_by == "postcode"
+    db.close()
@@ -0,0 +1,91 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from app.database import DatabaseManager
+from app.models.schemas import Employee, Patient, ServiceType
+from app.services.data_processor import DataProcessor
+from app.services.rota_service import RotaService
+from app.services.travel_service import TravelService
+
+
+class _NoOpenAI:
+    """The legacy weekly schedule is solved locally; any OpenAI call is a regression"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"OpenAI service used: {name}")
+
+
+def _employee(i, qualification, address, capacity=2):
+    return Employee(
+        EmployeeID=f"E{i}", Name=f"Employee {i}", Address=address, PostCode="AB1 2CD", Gender="Female",
+        Ethnicity="x", Religion="x", TransportMode="Car", Qualification=qualification, LanguageSpoken="English",
+        CertificateExpiryDate="2030-01-01", EarliestStart="08:00", LatestEnd="18:00", Shifts="Breakfast",
+        ContactNumber="0", max_patients_per_day=capacity,
+    )
+
+
+def _patient(i, support, address):
+    return Patient(
+        PatientID=f"P{i}", PatientName=f"Patient {i}", Address=address, PostCode="AB1 2CD", Gender="Male",
+        Ethnicity="x", Religion="x", RequiredSupport=support, RequiredHoursOfSupport=1, AdditionalRequirements="",
+        Illness="", ContactNumber="0", RequiresMedication="N", EmergencyContact="", EmergencyRelation="",
+        LanguagePreference="English",
+    )
+
+
+@pytest.fixture
+def rota():
+    db = DatabaseManager(":memory:")
+    data_processor = DataProcessor(db)
+    service = RotaService(data_processor, _NoOpenAI(), db, TravelService(db))
+    yield service
+    db.close()
+
+
+def _load(rota, employees, patients):
+    rota.data_processor.employees = employees
+    rota.data_processor.patients = patients
+    rota.data_processor.data_loaded = True
+
+
+def test_legacy_schedule_respects_daily_capacity(rota):
+    employees = [_employee(1, "Carer", "1 High St", capacity=2), _employee(2, "Carer", "9 Low Rd", capacity=1)]
+    patients = [_patient(i, "Exercise", "1 High St") for i in range(5)]
+    _load(rota, employees, patients)
+
+    assignments = rota._solve_legacy_assignments()
+
+    per_employee = Counter(a.employee_id for a in assignments)
+    assert len(assignments) == 3
+    assert per_employee == {"E1": 2, "E2": 1}
+    assert [e.current_assignments for e in employees] == [2, 1]
+    assert len({a.patient_id for a in assignments}) == 3
+
+
+def test_legacy_schedule_only_gives_medicine_to_nurses(rota):
+    employees = [_employee(1, "Carer", "1 High St", capacity=3), _employee(2, "Nurse", "9 Low Rd", capacity=1)]
+    patients = [_patient(0, "Medicine", "1 High St"), _patient(1, "Medicine", "1 High St"),
+                _patient(2, "Companionship", "1 High St")]
+    _load(rota, employees, patients)
+
+    assignments = rota._solve_legacy_assignments()
+
+    by_patient = {a.patient_id: a for a in assignments}
+    medicine = [a for a in assignments if a.service_type == ServiceType.MEDICINE]
+    assert len(medicine) == 1 and medicine[0].employee_id == "E2"
+    assert by_patient["P2"].employee_id == "E1"
+    # The nurse's single slot is taken, so one medicine patient stays unassigned
+    assert len(assignments) == 2
+
+
+def test_legacy_schedule_is_persisted_without_openai(rota):
+    employees = [_employee(1, "Nurse", "1 High St", capacity=2)]
+    patients = [_patient(0, "Medicine", "1 High St"), _patient(1, "Exercise", "2 High St")]
+    _load(rota, employees, patients)
+
+    rows = asyncio.run(rota.generate_weekly_schedule(engine="legacy"))
+
+    assert sorted(row["patient_id"] for row in rows) == ["P0", "P1"]
+    assert all(a.db_id is not None for a in rota.current_assignments)
@@ -0,0 +1,121 @@
+import pytest
+
+from app.database import DatabaseManager
+from app.services.travel_service import TravelService
+
+
+class FakeMapsClient:
+    """googlemaps.Client stand-in: minutes from address lengths, ZERO_RESULTS for 'Nowhere' destinations"""
+
+    def __init__(self):
+        self.calls = []
+
+    def distance_matrix(self, origins, destinations, mode=None, **kwargs):
+        self.calls.append((len(origins), len(destinations), mode))
+        return {"rows": [
+            {"elements": [
+                {"status": "ZERO_RESULTS"} if "Nowhere" in destination
+                else {"status": "OK", "duration": {"value": 60 * (len(origin) + len(destination))}}
+                for destination in destinations
+            ]}
+            for origin in origins
+        ]}
+
+    def directions(self, *args, **kwargs):
+        raise AssertionError("Directions fallback not expected")
+
+
+def _api_service(db, client):
+    """TravelService on the API path with a fake Maps client"""
+    service = TravelService(db)
+    service.client = client
+    service.fast_scheduler = False
+    service.calculate_travel_time = service._api_calculate_travel_time
+    service.get_travel_time = service._get_travel_time
+    return service
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(tmp_path / "rota.db")
+    yield manager
+    manager.close()
+
+
+ORIGIN = "1 High St, London"
+DESTINATIONS = ["2 Rd, London", "3 Long Road, London", "Nowhere"]
+
+
+def test_api_results_survive_a_restart(db):
+    first = _api_service(db, FakeMapsClient())
+    minutes = first.get_travel_times_bulk(ORIGIN, DESTINATIONS, "Car")
+
+    rows = {row[1]: row for row in db.get_travel_cache()}
+    assert {status for *_, status, _ in rows.values()} == {"OK", "FAIL"}
+    assert rows["nowhere"][5] == "FAIL"
+
+    client = FakeMapsClient()
+    restarted = _api_service(db, client)
+    assert restarted.get_travel_times_bulk(ORIGIN, DESTINATIONS, "Car") == minutes
+    assert client.calls == []
+
+
+def test_estimates_are_not_persisted(db):
+    service = TravelService(db)
+    service.get_travel_times_bulk(ORIGIN, DESTINATIONS[:2], "Car")
+
+    assert db.get_travel_cache() == []
+
+
+def test_clear_travel_cache_drops_persisted_rows(db):
+    service = _api_service(db, FakeMapsClient())
+    service.get_travel_times_bulk(ORIGIN, DESTINATIONS, "Car")
+
+    service.clear_travel_cache()
+
+    assert db.get_travel_cache() == []
+
+
+def test_batches_larger_than_the_lru_are_persisted_and_reused(db, monkeypatch):
+    monkeypatch.setenv("TRAVEL_CACHE_MAX", "50")
+    client = FakeMapsClient()
+    service = _api_service(db, client)
+    origins = [f"{i} High St, London" for i in range(12)]
+    destinations = [f"{i} Park Rd, London" for i in range(10)]
+
+    matrix = service.build_travel_matrix(origins, destinations, "Car")
+    assert len(db.get_travel_cache()) == len(origins) * len(destinations)
+
+    client.calls.clear()
+    warmed = service.warmup(origins, "Car", destinations)
+
+    assert client.calls == []
+    assert warmed.tolist() == [[matrix[(o, d)] for d in destinations] for o in origins]
+
+
+@pytest.mark.parametrize("transport_mode, api_mode", [
+    ("Car", "driving"),
+    ("Public Transport", "transit"),
+    ("Bicycle", "bicycling"),
+    ("Walking", "walking"),
+])
+def test_every_transport_mode_is_looked_up_with_its_api_mode(db, transport_mode, api_mode):
+    client = FakeMapsClient()
+    service = _api_service(db, client)
+
+    service.get_travel_time(ORIGIN, DESTINATIONS[0], transport_mode)
+
+    assert [mode for *_, mode in client.calls] == [api_mode]
+
+
+@pytest.mark.parametrize("transport_mode, api_mode", [
+    ("Public Transport", "transit"),
+    ("Bicycle", "bicycling"),
+    ("Walking", "walking"),
+])
+def test_estimates_are_the_same_for_raw_and_mapped_modes(transport_mode, api_mode):
+    service = TravelService()
+
+    assert service._map_transport_mode(api_mode) == api_mode
+    assert (service.calculate_travel_time("1 High St, SW1A 1AA", "9 Low Rd, E1 6AN", transport_mode)
+            == service.calculate_travel_time("1 High St, SW1A 1AA", "9 Low Rd, E1 6AN", api_mode))